@@ -0,0 +1,225 @@
+# Load and analysis timings on synthetic data at 1x, 10x, 100x (and 1000x)
+# the shipped size, without opening a window.
+#
+#   python benchmarks/bench_analysis.py [--scale 1 --scale 10 ...] [--output results.json]
+#                                       [--baseline old.json] [--threshold 1.25]
+#
+# Data comes from generate_data.py (written once to benchmarks/data and
+# reused). Each stage runs --repeat times and reports mean, median and p95
+# in milliseconds. --output writes the results plus the environment as
+# JSON; --baseline compares against an earlier file and exits with status 1
+# when any median is slower than threshold x the baseline median.
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from cricket_stats import CricketStats
+from data_cache import CACHE_DIR
+from generate_data import DATA_DIR, write
+from schema import apply_schedule_schema, apply_schema, load_schedule, load_scorecards
+
+SCALES = [1, 10, 100]
+SAMPLE = 20
+NOISE_MS = 0.05
+
+
+def timed(fn, repeat):
+    # Returns the last result and the per-run timings in ms
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    return result, timings
+
+
+def summarize(timings):
+    ordered = sorted(timings)
+    return {
+        'runs': len(ordered),
+        'mean_ms': round(statistics.fmean(ordered), 3),
+        'median_ms': round(statistics.median(ordered), 3),
+        'p95_ms': round(ordered[max(int(len(ordered) * 0.95) - 1, 0)], 3),
+    }
+
+
+def quiet(fn):
+    # load_csv reports every load on stdout
+    def run():
+        with contextlib.redirect_stdout(io.StringIO()):
+            return fn()
+    return run
+
+
+def each(fn, keys):
+    # One timed call covers the whole sample, so report the per-key cost
+    def run():
+        for key in keys:
+            fn(key)
+    return run
+
+
+def bench_scale(scale, repeat):
+    directory = write(scale)
+    batting_path, bowling_path, schedule_path = (
+        os.path.join(directory, name)
+        for name in ('batting_summary.csv', 'bowling_summary.csv', 'match_schedule_results.csv')
+    )
+    cache = os.path.join(directory, CACHE_DIR)
+    loads = min(repeat, 5) if scale < 1000 else 1
+
+    def csv_load():
+        batting, bowling = apply_schema(pd.read_csv(batting_path), pd.read_csv(bowling_path))
+        return batting, bowling, apply_schedule_schema(pd.read_csv(schedule_path),
+                                                       batting['Team_Innings'].cat.categories)
+
+    def cold_cached_load():
+        shutil.rmtree(cache, ignore_errors=True)
+        return load_scorecards(batting_path, bowling_path)
+
+    def cached_load():
+        batting, bowling = load_scorecards(batting_path, bowling_path)
+        return batting, bowling, load_schedule(schedule_path, batting['Team_Innings'].cat.categories)
+
+    results = {}
+    (batting, bowling, schedule), results['csv_load'] = timed(csv_load, loads)
+    _, results['cache_write'] = timed(quiet(cold_cached_load), loads)
+    _, results['cached_load'] = timed(quiet(cached_load), loads)
+    stats, results['stats_build'] = timed(lambda: CricketStats(batting, bowling, schedule), loads)
+
+    rng = np.random.default_rng(0)
+    players = list(rng.choice(stats.players, min(SAMPLE, len(stats.players)), replace=False))
+    partials = [player.split()[0][:3].lower() for player in players]
+    teams = stats.teams
+    pairs = [(teams[i % len(teams)], teams[(i + 1) % len(teams)]) for i in range(SAMPLE)]
+    matches = list(rng.choice(stats.matches, min(SAMPLE, len(stats.matches)), replace=False))
+
+    def compare(pair):
+        stats.team_stats(pair[0])
+        stats.team_stats(pair[1])
+        stats.head_to_head(*pair)
+
+    per_key = {
+        'player_lookup': (stats.player_stats, players),
+        'player_partial_lookup': (stats.player_stats, partials),
+        'player_suggestions': (stats.player_suggestions, partials),
+        'team_comparison': (compare, pairs),
+        'match_summary': (stats.match_summary, matches),
+        'player_form': (lambda player: (stats.batting_form(player), stats.bowling_form(player)), players),
+    }
+    for name, (fn, keys) in per_key.items():
+        _, timings = timed(each(fn, keys), repeat)
+        results[name] = [t / len(keys) for t in timings]
+
+    results['batting_trend'] = timed(stats.batting_trend, repeat)[1]
+    results['bowling_trend'] = timed(stats.bowling_trend, repeat)[1]
+    results['win_rate_trend'] = timed(stats.win_rate_trend, repeat)[1]
+    results['team_trend'] = timed(stats.team_trend, repeat)[1]
+    # What the trends tab fetches: the trend prepared once per data version,
+    # then the whole range and a zoomed-in tenth sliced from it
+    last = float(stats.batting_trend().index.max())
+
+    def win_rate_view():
+        stats.trend_views.clear()
+        return stats.trend_window('win_rates', points=1200, top=10)
+    results['win_rate_view'] = timed(win_rate_view, repeat)[1]
+    results['win_rate_window'] = timed(lambda: stats.trend_window('win_rates', points=1200, top=10), repeat)[1]
+    results['win_rate_zoomed'] = timed(
+        lambda: stats.trend_window('win_rates', last * 0.45, last * 0.55, points=1200, top=10), repeat)[1]
+    results['players_in_form'] = timed(lambda: stats.players_in_form('Average', 10), repeat)[1]
+
+    def leaderboard_build():
+        stats.__dict__.pop('leaderboard', None)
+        return stats.leaderboard
+
+    results['leaderboard_build'] = timed(leaderboard_build, loads)[1]
+    results['leaderboard_page'] = timed(
+        lambda: stats.top_players('Runs', positions=[1, 2], ranges={'Strike_Rate': (100, None)}, page=1), repeat)[1]
+
+    return {
+        'rows': {'batting': len(batting), 'bowling': len(bowling), 'schedule': len(schedule)},
+        'stages': {name: summarize(timings) for name, timings in results.items()},
+    }
+
+
+def environment():
+    try:
+        commit = subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except OSError:
+        commit = ''
+    return {
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        'commit': commit or None,
+        'python': platform.python_version(),
+        'pandas': pd.__version__,
+        'numpy': np.__version__,
+        'platform': platform.platform(),
+    }
+
+
+def regressions(results, baseline, threshold):
+    # (scale, stage, baseline median, current median) for every slowdown;
+    # stages that take less than NOISE_MS are too close to timer noise
+    slower = []
+    for scale, current in results['scales'].items():
+        previous = baseline.get('scales', {}).get(scale)
+        if previous is None:
+            continue
+        for stage, timing in current['stages'].items():
+            before = previous['stages'].get(stage)
+            if before and max(before['median_ms'], timing['median_ms']) >= NOISE_MS \
+                    and timing['median_ms'] > before['median_ms'] * threshold:
+                slower.append((scale, stage, before['median_ms'], timing['median_ms']))
+    return slower
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark data loading and analysis queries.")
+    parser.add_argument('--scale', type=int, action='append', help=f"size multiple (default {SCALES})")
+    parser.add_argument('--repeat', type=int, default=20, help="runs per query stage (default %(default)s)")
+    parser.add_argument('--output', help="write results as JSON to this file")
+    parser.add_argument('--baseline', help="earlier --output file to compare against")
+    parser.add_argument('--threshold', type=float, default=1.25,
+                        help="slowdown factor counted as a regression (default %(default)s)")
+    args = parser.parse_args()
+
+    results = {'environment': environment(), 'data_dir': DATA_DIR, 'scales': {}}
+    print(f"{'scale':>6} {'stage':<22} {'mean':>10} {'median':>10} {'p95':>10}")
+    for scale in args.scale or SCALES:
+        result = bench_scale(scale, args.repeat)
+        results['scales'][f'x{scale}'] = result
+        for stage, timing in result['stages'].items():
+            print(f"{'x' + str(scale):>6} {stage:<22} {timing['mean_ms']:>8.3f}ms "
+                  f"{timing['median_ms']:>8.3f}ms {timing['p95_ms']:>8.3f}ms")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"Wrote {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            slower = regressions(results, json.load(f), args.threshold)
+        for scale, stage, before, after in slower:
+            print(f"Regression: {scale} {stage} {before:.3f}ms -> {after:.3f}ms ({after / before:.2f}x)")
+        if slower:
+            sys.exit(1)
+        print(f"No stage slower than {args.threshold}x the baseline")
+
+
+if __name__ == '__main__':
+    main()
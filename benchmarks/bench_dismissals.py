@@ -0,0 +1,95 @@
+# Throughput of the Dismissal column parser.
+#
+#   python benchmarks/bench_dismissals.py [rows]
+#
+# Writes a synthetic batting scorecard (1M rows by default) to a temporary
+# directory, reads it back and reports rows/sec for parse_dismissals on the
+# plain object column and on the categorical column the schema produces,
+# next to a per-row regex loop over a sample for comparison.
+import os
+import random
+import re
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dismissals import DISMISSAL_PATTERNS, parse_dismissals
+
+SYLLABLES = ['ka', 'ra', 'sh', 'an', 'de', 'mo', 'li', 'tu', 'vi', 'ja', 'el', 'son',
+             'ham', 'ul', 'ba', 'zi', 'ck', 'ro', 'ne', 'ta', 'ar', 'wi', 'ge', 'pa']
+TEMPLATES = [
+    (30, 'c {f} b {b}'), (20, 'b {b}'), (15, 'not out'), (12, 'lbw b {b}'),
+    (6, 'run out ({f}/{g})'), (4, 'st †{f} b {b}'), (3, 'c & b {b}'),
+    (2, 'run out {f}'), (1, 'hit wicket b {b}'), (1, 'retired hurt'),
+]
+ROWS = 1_000_000
+SAMPLE = 50_000
+
+
+def make_names(count, rng):
+    names = set()
+    while len(names) < count:
+        first = ''.join(rng.choice(SYLLABLES) for _ in range(2)).title()
+        last = ''.join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 3))).title()
+        names.add(f"{first} {last}")
+    return sorted(names)
+
+
+def make_dismissals(rows, seed=0):
+    rng = random.Random(seed)
+    bowlers = make_names(150, rng)
+    fielders = make_names(300, rng)
+    weights = [weight for weight, _ in TEMPLATES]
+    templates = [template for _, template in TEMPLATES]
+    return [
+        rng.choices(templates, weights)[0].format(b=rng.choice(bowlers), f=rng.choice(fielders),
+                                                  g=rng.choice(fielders))
+        for _ in range(rows)
+    ]
+
+
+def parse_row(text, patterns):
+    # The per-row alternative: try each pattern on every row
+    lowered = text.strip().lower()
+    for name, pattern in patterns:
+        match = pattern.match(lowered)
+        if match:
+            return name, match.groupdict()
+    return 'other', {}
+
+
+def timed(label, rows, work):
+    start = time.perf_counter()
+    work()
+    elapsed = time.perf_counter() - start
+    print(f"  {label:<28} {elapsed:8.3f} s  {rows / elapsed:>14,.0f} rows/s")
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else ROWS
+    dismissals = make_dismissals(rows)
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'batting_summary.csv')
+        pd.DataFrame({'Match_no': 1, 'Dismissal': dismissals}).to_csv(path, index=False)
+
+        print(f"{rows:,} rows, {len(set(dismissals)):,} distinct dismissal strings")
+        timed('read_csv', rows, lambda: pd.read_csv(path))
+        column = pd.read_csv(path)['Dismissal']
+
+    categorical = column.astype('category')
+    timed('parse (object column)', rows, lambda: parse_dismissals(column))
+    timed('parse (categorical column)', rows, lambda: parse_dismissals(categorical))
+
+    patterns = [(name, re.compile(pattern)) for name, pattern in DISMISSAL_PATTERNS]
+    sample = column.iloc[:SAMPLE].tolist()
+    timed(f'per-row regex ({len(sample):,} rows)', len(sample),
+          lambda: [parse_row(text, patterns) for text in sample])
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,69 @@
+# Per-keystroke latency of the SearchBox autocompletion index.
+#
+#   python benchmarks/bench_search.py
+#
+# Types a set of queries one character at a time against synthetic rosters
+# of 1k, 10k and 100k names and reports the index lookup time per keystroke,
+# next to the old substring scan over every name for comparison.
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from search_index import SearchIndex
+
+SYLLABLES = ['ka', 'ra', 'sh', 'an', 'de', 'mo', 'li', 'tu', 'vi', 'ja', 'el', 'son',
+             'ham', 'ul', 'ba', 'zi', 'ck', 'ro', 'ne', 'ta', 'ar', 'wi', 'ge', 'pa']
+QUERIES = ['kar', 'Rash', 'son', 'de ka', 'vir', 'tuli', 'zzq']
+SIZES = [1_000, 10_000, 100_000]
+
+
+def make_names(count, seed=0):
+    rng = random.Random(seed)
+    names = set()
+    while len(names) < count:
+        first = ''.join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 3))).title()
+        last = ''.join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4))).title()
+        names.add(f"{first} {last}")
+    return sorted(names)
+
+
+def keystrokes():
+    for query in QUERIES:
+        for i in range(1, len(query) + 1):
+            yield query[:i]
+
+
+def time_per_keystroke(search):
+    timings = []
+    for text in keystrokes():
+        start = time.perf_counter()
+        search(text)
+        timings.append(time.perf_counter() - start)
+    timings.sort()
+    mean = sum(timings) / len(timings)
+    p95 = timings[int(len(timings) * 0.95) - 1]
+    return mean * 1000, p95 * 1000
+
+
+def main():
+    print(f"{'names':>8} {'build ms':>9} {'index mean':>11} {'index p95':>10} {'scan mean':>10} {'scan p95':>9}")
+    for size in SIZES:
+        names = make_names(size)
+
+        start = time.perf_counter()
+        index = SearchIndex(names)
+        build = (time.perf_counter() - start) * 1000
+
+        index_mean, index_p95 = time_per_keystroke(lambda text: index.search(text, 10))
+        scan_mean, scan_p95 = time_per_keystroke(
+            lambda text: [name for name in names if text.lower() in name.lower()]
+        )
+        print(f"{size:>8} {build:>9.1f} {index_mean:>9.3f}ms {index_p95:>8.3f}ms "
+              f"{scan_mean:>8.3f}ms {scan_p95:>7.3f}ms")
+
+
+if __name__ == '__main__':
+    main()
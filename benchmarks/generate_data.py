@@ -0,0 +1,148 @@
+# Synthetic scorecards in the shipped CSV layout, at a multiple of the
+# shipped size.
+#
+#   python benchmarks/generate_data.py --scale 10 [--scale 100 ...]
+#
+# Writes batting_summary.csv, bowling_summary.csv and
+# match_schedule_results.csv to <out>/x<scale>/ (benchmarks/data by
+# default). The shipped files cover 48 matches with ~950 batting and ~575
+# bowling rows; scale N generates 48 * N matches with the same per-innings
+# shape (9-11 batters, 5-7 bowlers), the same column formats and the same
+# schedule quirks (space-padded team names). The number of teams grows with sqrt(N), so larger scales also
+# have more distinct players, teams and fixtures.
+import argparse
+import math
+import os
+import random
+
+import numpy as np
+import pandas as pd
+
+SYLLABLES = ['ka', 'ra', 'sh', 'an', 'de', 'mo', 'li', 'tu', 'vi', 'ja', 'el', 'son',
+             'ham', 'ul', 'ba', 'zi', 'ck', 'ro', 'ne', 'ta', 'ar', 'wi', 'ge', 'pa']
+VENUES = ['Ahmedabad', 'Hyderabad', 'Dharamsala', 'Delhi', 'Chennai', 'Lucknow', 'Pune',
+          'Bengaluru', 'Mumbai', 'Kolkata']
+MONTHS = ['October', 'November']
+BASE_MATCHES = 48
+SQUAD = 15
+SCALES = [1, 10, 100, 1000]
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data')
+
+
+def make_names(count, rng, words=2):
+    names = set()
+    while len(names) < count:
+        parts = [''.join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 3))).title() for _ in range(words)]
+        names.add(' '.join(parts))
+    return sorted(names)
+
+
+def dismissal(rng, bowlers, fielders):
+    kind = rng.random()
+    bowler = rng.choice(bowlers)
+    if kind < 0.53:
+        return f"c {rng.choice(fielders)} b {bowler}"
+    if kind < 0.70:
+        return f"b {bowler}"
+    if kind < 0.79:
+        return f"lbw b {bowler}"
+    if kind < 0.84:
+        return f"run out ({rng.choice(fielders)}/{rng.choice(fielders)})"
+    if kind < 0.86:
+        return f"st {rng.choice(fielders)} b {bowler}"
+    if kind < 0.88:
+        return f"c & b {bowler}"
+    return f"c {rng.choice(fielders)} b {bowler}"
+
+
+def generate(scale, seed=0):
+    rng = random.Random(seed)
+    np_rng = np.random.default_rng(seed)
+    n_teams = 10 * math.ceil(math.sqrt(scale))
+    teams = make_names(n_teams, rng, words=1)
+    squads = {team: make_names(SQUAD, random.Random(f'{seed}-{team}')) for team in teams}
+
+    batting, bowling, schedule = [], [], []
+    for match_no in range(1, BASE_MATCHES * scale + 1):
+        team1, team2 = rng.sample(teams, 2)
+        between = f"{team1} vs {team2}"
+        totals = {}
+        for batting_team, bowling_team in ((team1, team2), (team2, team1)):
+            squad, opponents = squads[batting_team], squads[bowling_team]
+            bowlers = rng.sample(opponents[5:], rng.randint(5, 7))
+
+            batters = rng.randint(9, 11)
+            runs = np.minimum(np_rng.geometric(1 / 27, batters) - 1, 200)
+            strike = np.clip(np_rng.normal(85, 25, batters), 20, 250)
+            balls = np.maximum(np.round(runs * 100 / strike), 1).astype(int)
+            fours = np_rng.binomial(runs // 4, 0.35)
+            sixes = np_rng.binomial(runs // 6, 0.1)
+            for position in range(batters):
+                out = position < batters - 1 or rng.random() < 0.3
+                batting.append((
+                    match_no, between, batting_team, squad[position], position + 1,
+                    dismissal(rng, bowlers, opponents) if out else 'not out',
+                    int(runs[position]), int(balls[position]), int(fours[position]), int(sixes[position]),
+                    round(runs[position] * 100 / balls[position], 1),
+                ))
+            totals[batting_team] = int(runs.sum())
+
+            wickets = np_rng.multinomial(min(batters - 1, 10), np.ones(len(bowlers)) / len(bowlers))
+            for bowler, taken in zip(bowlers, wickets):
+                overs = rng.choice([10, 10, 10, 9, 8, 7, 6, 5, 4, 3, 2, 1])
+                extra_balls = rng.randint(0, 5) if rng.random() < 0.2 else 0
+                conceded = int(np_rng.poisson(5.9 * (overs + extra_balls / 6)))
+                bowling.append((
+                    match_no, between, bowling_team, bowler, float(f"{overs - (extra_balls > 0)}.{extra_balls}"),
+                    int(np_rng.binomial(overs, 0.03)), conceded, int(taken),
+                    round(conceded / ((overs * 6 - (extra_balls > 0) * 6 + extra_balls) / 6), 2),
+                ))
+
+        winner = team1 if totals[team1] >= totals[team2] else team2
+        schedule.append((
+            match_no, f"{rng.choice(MONTHS)} {rng.randint(1, 30)}", rng.choice(VENUES),
+            team1 + ' ', ' ' + team2, winner,
+            f"https://example.invalid/scorecard/{match_no}.aspx",
+        ))
+
+    return (
+        pd.DataFrame(batting, columns=['Match_no', 'Match_Between', 'Team_Innings', 'Batsman_Name',
+                                       'Batting_Position', 'Dismissal', 'Runs', 'Balls', '4s', '6s',
+                                       'Strike_Rate']),
+        pd.DataFrame(bowling, columns=['Match_no', 'Match_Between', 'Bowling_Team', 'Bowler_Name', 'Overs',
+                                       'Maidens', 'Runs', 'Wickets', 'Economy']),
+        pd.DataFrame(schedule, columns=['Match_no', 'Date', 'Venue', 'Team1', 'Team2', 'Winner',
+                                        'Scorecard URL']),
+    )
+
+
+def write(scale, out=DATA_DIR, seed=0):
+    # Returns the directory holding the three CSVs; existing files are kept
+    directory = os.path.join(out, f'x{scale}')
+    paths = [os.path.join(directory, name) for name in
+             ('batting_summary.csv', 'bowling_summary.csv', 'match_schedule_results.csv')]
+    if all(os.path.exists(path) for path in paths):
+        return directory
+
+    os.makedirs(directory, exist_ok=True)
+    for frame, path in zip(generate(scale, seed), paths):
+        frame.to_csv(path, index=False)
+    return directory
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate synthetic scorecard CSVs.")
+    parser.add_argument('--scale', type=int, action='append', help=f"size multiple (default {SCALES})")
+    parser.add_argument('--out', default=DATA_DIR, help="output directory (default %(default)s)")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    for scale in args.scale or SCALES:
+        directory = write(scale, args.out, args.seed)
+        sizes = ', '.join(f"{name} {os.path.getsize(os.path.join(directory, name)) / 1e6:.1f} MB"
+                          for name in sorted(os.listdir(directory)) if name.endswith('.csv'))
+        print(f"x{scale}: {directory} ({sizes})")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,197 @@
+# Load test for query_server.py: many concurrent keep-alive clients sending
+# a mix of player, team, match, trend and chart requests.
+#
+#   python benchmarks/load_test.py --spawn [--concurrency 32] [--requests 5000]
+#   python benchmarks/load_test.py --url http://127.0.0.1:8765 --mix json
+#
+# --spawn starts a server on a free port for the run (otherwise --url must
+# point at a running one). Queries are drawn from the server's own selector
+# lists with a skew towards popular players and matches, the way several
+# analysts looking at the same games would. Reports requests/sec, latency
+# percentiles overall and per endpoint, and the server's cache and
+# coalescing counters for the run.
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+from urllib.parse import urlencode, urlsplit
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MIXES = {
+    'json': {'/player': 40, '/team': 20, '/match': 20, '/trend': 10, '/leaderboard': 10},
+    'png': {'/player.png': 40, '/team.png': 20, '/match.png': 20, '/trend.png': 20},
+    'all': {'/player': 30, '/team': 15, '/match': 15, '/trend': 10, '/leaderboard': 10, '/player.png': 8,
+            '/team.png': 4, '/match.png': 4, '/trend.png': 4},
+}
+TRENDS = ['batting', 'bowling', 'win_rates', 'form']
+
+
+async def request(reader, writer, host, target):
+    # One GET on an open connection; returns (status, body)
+    writer.write(f"GET {target} HTTP/1.1\r\nHost: {host}\r\n\r\n".encode('latin-1'))
+    await writer.drain()
+    status = int((await reader.readline()).split()[1])
+    length = 0
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b'\n', b''):
+            break
+        name, _, value = line.decode('latin-1').partition(':')
+        if name.strip().lower() == 'content-length':
+            length = int(value)
+    return status, await reader.readexactly(length)
+
+
+async def fetch_json(host, port, target):
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        status, body = await request(reader, writer, host, target)
+    finally:
+        writer.close()
+    if status != 200:
+        raise RuntimeError(f"{target}: HTTP {status}")
+    return json.loads(body)
+
+
+def skewed(rng, values):
+    # Zipf-like pick: a few values get most of the traffic
+    return values[min(int(rng.paretovariate(1.2)) - 1, len(values) - 1)]
+
+
+def make_targets(rng, count, mix, players, teams, matches):
+    paths = list(mix)
+    weights = [mix[path] for path in paths]
+    targets = []
+    for path in rng.choices(paths, weights, k=count):
+        if path in ('/player', '/player.png'):
+            params = {'name': skewed(rng, players)}
+            if path == '/player.png':
+                params['kind'] = 'batting'
+        elif path in ('/team', '/team.png'):
+            params = {'team': rng.sample(teams[:max(len(teams) // 2, 2)], 2)}
+        elif path in ('/match', '/match.png'):
+            params = {'match': skewed(rng, matches)}
+        elif path in ('/trend', '/trend.png'):
+            params = {'type': rng.choice(TRENDS)}
+        else:
+            params = {'metric': rng.choice(['Runs', 'Average', 'Wickets', 'Economy']),
+                      'page': min(int(rng.paretovariate(1.5)) - 1, 4)}
+        targets.append((path, f"{path}?{urlencode(params, doseq=True)}"))
+    return targets
+
+
+async def client(host, port, queue, results):
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        while True:
+            try:
+                path, target = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            start = time.perf_counter()
+            status, _ = await request(reader, writer, host, target)
+            results.append((path, status, (time.perf_counter() - start) * 1000))
+    finally:
+        writer.close()
+
+
+async def run(url, count, concurrency, mix, seed):
+    parts = urlsplit(url)
+    host, port = parts.hostname, parts.port or 80
+    players = await fetch_json(host, port, '/players')
+    teams = await fetch_json(host, port, '/teams')
+    matches = await fetch_json(host, port, '/matches')
+    rng = random.Random(seed)
+    # Popularity order is random, not alphabetical
+    rng.shuffle(players)
+    rng.shuffle(matches)
+
+    queue = asyncio.Queue()
+    for target in make_targets(rng, count, MIXES[mix], players, teams, matches):
+        queue.put_nowait(target)
+
+    before = await fetch_json(host, port, '/status')
+    results = []
+    start = time.perf_counter()
+    await asyncio.gather(*(client(host, port, queue, results) for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    after = await fetch_json(host, port, '/status')
+    server = {name: after[name] - before[name] for name in ('cache_hits', 'coalesced', 'computed', 'errors')}
+    return results, elapsed, server
+
+
+def percentiles(latencies):
+    values = np.percentile(latencies, [50, 90, 99]) if len(latencies) else [0.0] * 3
+    return {'p50_ms': round(float(values[0]), 2), 'p90_ms': round(float(values[1]), 2),
+            'p99_ms': round(float(values[2]), 2), 'max_ms': round(float(max(latencies, default=0.0)), 2)}
+
+
+def spawn_server(workers):
+    # A server on a free port; returns (process, url) once it is serving
+    process = subprocess.Popen([sys.executable, os.path.join(ROOT, 'query_server.py'), '--port', '0',
+                                '--workers', str(workers)],
+                               cwd=ROOT, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True)
+    for line in process.stdout:
+        if line.startswith('Serving on '):
+            return process, line.split()[2]
+    raise RuntimeError(f"Server exited with status {process.wait()}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the query server.")
+    parser.add_argument('--url', default='http://127.0.0.1:8765', help="server URL (default %(default)s)")
+    parser.add_argument('--spawn', action='store_true', help="start a server for the run instead of using --url")
+    parser.add_argument('--workers', type=int, default=4, help="with --spawn, server query threads")
+    parser.add_argument('--requests', type=int, default=2000, help="requests to send (default %(default)s)")
+    parser.add_argument('--concurrency', type=int, default=32, help="concurrent connections (default %(default)s)")
+    parser.add_argument('--mix', choices=list(MIXES), default='all', help="request mix (default %(default)s)")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help="write the results as JSON to this file")
+    args = parser.parse_args()
+
+    process = None
+    url = args.url
+    if args.spawn:
+        process, url = spawn_server(args.workers)
+    try:
+        results, elapsed, server = asyncio.run(run(url, args.requests, args.concurrency, args.mix, args.seed))
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait()
+
+    latencies = [ms for _, _, ms in results]
+    failed = sum(status != 200 for _, status, _ in results)
+    summary = dict({'requests': len(results), 'failed': failed, 'seconds': round(elapsed, 3),
+                    'requests_per_sec': round(len(results) / elapsed, 1) if elapsed else 0.0},
+                   **percentiles(latencies))
+    endpoints = {}
+    for path in sorted({path for path, _, _ in results}):
+        timings = [ms for name, _, ms in results if name == path]
+        endpoints[path] = dict({'requests': len(timings)}, **percentiles(timings))
+
+    print(f"{summary['requests']} requests ({failed} failed) in {elapsed:.2f}s: "
+          f"{summary['requests_per_sec']:.1f} req/s, p50 {summary['p50_ms']:.2f}ms, "
+          f"p90 {summary['p90_ms']:.2f}ms, p99 {summary['p99_ms']:.2f}ms")
+    print(f"{'endpoint':<14} {'requests':>8} {'p50':>10} {'p99':>10}")
+    for path, timing in endpoints.items():
+        print(f"{path:<14} {timing['requests']:>8} {timing['p50_ms']:>8.2f}ms {timing['p99_ms']:>8.2f}ms")
+    print(f"Server: {server['computed']} computed, {server['cache_hits']} cache hits, "
+          f"{server['coalesced']} coalesced, {server['errors']} errors")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({'url': url, 'concurrency': args.concurrency, 'mix': args.mix, 'summary': summary,
+                       'endpoints': endpoints, 'server': server}, f, indent=2)
+        print(f"Wrote {args.output}")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
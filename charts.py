@@ -0,0 +1,358 @@
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from downsample import OTHERS
+from form import FORM_WINDOW
+from tracing import span
+
+# Chart layouts used by the analysis tabs. Each chart builds its axes once on
+# a persistent Figure and afterwards only updates its artists in place, so a
+# new selection costs a data swap and a redraw instead of a new Figure.
+# Nothing here depends on tkinter; the GUI attaches a FigureCanvasTkAgg.
+
+
+class LRUCache:
+    def __init__(self, maxsize=8):
+        self.maxsize = maxsize
+        self.items = OrderedDict()
+
+    def get(self, key):
+        if key not in self.items:
+            return None
+        self.items.move_to_end(key)
+        return self.items[key]
+
+    def put(self, key, value):
+        self.items[key] = value
+        self.items.move_to_end(key)
+        while len(self.items) > self.maxsize:
+            self.items.popitem(last=False)
+
+    def clear(self):
+        self.items.clear()
+
+    def __len__(self):
+        return len(self.items)
+
+
+class ChartView:
+    # A figure and its canvas, kept for the lifetime of a tab.
+    #
+    # Every completed draw is snapshotted into a bounded LRU keyed by the
+    # selection and canvas size. Re-selecting a recent view restores that
+    # snapshot and blits it instead of re-rasterizing the figure.
+    def __init__(self, figure, canvas, cache_size=8):
+        self.figure = figure
+        self.canvas = canvas
+        self.cache = LRUCache(cache_size)
+        self.key = None
+        canvas.mpl_connect('draw_event', self.on_draw)
+
+    def cache_key(self, key):
+        return key, self.canvas.get_width_height()
+
+    def on_draw(self, event):
+        if self.key is not None:
+            self.cache.put(self.cache_key(self.key), self.canvas.copy_from_bbox(self.figure.bbox))
+
+    def refresh(self, key):
+        # Call after the chart's artists have been updated for `key`
+        self.key = key
+        background = self.cache.get(self.cache_key(key))
+        if background is not None:
+            with span("canvas blit"):
+                self.canvas.restore_region(background)
+                self.canvas.blit(self.figure.bbox)
+        else:
+            self.canvas.draw_idle()
+
+    def invalidate(self):
+        self.cache.clear()
+
+
+def set_bars(ax, bars, positions, heights, horizontal=False, color='C0'):
+    # Reuse the existing rectangles when the bar count is unchanged,
+    # otherwise replace the container
+    positions = np.asarray(positions, dtype=float)
+    heights = np.asarray(heights, dtype=float)
+    if bars is not None and len(bars) == len(positions):
+        for rect, position, height in zip(bars, positions, heights):
+            if horizontal:
+                rect.set_y(position - rect.get_height() / 2)
+                rect.set_width(height)
+            else:
+                rect.set_x(position - rect.get_width() / 2)
+                rect.set_height(height)
+        return bars
+    if bars is not None:
+        bars.remove()
+    if horizontal:
+        return ax.barh(positions, heights, color=color)
+    return ax.bar(positions, heights, color=color)
+
+
+def rescale(*axes):
+    for ax in axes:
+        ax.relim()
+        ax.autoscale_view()
+
+
+def numeric(values):
+    return pd.to_numeric(pd.Series(values), errors='coerce').to_numpy(dtype=float)
+
+
+class PlayerChart:
+    # Per-match bars (runs or wickets) next to a per-match line
+    # (strike rate or economy), optionally with rolling form lines over
+    # either panel
+    def __init__(self, figure, bar_title, bar_label, line_title, line_label, bar_form_label=None,
+                 line_form_label=None):
+        self.figure = figure
+        self.bar_title = bar_title
+        self.line_title = line_title
+
+        self.bar_ax = figure.add_subplot(121)
+        self.bar_ax.set_xlabel('Match Number')
+        self.bar_ax.set_ylabel(bar_label)
+        self.bar_ax.tick_params(axis='x', rotation=45)
+        self.bars = None
+
+        self.line_ax = figure.add_subplot(122)
+        self.line_ax.set_xlabel('Match Number')
+        self.line_ax.set_ylabel(line_label)
+        self.line_ax.tick_params(axis='x', rotation=45)
+        self.line, = self.line_ax.plot([], [], marker='o', color='C0', label='Per match')
+
+        self.bar_form = self.form_line(self.bar_ax, bar_form_label)
+        self.line_form = self.form_line(self.line_ax, line_form_label)
+
+    @staticmethod
+    def form_line(ax, label):
+        if label is None:
+            return None
+        line, = ax.plot([], [], color='C1', linewidth=2, zorder=3, label=label)
+        ax.legend(loc='upper left')
+        return line
+
+    def update(self, player, matches, bar_values, line_values, form=None):
+        # form: (matches, bar form values, line form values) or None
+        matches = numeric(matches)
+        self.bar_ax.set_title(f'{player} - {self.bar_title}')
+        self.bars = set_bars(self.bar_ax, self.bars, matches, numeric(bar_values))
+        self.line_ax.set_title(f'{player} - {self.line_title}')
+        self.line.set_data(matches, numeric(line_values))
+
+        form_matches, bar_form, line_form = form if form is not None else ([], [], [])
+        for line, values in ((self.bar_form, bar_form), (self.line_form, line_form)):
+            if line is not None:
+                line.set_data(numeric(form_matches), numeric(values))
+        rescale(self.bar_ax, self.line_ax)
+
+
+# The player tab's batting and bowling charts, shared with the query server
+# and the report export so all three draw the same figure
+
+def make_batting_chart(figure, window=FORM_WINDOW):
+    return PlayerChart(figure, 'Batting Performance', 'Runs', 'Strike Rate', 'Strike Rate',
+                       f'Average, last {window}', f'Strike rate, last {window}')
+
+
+def make_bowling_chart(figure, window=FORM_WINDOW):
+    return PlayerChart(figure, 'Bowling Performance', 'Wickets', 'Economy Rate', 'Economy Rate',
+                       line_form_label=f'Economy, last {window}')
+
+
+def player_plot(kind, rows, form):
+    # PlayerChart.update arguments for a player's 'batting' or 'bowling'
+    # rows and rolling form: ((matches, bars, line), form lines)
+    if kind == 'batting':
+        return ((numeric(rows['Match_no']), numeric(rows['Runs']), numeric(rows['Strike_Rate'])),
+                (numeric(form['Match_no']), numeric(form['Average']), numeric(form['Strike_Rate'])))
+    return ((numeric(rows['Match_no']), numeric(rows['Wickets']), numeric(rows['Economy'])),
+            (numeric(form['Match_no']), [], numeric(form['Economy'])))
+
+
+class TeamChart:
+    def __init__(self, figure):
+        self.figure = figure
+
+        self.runs_ax = figure.add_subplot(121)
+        self.runs_ax.set_title("Average Team Runs")
+        self.runs_ax.set_ylabel("Runs")
+        self.runs_bars = None
+
+        self.economy_ax = figure.add_subplot(122)
+        self.economy_ax.set_title("Average Team Economy")
+        self.economy_ax.set_ylabel("Economy Rate")
+        self.economy_bars = None
+
+    def update(self, teams, avg_runs, avg_economy):
+        positions = np.arange(len(teams))
+        self.runs_bars = set_bars(self.runs_ax, self.runs_bars, positions, avg_runs)
+        self.economy_bars = set_bars(self.economy_ax, self.economy_bars, positions, avg_economy)
+        for ax in (self.runs_ax, self.economy_ax):
+            ax.set_xticks(positions)
+            ax.set_xticklabels(teams)
+        rescale(self.runs_ax, self.economy_ax)
+
+
+class MatchChart:
+    def __init__(self, figure):
+        self.figure = figure
+
+        self.scores_ax = figure.add_subplot(121)
+        self.scores_ax.set_title("Team Scores")
+        self.scores_ax.set_ylabel("Runs")
+        self.scores_bars = None
+
+        self.top_ax = figure.add_subplot(122)
+        self.top_ax.set_title("Top 5 Batsmen")
+        self.top_bars = None
+
+    def update(self, team_scores, top_batsmen):
+        positions = np.arange(len(team_scores))
+        self.scores_bars = set_bars(self.scores_ax, self.scores_bars, positions, team_scores.to_numpy())
+        self.scores_ax.set_xticks(positions)
+        self.scores_ax.set_xticklabels(team_scores.index, rotation=90)
+
+        positions = np.arange(len(top_batsmen))
+        self.top_bars = set_bars(self.top_ax, self.top_bars, positions, top_batsmen['Runs'].to_numpy(),
+                                 horizontal=True)
+        self.top_ax.set_yticks(positions)
+        self.top_ax.set_yticklabels(top_batsmen['Batsman_Name'])
+        rescale(self.scores_ax, self.top_ax)
+
+
+class TrendChart:
+    # One axes per analysis type sharing the same slot in the figure;
+    # switching analysis only toggles which one is visible
+    def __init__(self, figure):
+        self.figure = figure
+        self.axes = {}
+        self.built = {}
+
+    def show(self, analysis_type, build):
+        # build(ax) may return an object to keep with the axes (TrendLines)
+        if analysis_type not in self.axes:
+            ax = self.figure.add_subplot(111, label=analysis_type)
+            self.built[analysis_type] = build(ax)
+            self.axes[analysis_type] = ax
+        for name, ax in self.axes.items():
+            ax.set_visible(name == analysis_type)
+
+    def reset(self):
+        for ax in self.axes.values():
+            ax.remove()
+        self.axes.clear()
+        self.built.clear()
+
+
+class TrendLines:
+    # Trend lines drawn at screen resolution. `fetch(start, end, points)`
+    # returns the trend for the match range [start, end] downsampled to
+    # about `points` x positions: a Series for one line or {name: Series}
+    # with each line on its own x, see downsample.TrendView.window. It is
+    # called for the whole range first and again for the visible range
+    # after every zoom, pan or resize, so the number of points drawn
+    # follows the axes width, not the length of the history. Those later
+    # fetches go through `submit(work, done)` when one is given (the GUI
+    # debounces them and runs them on its query threads) and the lines are
+    # redrawn when the result comes back. Values are multiplied by `scale`
+    # and `style` is passed to the lines (the grouped "Others" line is
+    # always grey and dashed).
+    def __init__(self, ax, fetch, scale=1, submit=None, **style):
+        self.ax = ax
+        self.fetch = fetch
+        self.scale = scale
+        self.submit = submit
+        self.style = style
+        self.lines = {}
+        self.view = None
+        with span("trend fetch"):
+            self.show(fetch(None, None, self.width()))
+        rescale(ax)
+        if len(self.lines) > 1:
+            ax.legend(loc='upper left', fontsize='small')
+        self.view = ax.get_xlim()
+        ax.callbacks.connect('xlim_changed', self.on_xlim)
+        ax.figure.canvas.mpl_connect('resize_event', self.on_resize)
+
+    def width(self):
+        return max(int(self.ax.get_window_extent().width), 1)
+
+    def load(self, start, end):
+        points = self.width()
+        if self.submit is None:
+            with span("trend fetch"):
+                self.show(self.fetch(start, end, points))
+            return
+        self.submit(lambda: self.fetch(start, end, points), self.redraw)
+
+    def show(self, data):
+        lines = {data.name: data} if isinstance(data, pd.Series) else data
+        for name, series in lines.items():
+            x = numeric(series.index)
+            y = numeric(series) * self.scale
+            line = self.lines.get(name)
+            if line is None:
+                style = {'color': 'grey', 'linestyle': '--'} if str(name).startswith(OTHERS) else self.style
+                line, = self.ax.plot(x, y, label=str(name), **style)
+                self.lines[name] = line
+            else:
+                line.set_data(x, y)
+        for name, line in self.lines.items():
+            if name not in lines:
+                line.set_data([], [])
+
+    def redraw(self, data):
+        self.show(data)
+        self.ax.figure.canvas.draw_idle()
+
+    def on_xlim(self, ax):
+        view = ax.get_xlim()
+        if view != self.view:
+            self.view = view
+            self.load(*view)
+
+    def on_resize(self, event):
+        if self.ax.get_visible() and self.view is not None:
+            self.load(*self.view)
+
+
+# Trend plots, shared by the trends tab and the query server. Each takes a
+# fetch function (and optionally a submit function) for TrendLines and
+# returns the TrendLines, which has to be kept alive for the zoom handling.
+
+def plot_batting_trend(ax, fetch, submit=None):
+    lines = TrendLines(ax, fetch, submit=submit)
+    ax.set_title("Tournament Batting Average Trend")
+    ax.set_xlabel("Match Number")
+    ax.set_ylabel("Average Runs")
+    return lines
+
+
+def plot_bowling_trend(ax, fetch, submit=None):
+    lines = TrendLines(ax, fetch, submit=submit, color='green')
+    ax.set_title("Tournament Bowling Economy Trend")
+    ax.set_xlabel("Match Number")
+    ax.set_ylabel("Economy Rate")
+    return lines
+
+
+def plot_win_rates(ax, fetch, submit=None):
+    # fetch returns the cumulative win rate (0-1) per team after each
+    # match, drawn as a percentage
+    lines = TrendLines(ax, fetch, scale=100, submit=submit)
+    ax.set_title("Team Win Rate Trends")
+    ax.set_xlabel("Match Number")
+    ax.set_ylabel("Win Rate (%)")
+    return lines
+
+
+def plot_form_leaders(ax, leaders, window):
+    leaders['Average'].iloc[::-1].plot(kind='barh', ax=ax, color='C1')
+    ax.set_title(f"Players in Form (average over the last {window} innings)")
+    ax.set_xlabel("Average Runs")
+    ax.set_ylabel("")
@@ -1,53 +1,85 @@
+import time
+
+_IMPORT_START = time.perf_counter()
+
+import argparse
+import sys
 import tkinter as tk
 from tkinter import ttk, messagebox
-import pandas as pd
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-import seaborn as sns
+# matplotlib is imported on first use, see CricketAnalyzer.create_chart_view
+from charts import (ChartView, MatchChart, TeamChart, TrendChart, make_batting_chart, make_bowling_chart,
+                    plot_batting_trend, plot_bowling_trend, plot_form_leaders, plot_win_rates, player_plot)
+from cricket_stats import CricketStats
+from leaderboard import METRICS, POSITION_GROUPS, ROLES
+from live_ingest import LiveIngest
+from player_profiles import load_profiles
+from query_server import RemoteStats
+from schema import load_schedule, load_scorecards
+from search_index import SearchIndex
+from startup_profile import StartupProfile
+from storage import CricketStore, StoreStats
+from summaries import batting_text, bowling_text, match_text, profile_text, team_text
+from task_runner import TaskRunner
+from tracing import span, traced, tracer
+
+_IMPORT_END = time.perf_counter()
 
 class SearchBox(ttk.Entry):
-    def __init__(self, parent, players, command, *args, **kwargs):
+    def __init__(self, parent, players, command, *args, limit=10, debounce_ms=150, **kwargs):
         ttk.Entry.__init__(self, parent, *args, **kwargs)
         self.players = players
         self.command = command
+        self.limit = limit
+        self.debounce_ms = debounce_ms
         self.filtered_players = []
         self.suggestion_window = None
+        self.listbox = None
+        self._pending = None
+        
+        # Ranked prefix/trigram index instead of scanning every name per keystroke
+        self.index = players if isinstance(players, SearchIndex) else SearchIndex(players)
         
         # Bind events
         self.bind('<KeyRelease>', self.on_key_release)
         self.bind('<FocusOut>', self.on_focus_out)
         self.bind('<Return>', self.on_return)
     
-    def show_suggestions(self):
-        if self.suggestion_window:
-            self.suggestion_window.destroy()
+    def create_suggestion_window(self):
+        # Built once and reused; only the listbox items change afterwards
+        self.suggestion_window = tk.Toplevel(self)
+        self.suggestion_window.overrideredirect(True)
+        self.suggestion_window.withdraw()
         
+        self.listbox = tk.Listbox(self.suggestion_window, width=self.winfo_width())
+        self.listbox.pack(fill='both', expand=True)
+        self.listbox.bind('<<ListboxSelect>>', lambda e: self.select_player(self.listbox))
+    
+    def show_suggestions(self):
         if not self.filtered_players:
+            self.hide_suggestions()
             return
         
-        # Create suggestion window
-        self.suggestion_window = tk.Toplevel()
-        self.suggestion_window.overrideredirect(True)
+        if self.suggestion_window is None:
+            self.create_suggestion_window()
+        
+        # Replace items in place
+        self.listbox.delete(0, 'end')
+        self.listbox.insert('end', *self.filtered_players)
+        
+        # Limit height based on number of suggestions
+        height = min(len(self.filtered_players), 5)
+        self.listbox.configure(height=height)
         
         # Position window below search box
         x = self.winfo_rootx()
         y = self.winfo_rooty() + self.winfo_height()
         self.suggestion_window.geometry(f"+{x}+{y}")
-        
-        # Create listbox for suggestions
-        listbox = tk.Listbox(self.suggestion_window, width=self.winfo_width())
-        listbox.pack(fill='both', expand=True)
-        
-        # Add suggestions to listbox
-        for player in self.filtered_players:
-            listbox.insert('end', player)
-        
-        # Bind selection
-        listbox.bind('<<ListboxSelect>>', lambda e: self.select_player(listbox))
-        
-        # Limit height based on number of suggestions
-        height = min(len(self.filtered_players), 5)
-        listbox.configure(height=height)
+        self.suggestion_window.deiconify()
+        self.suggestion_window.lift()
+    
+    def hide_suggestions(self):
+        if self.suggestion_window is not None:
+            self.suggestion_window.withdraw()
     
     def select_player(self, listbox):
         if not listbox.curselection():
@@ -55,283 +87,600 @@ class SearchBox(ttk.Entry):
         selection = listbox.get(listbox.curselection())
         self.delete(0, 'end')
         self.insert(0, selection)
-        if self.suggestion_window:
-            self.suggestion_window.destroy()
-            self.suggestion_window = None
+        self.hide_suggestions()
         self.command(selection)
     
     def on_key_release(self, event):
-        # Get current text
-        text = self.get().lower()
-        
-        # Filter players
-        self.filtered_players = [
-            player for player in self.players 
-            if text and text in player.lower()
-        ]
-        
-        # Show suggestions
-        self.show_suggestions()
+        # Debounce: only query the index once typing pauses
+        if self._pending is not None:
+            self.after_cancel(self._pending)
+        self._pending = self.after(self.debounce_ms, self.update_suggestions)
+    
+    def update_suggestions(self):
+        self._pending = None
+        tracer.begin("search")
+        with span("search filter"):
+            self.filtered_players = self.index.search(self.get(), self.limit)
+        with span("show suggestions"):
+            self.show_suggestions()
     
     def on_focus_out(self, event):
-        # Delay destruction to allow for selection
+        # Delay hiding to allow for selection
         if self.suggestion_window:
             self.after(100, self.destroy_suggestion_window)
     
     def destroy_suggestion_window(self):
-        if self.suggestion_window:
-            self.suggestion_window.destroy()
-            self.suggestion_window = None
+        self.hide_suggestions()
     
     def on_return(self, event):
+        if self._pending is not None:
+            self.after_cancel(self._pending)
+            self._pending = None
         text = self.get()
-        if text in self.players:
+        if text in self.index:
             self.command(text)
-        if self.suggestion_window:
-            self.suggestion_window.destroy()
-            self.suggestion_window = None
+        self.hide_suggestions()
+
+ALL = "All"
+BOARD_COLUMNS = ['Rank', 'Player', 'Team', 'Role', 'Innings', 'Runs', 'Average', 'Strike_Rate', 'Boundaries',
+                 'Spells', 'Wickets', 'Economy']
+BOARD_PAGE_SIZE = 25
+TREND_TOP_CHOICES = ['5', '10', '20', ALL]
+# Zoom, pan and resize re-fetch the visible trend range once the view has
+# been still this long
+TREND_FETCH_DELAY_MS = 100
+PROFILE_FILTERS = [("Playing role:", 'playingRole'), ("Batting style:", 'battingStyle'),
+                   ("Bowling style:", 'bowlingStyle')]
+
+
+def none_if_all(value):
+    return None if value == ALL else value
+
+
+def board_cell(value):
+    # Rates with two decimals, blanks for players without that side of the game
+    if isinstance(value, float):
+        return '' if value != value else f"{value:.2f}"
+    return value
+
 
 class CricketAnalyzer:
-    def __init__(self, root):
+    def __init__(self, root, workers=2, profile=None, store=None, tournament=None, watch_ms=None,
+                 overlay=False, server=None):
         self.root = root
+        self.profile = profile
+        self.watch_ms = watch_ms
+        self.live = None
+        self.current_player = None
         self.root.title("Cricket Match Analysis")
         self.root.geometry("1200x800")
         
         # Load data
         try:
-            self.batting_data = pd.read_csv('batting_summary.csv')
-            self.bowling_data = pd.read_csv('bowling_summary.csv')
-            print("Data loaded successfully")
+            if store is not None:
+                # Database backend: selectors load up front, every query
+                # reads only its own rows
+                self.stats = StoreStats(store, tournament)
+                self.profiles = self.stats.player_profiles()
+                self.mark("store opened")
+            elif server is not None:
+                # Remote backend: a query server holds the data, every
+                # query is one request to it
+                self.stats = RemoteStats(server)
+                self.profiles = self.stats.player_profiles()
+                self.mark("server connected")
+            else:
+                if watch_ms:
+                    # Offsets are taken before loading so no appended row is missed
+                    self.live = LiveIngest()
+                self.load_data()
         except Exception as e:
             messagebox.showerror("Error", f"Error loading data: {e}")
             return
         
+        # Queries run on a thread pool (workers=0 keeps them on the Tk thread)
+        self.busy_indicators = {}
+        self.runner = TaskRunner(self.root, max_workers=workers,
+                                 on_busy=self.set_busy, on_error=self.show_query_error)
+        
+        # The search box, chart figures and canvases are created on first use
+        self.search_box = None
+        self.batting_view = self.bowling_view = None
+        self.team_view = self.match_view = self.trend_view = None
+        self.trend_fetch = None
+        
+        # Optional status bar with the timing breakdown of the last action
+        self.overlay = None
+        self.overlay_version = None
+        if overlay:
+            tracer.keep_last()
+            self.overlay = ttk.Label(self.root, anchor='w', justify='left', relief='sunken',
+                                     font=('TkFixedFont', 9))
+            self.overlay.pack(side='bottom', fill='x')
+            self.root.after(250, self.update_overlay)
+        
         # Create notebook for tabs
         self.notebook = ttk.Notebook(self.root)
         self.notebook.pack(fill='both', expand=True, padx=5, pady=5)
         
-        # Create tabs
-        self.create_player_analysis_tab()
-        self.create_team_analysis_tab()
-        self.create_match_analysis_tab()
-        self.create_performance_trends_tab()
+        # Create empty tabs; each one is populated the first time it is shown
+        self.tab_builders = {}
+        self.tab_refreshers = {}
+        self.stale_tabs = set()
+        self.add_tab("Player Analysis", self.create_player_analysis_tab, self.refresh_player_tab)
+        self.add_tab("Team Analysis", self.create_team_analysis_tab, self.refresh_team_tab)
+        self.add_tab("Match Analysis", self.create_match_analysis_tab, self.refresh_match_tab)
+        self.add_tab("Performance Trends", self.create_performance_trends_tab, self.refresh_trends_tab)
+        self.add_tab("Leaderboards", self.create_leaderboard_tab, self.refresh_leaderboard_tab)
+        self.notebook.bind('<<NotebookTabChanged>>', self.on_tab_changed)
+        self.on_tab_changed()
+        
+        if self.live is not None:
+            self.root.after(self.watch_ms, self.poll_live)
+        
+        if self.profile:
+            self.root.bind('<Map>', self.on_first_map, add='+')
+    
+    def load_data(self):
+        # Parsed columns are cached on disk and reused while the CSVs are
+        # unchanged, then converted to the compact typed schema
+        tracer.begin("load")
+        with span("load scorecards"):
+            self.batting_data, self.bowling_data = load_scorecards()
+        with span("load schedule"):
+            self.schedule = load_schedule(teams=self.batting_data['Team_Innings'].cat.categories)
+        print("Data loaded successfully")
+        self.mark("data loaded")
+        
+        # All aggregates are computed once, the tabs only look them up
+        with span("compute stats"):
+            self.stats = CricketStats(self.batting_data, self.bowling_data, self.schedule)
+        self.mark("stats computed")
+        
+        # Profile columns and filter indexes now; biographies on demand
+        with span("load profiles"):
+            self.profiles = load_profiles()
+        self.mark("profiles indexed")
+    
+    def mark(self, name):
+        if self.profile:
+            self.profile.mark(name)
+    
+    def on_first_map(self, event):
+        if event.widget is not self.root or self.profile.reported:
+            return
+        self.mark("first window mapped")
+        self.root.after_idle(self.profile.report)
     
-    def create_player_analysis_tab(self):
+    def update_overlay(self):
+        # Polled rather than pushed: spans also close on worker threads
+        if tracer.version != self.overlay_version:
+            self.overlay_version = tracer.version
+            action, spans, total = tracer.breakdown()
+            lines = [f"{action or '-'}: {total:.1f} ms"]
+            lines += [f"{'  ' * (depth + 1)}{name:<24} {ms:8.1f} ms" for name, ms, depth in spans]
+            self.overlay.configure(text="\n".join(lines))
+        self.root.after(250, self.update_overlay)
+    
+    def add_tab(self, text, builder, refresh):
         tab = ttk.Frame(self.notebook)
-        self.notebook.add(tab, text="Player Analysis")
-        
+        self.notebook.add(tab, text=text)
+        self.tab_builders[str(tab)] = builder
+        self.tab_refreshers[str(tab)] = refresh
+    
+    def on_tab_changed(self, event=None):
+        tab = self.notebook.select()
+        builder = self.tab_builders.pop(tab, None)
+        if builder is not None:
+            tracer.begin(f"build {self.notebook.tab(tab, 'text')}")
+            with span("build tab"):
+                builder(self.notebook.nametowidget(tab))
+            self.mark(f"{self.notebook.tab(tab, 'text')} tab built")
+        elif tab in self.stale_tabs:
+            # New data arrived while this tab was hidden
+            self.stale_tabs.discard(tab)
+            self.tab_refreshers[tab]()
+    
+    def poll_live(self):
+        # Tail parsing, the frame merge and the search index update run on
+        # a worker; the aggregate update and repaint happen in
+        # apply_live_update on the Tk thread
+        batting, bowling = self.batting_data, self.bowling_data
+        index = self.search_box.index if self.search_box is not None else None
+        self.runner.submit('ingest', lambda: self.poll_scorecards(batting, bowling, index), self.apply_live_update)
+    
+    def poll_scorecards(self, batting, bowling, index):
+        # Worker side of poll_live. New batter names go into a copy of the
+        # search index (the search box keeps using `index` meanwhile); with
+        # no new names it is the same index.
+        update = self.live.poll(batting, bowling)
+        if update is not None and not update['reload'] and index is not None:
+            names = update['batting']['Batsman_Name'].iloc[len(batting):].dropna().unique()
+            update['search_index'] = index.extended(names)
+        return update
+    
+    def apply_live_update(self, update):
+        if update is None:
+            self.root.after(self.watch_ms, self.poll_live)
+            return
+        # The stats are updated in place, so wait until no query is reading them
+        self.runner.exclusive('ingest', lambda: self.apply_update(update))
+    
+    def apply_update(self, update):
+        start = time.perf_counter()
+        tracer.begin("ingest")
+        if update['reload']:
+            print("Scorecard file rewritten, reloading")
+            self.live = LiveIngest()
+            self.load_data()
+            if self.search_box is not None:
+                self.search_box.index = SearchIndex(self.stats.players)
+        else:
+            self.batting_data, self.bowling_data = update['batting'], update['bowling']
+            if 'schedule' in update:
+                self.schedule = update['schedule']
+            with span("extend stats"):
+                self.stats.extend(self.batting_data, self.bowling_data, update.get('schedule'))
+            if 'search_index' in update:
+                self.search_box.index = update['search_index']
+            print(f"Ingested {update['batting_rows']} batting and {update['bowling_rows']} bowling rows "
+                  f"in {time.perf_counter() - start:.3f}s")
+        self.refresh_tabs()
+        self.root.after(self.watch_ms, self.poll_live)
+    
+    def refresh_tabs(self):
+        # Repaint the visible tab now; other built tabs repaint when shown
+        visible = self.notebook.select()
+        for tab, refresh in self.tab_refreshers.items():
+            if tab in self.tab_builders:
+                continue  # not built yet, will read the new data when it is
+            if tab == visible:
+                refresh()
+            else:
+                self.stale_tabs.add(tab)
+    
+    def refresh_player_tab(self):
+        # The index itself is kept current by apply_update; it only falls
+        # behind when the tab was built while a poll was running
+        self.search_box.players = self.stats.players
+        if len(self.search_box.index) != len(self.search_box.players):
+            self.search_box.index = SearchIndex(self.search_box.players)
+        for view in (self.batting_view, self.bowling_view):
+            if view is not None:
+                view.invalidate()
+        if self.current_player:
+            self.update_player_analysis(self.current_player)
+    
+    def refresh_team_tab(self):
+        for combobox in (self.team1_cb, self.team2_cb):
+            combobox.configure(values=self.stats.teams)
+        if self.team_view is not None:
+            self.team_view.invalidate()
+        self.update_team_analysis()
+    
+    def refresh_match_tab(self):
+        self.match_cb.configure(values=self.stats.matches)
+        if self.match_view is not None:
+            self.match_view.invalidate()
+        self.update_match_analysis()
+    
+    def refresh_trends_tab(self):
+        if self.trend_view is None:
+            return
+        self.trend_chart.reset()
+        self.trend_view.invalidate()
+        self.update_trends()
+    
+    def refresh_leaderboard_tab(self):
+        self.board_team_cb.configure(values=[ALL] + self.stats.teams)
+        self.update_leaderboard()
+    
+    def create_chart_view(self, master, figsize, make_chart):
+        # Deferred matplotlib import: paid when the first chart is shown
+        first = 'matplotlib' not in sys.modules
+        from matplotlib.figure import Figure
+        from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+        if first:
+            self.mark("matplotlib imported")
+        
+        with span("figure create"):
+            fig = Figure(figsize=figsize)
+            canvas = FigureCanvasTkAgg(fig, master=master)
+            chart = make_chart(fig)
+        # draw_idle ends up in canvas.draw, so this times every full render
+        canvas.draw = traced("canvas draw", canvas.draw)
+        return chart, ChartView(fig, canvas)
+    
+    def create_player_analysis_tab(self, tab):
         # Player selection frame
         select_frame = ttk.LabelFrame(tab, text="Search Player", padding="5")
         select_frame.pack(fill='x', padx=5, pady=5)
         
         # Create search box with auto-suggestions
-        players = sorted(self.batting_data['Batsman_Name'].unique())
+        players = self.stats.players
         ttk.Label(select_frame, text="Search:").pack(side='left', padx=5)
         self.search_box = SearchBox(select_frame, players, self.update_player_analysis)
         self.search_box.pack(side='left', padx=5, fill='x', expand=True)
+        self.busy_indicators['player'] = ttk.Progressbar(select_frame, mode='indeterminate', length=80)
         
         # Stats display frame
         self.player_stats_frame = ttk.Frame(tab)
         self.player_stats_frame.pack(fill='both', expand=True, padx=5, pady=5)
-    
-    def create_team_analysis_tab(self):
-        tab = ttk.Frame(self.notebook)
-        self.notebook.add(tab, text="Team Analysis")
         
+        # Widgets are created once and shown/hidden per selection
+        self.player_error_label = ttk.Label(self.player_stats_frame, foreground='red', justify='center')
+        self.player_suggestion_label = ttk.Label(self.player_stats_frame, foreground='blue')
+        self.profile_label = ttk.Label(self.player_stats_frame, justify='left', wraplength=1100)
+        self.batting_label = ttk.Label(self.player_stats_frame, justify='left')
+        self.bowling_label = ttk.Label(self.player_stats_frame, justify='left')
+    
+    def create_team_analysis_tab(self, tab):
         # Team selection frame
         select_frame = ttk.LabelFrame(tab, text="Select Teams", padding="5")
         select_frame.pack(fill='x', padx=5, pady=5)
         
-        teams = sorted(self.batting_data['Team_Innings'].unique())
+        teams = self.stats.teams
         
         ttk.Label(select_frame, text="Team 1:").pack(side='left', padx=5)
         self.team1_var = tk.StringVar()
-        team1_cb = ttk.Combobox(select_frame, textvariable=self.team1_var, values=teams)
-        team1_cb.pack(side='left', padx=5)
+        self.team1_cb = ttk.Combobox(select_frame, textvariable=self.team1_var, values=teams)
+        self.team1_cb.pack(side='left', padx=5)
         
         ttk.Label(select_frame, text="Team 2:").pack(side='left', padx=5)
         self.team2_var = tk.StringVar()
-        team2_cb = ttk.Combobox(select_frame, textvariable=self.team2_var, values=teams)
-        team2_cb.pack(side='left', padx=5)
+        self.team2_cb = ttk.Combobox(select_frame, textvariable=self.team2_var, values=teams)
+        self.team2_cb.pack(side='left', padx=5)
         
         ttk.Button(select_frame, text="Compare", command=self.update_team_analysis).pack(side='left', padx=5)
+        self.busy_indicators['team'] = ttk.Progressbar(select_frame, mode='indeterminate', length=80)
         
         # Team stats frame
         self.team_stats_frame = ttk.Frame(tab)
         self.team_stats_frame.pack(fill='both', expand=True, padx=5, pady=5)
-    
-    def create_match_analysis_tab(self):
-        tab = ttk.Frame(self.notebook)
-        self.notebook.add(tab, text="Match Analysis")
         
+        self.team_label = ttk.Label(self.team_stats_frame, justify='left')
+    
+    def create_match_analysis_tab(self, tab):
         # Match selection frame
         select_frame = ttk.LabelFrame(tab, text="Select Match", padding="5")
         select_frame.pack(fill='x', padx=5, pady=5)
         
-        matches = sorted(self.batting_data['Match_Between'].unique())
+        matches = self.stats.matches
         ttk.Label(select_frame, text="Match:").pack(side='left', padx=5)
         self.match_var = tk.StringVar()
-        match_cb = ttk.Combobox(select_frame, textvariable=self.match_var, values=matches)
-        match_cb.pack(side='left', padx=5)
-        match_cb.bind('<<ComboboxSelected>>', self.update_match_analysis)
+        self.match_cb = ttk.Combobox(select_frame, textvariable=self.match_var, values=matches)
+        self.match_cb.pack(side='left', padx=5)
+        self.match_cb.bind('<<ComboboxSelected>>', self.update_match_analysis)
+        self.busy_indicators['match'] = ttk.Progressbar(select_frame, mode='indeterminate', length=80)
         
         # Match stats frame
         self.match_stats_frame = ttk.Frame(tab)
         self.match_stats_frame.pack(fill='both', expand=True, padx=5, pady=5)
-    
-    def create_performance_trends_tab(self):
-        tab = ttk.Frame(self.notebook)
-        self.notebook.add(tab, text="Performance Trends")
         
+        self.match_label = ttk.Label(self.match_stats_frame, justify='left')
+    
+    def create_performance_trends_tab(self, tab):
         # Controls frame
         controls_frame = ttk.LabelFrame(tab, text="Select Analysis", padding="5")
         controls_frame.pack(fill='x', padx=5, pady=5)
         
-        analysis_types = ["Batting Averages", "Bowling Economy", "Team Win Rates"]
+        analysis_types = ["Batting Averages", "Bowling Economy", "Team Win Rates", "Players in Form"]
         self.trend_var = tk.StringVar(value=analysis_types[0])
         for analysis in analysis_types:
             ttk.Radiobutton(controls_frame, text=analysis, value=analysis, 
                           variable=self.trend_var, command=self.update_trends).pack(side='left', padx=5)
         
+        # Teams drawn in the win rate chart; the rest become one "Others" line
+        self.trend_top_var = tk.StringVar(value='10')
+        top_cb = ttk.Combobox(controls_frame, textvariable=self.trend_top_var, values=TREND_TOP_CHOICES,
+                              state='readonly', width=5)
+        top_cb.pack(side='right', padx=5)
+        top_cb.bind('<<ComboboxSelected>>', self.update_trend_top)
+        ttk.Label(controls_frame, text="Top teams:").pack(side='right')
+        
         # Trends display frame
         self.trends_frame = ttk.Frame(tab)
         self.trends_frame.pack(fill='both', expand=True, padx=5, pady=5)
 
+    def create_leaderboard_tab(self, tab):
+        # Filter frame
+        controls_frame = ttk.LabelFrame(tab, text="Leaderboard", padding="5")
+        controls_frame.pack(fill='x', padx=5, pady=5)
+        
+        self.board_metric_var = tk.StringVar(value='Runs')
+        self.board_team_var = tk.StringVar(value=ALL)
+        self.board_position_var = tk.StringVar(value=ALL)
+        self.board_role_var = tk.StringVar(value=ALL)
+        self.board_page = 0
+        selectors = [
+            ("Metric:", self.board_metric_var, list(METRICS), 12),
+            ("Team:", self.board_team_var, [ALL] + self.stats.teams, 16),
+            ("Batting:", self.board_position_var, [ALL] + list(POSITION_GROUPS), 18),
+            ("Role:", self.board_role_var, [ALL] + ROLES, 12),
+        ]
+        for label, variable, values, width in selectors:
+            ttk.Label(controls_frame, text=label).pack(side='left', padx=5)
+            combobox = ttk.Combobox(controls_frame, textvariable=variable, values=values, width=width,
+                                    state='readonly')
+            combobox.pack(side='left', padx=5)
+            combobox.bind('<<ComboboxSelected>>', lambda event: self.update_leaderboard(page=0))
+            if variable is self.board_team_var:
+                self.board_team_cb = combobox
+        
+        ttk.Label(controls_frame, text="Min innings:").pack(side='left', padx=5)
+        self.board_min_var = tk.IntVar(value=1)
+        spinbox = ttk.Spinbox(controls_frame, from_=1, to=100, width=4, textvariable=self.board_min_var,
+                              command=lambda: self.update_leaderboard(page=0))
+        spinbox.pack(side='left', padx=5)
+        spinbox.bind('<Return>', lambda event: self.update_leaderboard(page=0))
+        
+        # With a store, rank this tournament or the whole store
+        self.board_career_var = tk.BooleanVar(value=False)
+        if isinstance(self.stats, StoreStats):
+            ttk.Checkbutton(controls_frame, text="All tournaments", variable=self.board_career_var,
+                            command=lambda: self.update_leaderboard(page=0)).pack(side='left', padx=5)
+        self.busy_indicators['leaderboard'] = ttk.Progressbar(controls_frame, mode='indeterminate', length=80)
+        
+        # Filters from the player profiles, when there are any
+        self.board_profile_vars = {}
+        if self.profiles is not None:
+            profile_frame = ttk.Frame(tab)
+            profile_frame.pack(fill='x', padx=5)
+            for label, column in PROFILE_FILTERS:
+                variable = self.board_profile_vars[column] = tk.StringVar(value=ALL)
+                ttk.Label(profile_frame, text=label).pack(side='left', padx=5)
+                combobox = ttk.Combobox(profile_frame, textvariable=variable, state='readonly', width=22,
+                                        values=[ALL] + self.profiles.values(column))
+                combobox.pack(side='left', padx=5)
+                combobox.bind('<<ComboboxSelected>>', lambda event: self.update_leaderboard(page=0))
+        
+        # Page navigation
+        nav_frame = ttk.Frame(tab)
+        nav_frame.pack(side='bottom', fill='x', padx=5, pady=5)
+        self.board_prev = ttk.Button(nav_frame, text="< Previous",
+                                     command=lambda: self.update_leaderboard(page=self.board_page - 1))
+        self.board_prev.pack(side='left', padx=5)
+        self.board_next = ttk.Button(nav_frame, text="Next >",
+                                     command=lambda: self.update_leaderboard(page=self.board_page + 1))
+        self.board_next.pack(side='left', padx=5)
+        self.board_page_label = ttk.Label(nav_frame)
+        self.board_page_label.pack(side='left', padx=10)
+        
+        # Results table
+        table_frame = ttk.Frame(tab)
+        table_frame.pack(fill='both', expand=True, padx=5, pady=5)
+        self.board_tree = ttk.Treeview(table_frame, columns=BOARD_COLUMNS, show='headings')
+        for column in BOARD_COLUMNS:
+            self.board_tree.heading(column, text=column.replace('_', ' '))
+            self.board_tree.column(column, width=180 if column == 'Player' else 90,
+                                   anchor='w' if column in ('Player', 'Team', 'Role') else 'e')
+        scrollbar = ttk.Scrollbar(table_frame, orient='vertical', command=self.board_tree.yview)
+        self.board_tree.configure(yscrollcommand=scrollbar.set)
+        scrollbar.pack(side='right', fill='y')
+        self.board_tree.pack(fill='both', expand=True)
+        
+        self.update_leaderboard()
+
+    def set_busy(self, channel, busy):
+        indicator = self.busy_indicators.get(channel)
+        if indicator is None:
+            return
+        if busy:
+            indicator.pack(side='right', padx=5)
+            indicator.start(10)
+        else:
+            indicator.stop()
+            indicator.pack_forget()
+
+    def show_query_error(self, channel, error):
+        if channel == 'ingest':
+            # Already printed by the runner; keep watching
+            self.root.after(self.watch_ms, self.poll_live)
+            return
+        messagebox.showerror("Error", f"Error running {channel} analysis: {error}")
+
+    def show_widgets(self, frame, widgets):
+        # Re-pack only the given (widget, pack options) pairs, in order
+        for widget in frame.winfo_children():
+            widget.pack_forget()
+        for widget, options in widgets:
+            widget.pack(**options)
+
     def update_player_analysis(self, player):
         if not player:
             return
 
         # Normalize player name: strip whitespace, convert to title case
         player = player.strip().title()
+        self.current_player = player
+        tracer.begin(f"player {player}")
 
-        # Create case-insensitive search DataFrames
-        batting_stats = self.batting_data[self.batting_data['Batsman_Name'].str.strip().str.title() == player]
-        bowling_stats = self.bowling_data[self.bowling_data['Bowler_Name'].str.strip().str.title() == player]
+        self.runner.submit('player', lambda: self.query_player(player),
+                           lambda result: self.show_player_analysis(player, result))
 
-        # Clear previous stats
-        for widget in self.player_stats_frame.winfo_children():
-            widget.destroy()
+    def query_player(self, player):
+        # Runs on a worker thread: lookup plus conversion to plot arrays
+        with span("player lookup"):
+            result = self.stats.player_stats(player)
+        if result is None:
+            with span("player suggestions"):
+                return {'suggestions': self.stats.player_suggestions(player)}
+        
+        # Precomputed rolling form; empty unless the name matched exactly
+        with span("form curves"):
+            batting_form = self.stats.batting_form(player)
+            bowling_form = self.stats.bowling_form(player)
+        
+        with span("plot arrays"):
+            result['batting_plot'], result['batting_form'] = player_plot('batting', result['batting'], batting_form)
+            result['bowling_plot'], result['bowling_form'] = player_plot('bowling', result['bowling'], bowling_form)
+        
+        # Profile and biography (read from disk now) for an exact name
+        with span("player profile"):
+            result['profile'] = self.profiles.profile(player) if self.profiles is not None else None
+        return result
 
+    def show_player_analysis(self, player, result):
         # Check if player exists in either batting or bowling data
-        if batting_stats.empty and bowling_stats.empty:
-            # If no exact match, try partial matching
-            batting_partial = self.batting_data[self.batting_data['Batsman_Name'].str.contains(player, case=False, na=False)]
-            bowling_partial = self.bowling_data[self.bowling_data['Bowler_Name'].str.contains(player, case=False, na=False)]
+        if 'suggestions' in result:
+            # No matches found at all
+            self.player_error_label.configure(text=f"No data found for '{player}'. \nCheck player name spelling.")
+            widgets = [(self.player_error_label, {'pady': 10})]
 
-            if batting_partial.empty and bowling_partial.empty:
-                # No matches found at all
-                error_label = ttk.Label(
-                    self.player_stats_frame, 
-                    text=f"No data found for '{player}'. \nCheck player name spelling.", 
-                    foreground='red', 
-                    justify='center'
+            # Suggest similar names
+            similar_players = result['suggestions']
+            
+            if similar_players:
+                self.player_suggestion_label.configure(
+                    text="Did you mean one of these players?\n" + "\n".join(similar_players)
                 )
-                error_label.pack(pady=10)
+                widgets.append((self.player_suggestion_label, {'pady': 5}))
+            
+            self.show_widgets(self.player_stats_frame, widgets)
+            return
 
-                # Suggest similar names
-                all_players = set(
-                    list(self.batting_data['Batsman_Name'].str.strip().str.title().unique()) + 
-                    list(self.bowling_data['Bowler_Name'].str.strip().str.title().unique())
-                )
-                similar_players = [p for p in all_players if player.lower() in p.lower()]
-                
-                if similar_players:
-                    suggestion_label = ttk.Label(
-                        self.player_stats_frame, 
-                        text="Did you mean one of these players?\n" + "\n".join(similar_players[:5]), 
-                        foreground='blue'
-                    )
-                    suggestion_label.pack(pady=5)
-                
-                return
+        widgets = []
 
-            # Use partial matches if found
-            batting_stats = batting_partial
-            bowling_stats = bowling_partial
+        if result['profile']:
+            self.profile_label.configure(text=profile_text(result['profile']))
+            widgets.append((self.profile_label, {'fill': 'x', 'pady': 5}))
 
         # Batting Analysis
-        if not batting_stats.empty:
-            total_runs = batting_stats['Runs'].sum()
-            matches = len(batting_stats)
-            avg = total_runs / matches if matches > 0 else 0
-            highest_score = batting_stats['Runs'].max()
-
-            # Create figure for batting performance
-            fig_batting = plt.Figure(figsize=(10, 6))
-
-            # Batting runs plot
-            ax1 = fig_batting.add_subplot(121)
-            ax1.bar(batting_stats['Match_no'], batting_stats['Runs'])
-            ax1.set_title(f'{player} - Batting Performance')
-            ax1.set_xlabel('Match Number')
-            ax1.set_ylabel('Runs')
-            ax1.tick_params(axis='x', rotation=45)
-
-            # Batting strike rate plot
-            ax2 = fig_batting.add_subplot(122)
-            ax2.plot(batting_stats['Match_no'], batting_stats['Strike_Rate'], marker='o')
-            ax2.set_title(f'{player} - Strike Rate')
-            ax2.set_xlabel('Match Number')
-            ax2.set_ylabel('Strike Rate')
-            ax2.tick_params(axis='x', rotation=45)
+        if result['batting_summary']:
+            summary = result['batting_summary']
 
-            # Embed the plot in Tkinter
-            canvas_batting = FigureCanvasTkAgg(fig_batting, master=self.player_stats_frame)
-            canvas_batting.draw()
-            canvas_batting.get_tk_widget().pack(side=tk.TOP, fill=tk.BOTH, expand=1)
+            # Update the persistent batting figure in place
+            if self.batting_view is None:
+                self.batting_chart, self.batting_view = self.create_chart_view(
+                    self.player_stats_frame, (10, 6), make_batting_chart)
+            with span("batting chart update"):
+                self.batting_chart.update(player, *result['batting_plot'], form=result['batting_form'])
+                self.batting_view.refresh(player)
+            widgets.append((self.batting_view.canvas.get_tk_widget(), {'side': tk.TOP, 'fill': tk.BOTH, 'expand': 1}))
 
             # Batting stats summary
-            stats_text = f"""
-            Batting Statistics for {player}:
-            Total Matches: {matches}
-            Total Runs: {total_runs}
-            Average: {avg:.2f}
-            Highest Score: {highest_score}
-            """
-            stats_label = ttk.Label(self.player_stats_frame, text=stats_text, justify='left')
-            stats_label.pack(pady=10)
+            self.batting_label.configure(text=batting_text(player, summary))
+            widgets.append((self.batting_label, {'pady': 10}))
 
         # Bowling Analysis
-        if not bowling_stats.empty:
-            total_wickets = bowling_stats['Wickets'].sum()
-            matches = len(bowling_stats)
-            economy_rate = bowling_stats['Runs'].sum() / bowling_stats['Overs'].sum() if bowling_stats['Overs'].sum() > 0 else 0
-            best_bowling = bowling_stats.loc[bowling_stats['Wickets'].idxmax()]
+        if result['bowling_summary']:
+            summary = result['bowling_summary']
 
-            # Create figure for bowling performance
-            fig_bowling = plt.Figure(figsize=(10, 6))
-
-            # Bowling wickets plot
-            ax1 = fig_bowling.add_subplot(121)
-            ax1.bar(bowling_stats['Match_no'], bowling_stats['Wickets'])
-            ax1.set_title(f'{player} - Bowling Performance')
-            ax1.set_xlabel('Match Number')
-            ax1.set_ylabel('Wickets')
-            ax1.tick_params(axis='x', rotation=45)
-
-            # Bowling economy plot
-            ax2 = fig_bowling.add_subplot(122)
-            ax2.plot(bowling_stats['Match_no'], bowling_stats['Economy'], marker='o')
-            ax2.set_title(f'{player} - Economy Rate')
-            ax2.set_xlabel('Match Number')
-            ax2.set_ylabel('Economy Rate')
-            ax2.tick_params(axis='x', rotation=45)
-
-            # Embed the plot in Tkinter
-            canvas_bowling = FigureCanvasTkAgg(fig_bowling, master=self.player_stats_frame)
-            canvas_bowling.draw()
-            canvas_bowling.get_tk_widget().pack(side=tk.TOP, fill=tk.BOTH, expand=1)
+            # Update the persistent bowling figure in place
+            if self.bowling_view is None:
+                self.bowling_chart, self.bowling_view = self.create_chart_view(
+                    self.player_stats_frame, (10, 6), make_bowling_chart)
+            with span("bowling chart update"):
+                self.bowling_chart.update(player, *result['bowling_plot'], form=result['bowling_form'])
+                self.bowling_view.refresh(player)
+            widgets.append((self.bowling_view.canvas.get_tk_widget(), {'side': tk.TOP, 'fill': tk.BOTH, 'expand': 1}))
 
             # Bowling stats summary
-            bowling_text = f"""
-            Bowling Statistics for {player}:
-            Total Matches: {matches}
-            Total Wickets: {total_wickets}
-            Economy Rate: {economy_rate:.2f}
-            Best Bowling: {best_bowling['Wickets']} wickets for {best_bowling['Runs']} runs
-            """
-            bowling_label = ttk.Label(self.player_stats_frame, text=bowling_text, justify='left')
-            bowling_label.pack(pady=10)
+            self.bowling_label.configure(text=bowling_text(player, summary))
+            widgets.append((self.bowling_label, {'pady': 10}))
+
+        with span("layout"):
+            self.show_widgets(self.player_stats_frame, widgets)
     
     def update_team_analysis(self):
         team1 = self.team1_var.get()
@@ -339,161 +688,235 @@ class CricketAnalyzer:
         
         if not team1 or not team2:
             return
-            
-        # Clear previous stats
-        for widget in self.team_stats_frame.winfo_children():
-            widget.destroy()
-            
-        # Calculate team stats
-        team1_stats = self.calculate_team_stats(team1)
-        team2_stats = self.calculate_team_stats(team2)
-        
-        # Create comparison plots
-        fig = plt.Figure(figsize=(12, 6))
-        
-        # Batting comparison
-        ax1 = fig.add_subplot(121)
-        teams = [team1, team2]
-        avg_runs = [team1_stats['avg_runs'], team2_stats['avg_runs']]
-        ax1.bar(teams, avg_runs)
-        ax1.set_title("Average Team Runs")
-        ax1.set_ylabel("Runs")
-        
-        # Bowling comparison
-        ax2 = fig.add_subplot(122)
-        avg_economy = [team1_stats['avg_economy'], team2_stats['avg_economy']]
-        ax2.bar(teams, avg_economy)
-        ax2.set_title("Average Team Economy")
-        ax2.set_ylabel("Economy Rate")
-        
-        # Display stats
-        stats_text = f"""
-        Team Comparison:
         
-        {team1}:
-        Average Runs: {team1_stats['avg_runs']:.2f}
-        Average Economy: {team1_stats['avg_economy']:.2f}
-        
-        {team2}:
-        Average Runs: {team2_stats['avg_runs']:.2f}
-        Average Economy: {team2_stats['avg_economy']:.2f}
-        """
-        ttk.Label(self.team_stats_frame, text=stats_text, justify='left').pack(pady=10)
+        # Calculate team stats and head-to-head record
+        tracer.begin(f"team {team1} v {team2}")
+        self.runner.submit('team', lambda: self.query_teams(team1, team2),
+                           lambda stats: self.show_team_analysis(team1, team2, *stats))
+    
+    def query_teams(self, team1, team2):
+        with span("team stats"):
+            return (self.calculate_team_stats(team1), self.calculate_team_stats(team2),
+                    self.stats.head_to_head(team1, team2))
+    
+    def show_team_analysis(self, team1, team2, team1_stats, team2_stats, head_to_head):
+        # Update comparison plots in place
+        if self.team_view is None:
+            self.team_chart, self.team_view = self.create_chart_view(self.team_stats_frame, (12, 6), TeamChart)
+        with span("team chart update"):
+            self.team_chart.update(
+                [team1, team2],
+                [team1_stats['avg_runs'], team2_stats['avg_runs']],
+                [team1_stats['avg_economy'], team2_stats['avg_economy']],
+            )
+            self.team_view.refresh((team1, team2))
         
-        # Add the plots
-        canvas = FigureCanvasTkAgg(fig, self.team_stats_frame)
-        canvas.draw()
-        canvas.get_tk_widget().pack(fill='both', expand=True)
+        # Display stats
+        self.team_label.configure(text=team_text(team1, team2, team1_stats, team2_stats, head_to_head))
+        with span("layout"):
+            self.show_widgets(self.team_stats_frame, [
+                (self.team_label, {'pady': 10}),
+                (self.team_view.canvas.get_tk_widget(), {'fill': 'both', 'expand': True}),
+            ])
     
     def calculate_team_stats(self, team):
-        team_batting = self.batting_data[self.batting_data['Team_Innings'] == team]
-        team_bowling = self.bowling_data[self.bowling_data['Bowling_Team'] == team]
-        
-        avg_runs = team_batting.groupby('Match_no')['Runs'].sum().mean()
-        avg_economy = team_bowling['Economy'].mean()
-        
-        return {
-            'avg_runs': avg_runs,
-            'avg_economy': avg_economy
-        }
+        return self.stats.team_stats(team)
     
     def update_match_analysis(self, event=None):
         match = self.match_var.get()
         if not match:
             return
-            
-        # Clear previous stats
-        for widget in self.match_stats_frame.winfo_children():
-            widget.destroy()
-            
-        # Get match data
-        match_batting = self.batting_data[self.batting_data['Match_Between'] == match]
-        match_bowling = self.bowling_data[self.bowling_data['Match_Between'] == match]
-        
-        # Create figure for match analysis
-        fig = plt.Figure(figsize=(12, 6))
-        
-        # Team scores comparison
-        ax1 = fig.add_subplot(121)
-        team_scores = match_batting.groupby('Team_Innings')['Runs'].sum()
-        team_scores.plot(kind='bar', ax=ax1)
-        ax1.set_title("Team Scores")
-        ax1.set_ylabel("Runs")
-        
-        # Top performers
-        ax2 = fig.add_subplot(122)
-        top_batsmen = match_batting.nlargest(5, 'Runs')[['Batsman_Name', 'Runs']]
-        top_batsmen.plot(kind='barh', x='Batsman_Name', y='Runs', ax=ax2)
-        ax2.set_title("Top 5 Batsmen")
         
-        # Display match summary
-        summary_text = f"""
-        Match Summary: {match}
+        # Get precomputed match summary
+        tracer.begin(f"match {match}")
+        self.runner.submit('match', lambda: self.query_match(match),
+                           lambda summary: self.show_match_analysis(match, summary))
+    
+    def query_match(self, match):
+        with span("match summary"):
+            return self.stats.match_summary(match)
+    
+    def show_match_analysis(self, match, summary):
+        if summary is None:
+            return
         
-        Team Scores:
-        {team_scores.to_string()}
+        team_scores = summary['team_scores']
+        top_batsmen = summary['top_batsmen']
         
-        Top Scorer: {top_batsmen.iloc[0]['Batsman_Name']} ({top_batsmen.iloc[0]['Runs']} runs)
-        """
-        ttk.Label(self.match_stats_frame, text=summary_text, justify='left').pack(pady=10)
+        # Update team scores and top performers in place
+        if self.match_view is None:
+            self.match_chart, self.match_view = self.create_chart_view(self.match_stats_frame, (12, 6), MatchChart)
+        with span("match chart update"):
+            self.match_chart.update(team_scores, top_batsmen)
+            self.match_view.refresh(match)
         
-        # Add the plots
-        canvas = FigureCanvasTkAgg(fig, self.match_stats_frame)
-        canvas.draw()
-        canvas.get_tk_widget().pack(fill='both', expand=True)
+        # Display match summary
+        self.match_label.configure(text=match_text(match, team_scores, top_batsmen))
+        with span("layout"):
+            self.show_widgets(self.match_stats_frame, [
+                (self.match_label, {'pady': 10}),
+                (self.match_view.canvas.get_tk_widget(), {'fill': 'both', 'expand': True}),
+            ])
     
     def update_trends(self):
         analysis_type = self.trend_var.get()
-        
-        # Clear previous trends
-        for widget in self.trends_frame.winfo_children():
-            widget.destroy()
+        tracer.begin(f"trends {analysis_type}")
+        
+        if self.trend_view is None:
+            self.trend_chart, self.trend_view = self.create_chart_view(self.trends_frame, (12, 6), TrendChart)
+            # Zooming or panning re-fetches the visible range (TrendLines)
+            from matplotlib.backends.backend_tkagg import NavigationToolbar2Tk
+            self.trend_toolbar = NavigationToolbar2Tk(self.trend_view.canvas, self.trends_frame,
+                                                      pack_toolbar=False)
+        
+        with span("trend chart update"):
+            if analysis_type == "Batting Averages":
+                self.trend_chart.show(analysis_type, self.plot_batting_trends)
+            elif analysis_type == "Bowling Economy":
+                self.trend_chart.show(analysis_type, self.plot_bowling_trends)
+            elif analysis_type == "Team Win Rates":
+                self.trend_chart.show(analysis_type, self.plot_team_trends)
+            else:  # Players in Form
+                self.trend_chart.show(analysis_type, self.plot_form_leaders)
             
-        fig = plt.Figure(figsize=(12, 6))
-        
-        if analysis_type == "Batting Averages":
-            self.plot_batting_trends(fig)
-        elif analysis_type == "Bowling Economy":
-            self.plot_bowling_trends(fig)
-        else:  # Team Win Rates
-            self.plot_team_trends(fig)
-            
-        canvas = FigureCanvasTkAgg(fig, self.trends_frame)
-        canvas.draw()
-        canvas.get_tk_widget().pack(fill='both', expand=True)
-    
-    def plot_batting_trends(self, fig):
-        # Calculate match-wise batting averages
-        match_averages = self.batting_data.groupby('Match_no')['Runs'].mean()
-        
-        ax = fig.add_subplot(111)
-        match_averages.plot(kind='line', ax=ax)
-        ax.set_title("Tournament Batting Average Trend")
-        ax.set_xlabel("Match Number")
-        ax.set_ylabel("Average Runs")
-    
-    def plot_bowling_trends(self, fig):
-        # Calculate match-wise bowling economy
-        match_economy = self.bowling_data.groupby('Match_no')['Economy'].mean()
-        
-        ax = fig.add_subplot(111)
-        match_economy.plot(kind='line', ax=ax, color='green')
-        ax.set_title("Tournament Bowling Economy Trend")
-        ax.set_xlabel("Match Number")
-        ax.set_ylabel("Economy Rate")
-    
-    def plot_team_trends(self, fig):
-        # This is a simplified version - in real analysis, you'd need to determine match winners
-        team_runs = self.batting_data.groupby(['Match_no', 'Team_Innings'])['Runs'].sum()
-        team_runs = team_runs.unstack()
-        
-        ax = fig.add_subplot(111)
-        team_runs.plot(kind='line', ax=ax)
-        ax.set_title("Team Performance Trends")
-        ax.set_xlabel("Match Number")
-        ax.set_ylabel("Team Total Runs")
+            self.trend_view.refresh(analysis_type)
+        with span("layout"):
+            self.show_widgets(self.trends_frame, [
+                (self.trend_toolbar, {'side': 'bottom', 'fill': 'x'}),
+                (self.trend_view.canvas.get_tk_widget(), {'fill': 'both', 'expand': True}),
+            ])
+    
+    def update_trend_top(self, event=None):
+        # The team selection changed: rebuild the charts with it
+        if self.trend_view is None:
+            return
+        self.trend_chart.reset()
+        self.trend_view.invalidate()
+        self.update_trends()
+    
+    def trend_top(self):
+        value = self.trend_top_var.get()
+        return None if value == ALL else int(value)
+    
+    # The trend lines are fetched for the visible match range at the axes
+    # width, first for the whole tournament and again on zoom or pan
+    def plot_batting_trends(self, ax):
+        # Match-wise batting averages
+        with span("batting trend plot"):
+            return plot_batting_trend(ax, lambda *view: self.stats.trend_window('batting', *view),
+                                      self.submit_trend_fetch)
+    
+    def plot_bowling_trends(self, ax):
+        # Match-wise bowling economy
+        with span("bowling trend plot"):
+            return plot_bowling_trend(ax, lambda *view: self.stats.trend_window('bowling', *view),
+                                      self.submit_trend_fetch)
+    
+    def plot_team_trends(self, ax):
+        # Cumulative win rate after each match, from the schedule results
+        top = self.trend_top()
+        with span("win rate trend plot"):
+            return plot_win_rates(ax, lambda *view: self.stats.trend_window('win_rates', *view, top=top),
+                                  self.submit_trend_fetch)
+    
+    def submit_trend_fetch(self, work, done):
+        # A zoom or pan fires for every step of the drag; fetch only once
+        # the view has settled, on the query threads like the other tabs
+        if self.trend_fetch is not None:
+            self.root.after_cancel(self.trend_fetch)
+        self.trend_fetch = self.root.after(TREND_FETCH_DELAY_MS, lambda: self.start_trend_fetch(work, done))
+    
+    def start_trend_fetch(self, work, done):
+        self.trend_fetch = None
+        self.runner.submit('trends', work, done)
+    
+    def update_leaderboard(self, page=None):
+        if page is not None:
+            self.board_page = max(page, 0)
+        metric = self.board_metric_var.get()
+        filters = {
+            'team': none_if_all(self.board_team_var.get()),
+            'positions': POSITION_GROUPS.get(self.board_position_var.get()),
+            'role': none_if_all(self.board_role_var.get()),
+            'min_innings': self.board_min_innings(),
+            'page': self.board_page,
+            'page_size': BOARD_PAGE_SIZE,
+        }
+        if self.board_career_var.get():
+            filters['career'] = True
+        wanted = {column: none_if_all(variable.get()) for column, variable in self.board_profile_vars.items()}
+        if any(value is not None for value in wanted.values()):
+            filters['players'] = self.profiles.players(role=wanted['playingRole'],
+                                                       batting_style=wanted['battingStyle'],
+                                                       bowling_style=wanted['bowlingStyle'])
+        
+        tracer.begin(f"leaderboard {metric}")
+        self.runner.submit('leaderboard', lambda: self.query_leaderboard(metric, filters), self.show_leaderboard)
+    
+    def board_min_innings(self):
+        try:
+            return self.board_min_var.get()
+        except tk.TclError:
+            return 1  # not a number (yet)
+    
+    def query_leaderboard(self, metric, filters):
+        with span("leaderboard query"):
+            return self.stats.top_players(metric, **filters)
+    
+    def show_leaderboard(self, result):
+        with span("leaderboard table"):
+            self.board_tree.delete(*self.board_tree.get_children())
+            for player, row in result['rows'].iterrows():
+                values = [player if column == 'Player' else row[column] for column in BOARD_COLUMNS]
+                self.board_tree.insert('', 'end', values=[board_cell(value) for value in values])
+        
+        pages = max(result['pages'], 1)
+        self.board_page_label.configure(
+            text=f"Page {result['page'] + 1} of {pages} ({result['total']} players)")
+        self.board_prev.state(['!disabled'] if result['page'] > 0 else ['disabled'])
+        self.board_next.state(['!disabled'] if result['page'] + 1 < pages else ['disabled'])
+    
+    def plot_form_leaders(self, ax):
+        # Top batsmen by average over their last FORM_WINDOW innings, read
+        # from the precomputed rolling form
+        with span("form leaders data"):
+            leaders = self.stats.players_in_form('Average', 10)
+        
+        with span("form leaders plot"):
+            plot_form_leaders(ax, leaders, CricketStats.FORM_WINDOW)
         
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Cricket Match Analysis")
+    parser.add_argument('--workers', type=int, default=2,
+                        help="query worker threads (0 runs queries on the UI thread)")
+    parser.add_argument('--profile-startup', action='store_true',
+                        help="print import time, tab build times and time to first window")
+    parser.add_argument('--watch', type=float, metavar='SECONDS', nargs='?', const=2.0,
+                        help="poll the scorecard CSVs for appended rows (default every 2 seconds)")
+    parser.add_argument('--db', metavar='PATH',
+                        help="read from a SQLite store built with storage.py instead of the CSVs")
+    parser.add_argument('--tournament',
+                        help="with --db, restrict every tab to one tournament")
+    parser.add_argument('--perf-overlay', action='store_true',
+                        help="show the timing breakdown of the last action in a status bar")
+    parser.add_argument('--server', metavar='URL',
+                        help="query a running query_server.py instead of loading the data")
+    args = parser.parse_args()
+    if args.watch and args.db:
+        parser.error("--watch tails the CSVs and cannot be combined with --db")
+    if args.server and (args.db or args.watch):
+        parser.error("--server cannot be combined with --db or --watch (start the server with them instead)")
+    
+    profile = None
+    if args.profile_startup:
+        profile = StartupProfile(start=_IMPORT_START)
+        profile.marks.append(("modules imported", _IMPORT_END))
+    
     root = tk.Tk()
-    app = CricketAnalyzer(root)
+    store = CricketStore(args.db) if args.db else None
+    watch_ms = int(args.watch * 1000) if args.watch else None
+    app = CricketAnalyzer(root, workers=args.workers, profile=profile, store=store, tournament=args.tournament,
+                          watch_ms=watch_ms, overlay=args.perf_overlay, server=args.server)
     root.mainloop()
+    if hasattr(app, 'runner'):
+        app.runner.shutdown()
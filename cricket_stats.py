@@ -0,0 +1,577 @@
+import bisect
+from functools import cached_property
+
+import numpy as np
+import pandas as pd
+
+from dismissals import MatchupIndex, with_dismissals
+from downsample import TREND_SERIES, TrendView
+from form import FORM_WINDOW, FormIndex
+from leaderboard import Leaderboard
+from player_index import PlayerIndex, normalize_name, normalized_names
+
+
+class CricketStats:
+    # GUI-free analytics behind the four tabs. All aggregates are computed
+    # once from the batting and bowling frames with a handful of groupby
+    # passes; the query methods below are dictionary/index lookups.
+    #
+    # Means are kept as (sum, count) pairs so they can be combined when
+    # several players or new rows are merged in. Frames are expected in the
+    # typed layout from schema.py (categorical names/teams, Balls instead of
+    # Overs); groupbys use observed=True so only categories that occur in
+    # the data produce groups.
+    ROLLING_WINDOW = 5
+    FORM_WINDOW = FORM_WINDOW
+
+    def __init__(self, batting_data, bowling_data, schedule=None):
+        self.batting_data = with_dismissals(batting_data)
+        self.bowling_data = bowling_data
+        self.schedule = schedule
+        self.compute()
+
+    def compute(self):
+        batting = self.batting_data
+        bowling = self.bowling_data
+
+        self.player_index = PlayerIndex(batting, bowling)
+        self.matchups = MatchupIndex(batting)
+        self.form = FormIndex(batting, bowling, self.FORM_WINDOW)
+
+        # Drop the sorted selector values and the leaderboard; they are
+        # rebuilt on next access, like the trend views
+        for name in ('players', 'teams', 'matches', 'leaderboard'):
+            self.__dict__.pop(name, None)
+        self.trend_views = {}
+
+        self.compute_player_aggregates()
+        self.compute_team_aggregates()
+        self.compute_match_aggregates()
+        self.compute_trend_aggregates()
+        self.compute_result_aggregates()
+
+    # Values for the selection widgets, sorted on first use
+    @cached_property
+    def players(self):
+        return sorted(self.batting_data['Batsman_Name'].dropna().unique())
+
+    @cached_property
+    def teams(self):
+        return sorted(self.batting_data['Team_Innings'].dropna().unique())
+
+    @cached_property
+    def matches(self):
+        return sorted(self.batting_data['Match_Between'].dropna().unique())
+
+    @cached_property
+    def leaderboard(self):
+        # Built when the leaderboard is first queried
+        return Leaderboard(self.batting_data, self.bowling_data)
+
+    # ------------------------------------------------------------------
+    # Load-time aggregation
+    # ------------------------------------------------------------------
+    def compute_player_aggregates(self):
+        self.player_batting = player_batting_totals(self.batting_data)
+        self.player_bowling = player_bowling_totals(self.bowling_data)
+
+    def compute_team_aggregates(self):
+        # Team total per match, reused by the team trend
+        self.team_match_runs = team_match_totals(self.batting_data)
+        self.team_batting = self.team_match_runs.groupby(level=0, observed=True).agg(['sum', 'count'])
+        self.team_bowling = team_bowling_totals(self.bowling_data)
+
+    def compute_match_aggregates(self):
+        batting = self.batting_data
+
+        self.match_team_scores = {
+            match: scores.droplevel(0)
+            for match, scores in match_score_totals(batting).groupby(level=0, observed=True)
+        }
+
+        # Same rows and order as nlargest(5, 'Runs') within each match
+        self.match_top_batsmen = dict(match_top_rows(batting))
+
+    def compute_trend_aggregates(self):
+        self.match_batting = self.batting_data.groupby('Match_no', sort=True)['Runs'].agg(['sum', 'count'])
+        self.match_bowling = self.bowling_data.groupby('Match_no', sort=True)['Economy'].agg(['sum', 'count'])
+        self.team_runs_by_match = self.team_match_runs.unstack(level=0)
+
+    def compute_result_aggregates(self):
+        # One row per (team, match) from the schedule, seen from each side,
+        # joined to the team's batting total on Match_no
+        results = team_results(result_sides(self.schedule), self.team_match_runs, self.ROLLING_WINDOW)
+        self.team_results = results
+        for name, table in result_counts(results).items():
+            setattr(self, name, table)
+        self.win_rate_by_match = results.pivot(index='Match_no', columns='Team', values='win_rate')
+        self.rolling_win_rate_by_match = results.pivot(index='Match_no', columns='Team', values='rolling_win_rate')
+
+    # ------------------------------------------------------------------
+    # Incremental updates
+    # ------------------------------------------------------------------
+    def extend(self, batting_data, bowling_data, schedule=None):
+        # batting_data/bowling_data are the current frames with rows
+        # appended at the end (see schema.ScorecardBuffer). Everything is
+        # folded in from the new rows only: new names are inserted into the
+        # sorted selector lists, the leaderboard re-ranks the players in
+        # them, and the results are recomputed for the teams that batted or
+        # whose fixtures were added or decided. Still rebuilt in full: the
+        # results when a fixture is removed or re-drawn, and the trend views
+        # (filled again on next use).
+        batting_start, bowling_start = len(self.batting_data), len(self.bowling_data)
+        previous_schedule = self.schedule
+        self.batting_data = with_dismissals(batting_data)
+        self.bowling_data = bowling_data
+        if schedule is not None:
+            self.schedule = schedule
+        batting = self.batting_data.iloc[batting_start:]
+        bowling = self.bowling_data.iloc[bowling_start:]
+
+        self.player_index.extend(batting, bowling, batting_start, bowling_start)
+        self.matchups.extend(self.batting_data, batting_start)
+        self.form.extend(batting, bowling)
+        for name, column in (('players', 'Batsman_Name'), ('teams', 'Team_Innings'), ('matches', 'Match_Between')):
+            if name in self.__dict__:
+                self.__dict__[name] = merge_sorted(self.__dict__[name], batting[column].dropna().unique())
+        if 'leaderboard' in self.__dict__:
+            self.leaderboard.extend(batting, bowling)
+        self.trend_views = {}
+
+        team_runs = team_match_totals(batting)
+        self.extend_player_aggregates(batting, bowling, bowling_start)
+        self.extend_team_aggregates(team_runs, bowling)
+        self.extend_match_aggregates(batting)
+        self.extend_trend_aggregates(batting, bowling, team_runs.index)
+        self.extend_result_aggregates(previous_schedule, team_runs.index)
+
+    def extend_player_aggregates(self, batting, bowling, bowling_start):
+        self.player_batting = fold(self.player_batting, player_batting_totals(batting),
+                                   {'innings': 'sum', 'runs': 'sum', 'highest': 'max'})
+
+        # An earlier best spell wins ties, so the new one has to take more
+        # wickets to replace it
+        added = player_bowling_totals(bowling, bowling_start)
+        positions = self.player_bowling.index.get_indexer(added.index)
+        present = positions >= 0
+        previous = self.player_bowling.iloc[positions[present]]
+        keep = present.copy()
+        keep[present] = previous['best_wickets'].to_numpy() >= added['best_wickets'].to_numpy()[present]
+        for column in ('best_position', 'best_wickets'):
+            values = added[column].to_numpy(copy=True)
+            values[keep] = self.player_bowling[column].to_numpy()[positions[keep]]
+            added[column] = values
+        self.player_bowling = fold(self.player_bowling, added, {
+            'spells': 'sum', 'wickets': 'sum', 'runs': 'sum', 'balls': 'sum',
+            'best_position': 'replace', 'best_wickets': 'replace',
+        })
+
+    def extend_team_aggregates(self, added, bowling):
+        # `added` is team_match_totals of the new rows. A (team, match)
+        # total seen for the first time is a new innings for the team's
+        # average; otherwise only its runs change
+        new_innings = self.team_match_runs.index.get_indexer(added.index) < 0
+        self.team_match_runs = fold(self.team_match_runs.to_frame(), added.to_frame(),
+                                    {added.name: 'sum'})[added.name]
+
+        teams = pd.DataFrame({'sum': added.to_numpy(), 'count': new_innings.astype(np.int64)},
+                             index=added.index.get_level_values(0))
+        teams = teams.groupby(level=0, observed=True).sum()
+        self.team_batting = fold(self.team_batting, teams, {'sum': 'sum', 'count': 'sum'})
+        self.team_bowling = fold(self.team_bowling, team_bowling_totals(bowling), {'sum': 'sum', 'count': 'sum'})
+
+    def extend_match_aggregates(self, batting):
+        for match, scores in match_score_totals(batting).groupby(level=0, observed=True):
+            scores = scores.droplevel(0)
+            previous = self.match_team_scores.get(match)
+            if previous is not None:
+                scores = pd.concat([previous, scores]).groupby(level=0, sort=True).sum()
+            self.match_team_scores[match] = scores
+
+        # Earlier rows come first among equal scores, as in a full sort
+        for match, rows in match_top_rows(batting):
+            previous = self.match_top_batsmen.get(match)
+            if previous is not None:
+                rows = pd.concat([previous, rows]).sort_values('Runs', ascending=False, kind='mergesort').head(5)
+            self.match_top_batsmen[match] = rows
+
+    def extend_trend_aggregates(self, batting, bowling, touched):
+        sums = {'sum': 'sum', 'count': 'sum'}
+        self.match_batting = fold(self.match_batting, batting.groupby('Match_no')['Runs'].agg(['sum', 'count']),
+                                  sums, sort=True)
+        self.match_bowling = fold(self.match_bowling, bowling.groupby('Match_no')['Economy'].agg(['sum', 'count']),
+                                  sums, sort=True)
+        # Only the (team, match) cells in `touched` change; a new match or
+        # team adds a row or column
+        cells = self.team_match_runs.loc[touched].unstack(level=0)
+        table = self.team_runs_by_match
+        if not (cells.index.isin(table.index).all() and cells.columns.isin(table.columns).all()):
+            table = table.reindex(index=table.index.union(cells.index), columns=table.columns.union(cells.columns))
+        table.update(cells)
+        self.team_runs_by_match = table
+
+    def extend_result_aggregates(self, previous, touched):
+        # The count tables are patched with the sides of the fixtures added
+        # or decided since the `previous` schedule; the per-match rows and
+        # win rates are recomputed only for the teams in those fixtures and
+        # in the `touched` (team, match) totals, then spliced back in.
+        schedule = self.schedule
+        if schedule is None:
+            return
+        teams = set(touched.get_level_values(0).astype(object))
+        if schedule is not previous:
+            fixtures = changed_fixtures(previous, schedule)
+            if fixtures is None:
+                self.compute_result_aggregates()
+                return
+            removed, added = (result_sides(rows) for rows in fixtures)
+            if len(added):
+                removed_counts = result_counts(removed)
+                for name, counts in result_counts(added).items():
+                    setattr(self, name, patch_counts(getattr(self, name), counts, removed_counts[name]))
+                teams.update(added['Team'])
+        if not teams:
+            return
+
+        teams = list(teams)
+        sides = result_sides(schedule[(schedule['Team1'].isin(teams) | schedule['Team2'].isin(teams)).to_numpy()])
+        rows = team_results(sides[sides['Team'].isin(teams)], self.team_match_runs, self.ROLLING_WINDOW)
+        kept = self.team_results[~self.team_results['Team'].isin(teams)]
+        results = pd.concat([kept, rows], ignore_index=True)
+        if results['Runs'].notna().all():
+            # As the left merge gives it once every side has a total
+            results['Runs'] = results['Runs'].astype(self.team_match_runs.dtype)
+        self.team_results = results.sort_values(['Team', 'Match_no'], kind='mergesort').reset_index(drop=True)
+        for name, column in (('win_rate_by_match', 'win_rate'), ('rolling_win_rate_by_match', 'rolling_win_rate')):
+            table = getattr(self, name)
+            update = rows.pivot(index='Match_no', columns='Team', values=column)
+            table = table.reindex(index=table.index.union(update.index), columns=table.columns.union(update.columns))
+            table[list(update.columns)] = update.reindex(table.index)
+            setattr(self, name, table)
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+    def player_stats(self, player):
+        # Exact normalized match first, then partial match over canonical
+        # names. Returns None when nothing matches.
+        player = normalize_name(player)
+        batting_rows, bowling_rows = self.player_index.lookup(player)
+        names = [player]
+
+        if not len(batting_rows) and not len(bowling_rows):
+            names = self.player_index.search(player)
+            if not names:
+                return None
+            batting_rows, bowling_rows = self.player_index.partial_lookup(player)
+
+        return {
+            'name': player,
+            'batting': self.batting_data.iloc[batting_rows],
+            'bowling': self.bowling_data.iloc[bowling_rows],
+            'batting_summary': self.batting_summary(names),
+            'bowling_summary': self.bowling_summary(names),
+        }
+
+    def player_suggestions(self, player, limit=5):
+        return self.player_index.suggestions(normalize_name(player), limit)
+
+    def batting_summary(self, names):
+        rows = self.player_batting.loc[self.player_batting.index.intersection(names)]
+        if rows.empty:
+            return None
+        matches = int(rows['innings'].sum())
+        total_runs = rows['runs'].sum()
+        return {
+            'matches': matches,
+            'total_runs': total_runs,
+            'average': total_runs / matches if matches > 0 else 0,
+            'highest_score': rows['highest'].max(),
+        }
+
+    def bowling_summary(self, names):
+        rows = self.player_bowling.loc[self.player_bowling.index.intersection(names)]
+        if rows.empty:
+            return None
+        overs = rows['balls'].sum() / 6
+        best = self.bowling_data.iloc[np.sort(rows['best_position'].astype(np.intp).to_numpy())]
+        best = best.loc[best['Wickets'].idxmax()]
+        return {
+            'matches': int(rows['spells'].sum()),
+            'total_wickets': rows['wickets'].sum(),
+            'economy_rate': rows['runs'].sum() / overs if overs > 0 else 0,
+            'best_wickets': best['Wickets'],
+            'best_runs': best['Runs'],
+        }
+
+    def team_stats(self, team):
+        won, played = matrix_value(self.team_record, team, 'won'), matrix_value(self.team_record, team, 'decided')
+        return {
+            'avg_runs': mean_of(self.team_batting, team),
+            'avg_economy': mean_of(self.team_bowling, team),
+            'won': won,
+            'played': played,
+            'win_rate': won / played if played else np.nan,
+        }
+
+    def head_to_head(self, team1, team2):
+        # Results between two teams, from team1's side
+        wins = matrix_value(self.head_to_head_wins, team1, team2)
+        losses = matrix_value(self.head_to_head_wins, team2, team1)
+        return {
+            'wins': wins,
+            'losses': losses,
+            'played': matrix_value(self.head_to_head_played, team1, team2),
+        }
+
+    def venue_splits(self, team):
+        if team not in self.venue_played.index:
+            return pd.DataFrame(columns=['won', 'played', 'win_rate'])
+        splits = pd.DataFrame({
+            'won': self.venue_wins.loc[team],
+            'played': self.venue_played.loc[team],
+        })
+        splits = splits[splits['played'] > 0]
+        splits['win_rate'] = splits['won'] / splits['played']
+        return splits
+
+    def win_rate_trend(self, rolling=False):
+        # Win rate per team after each match number, one column per team
+        trend = self.rolling_win_rate_by_match if rolling else self.win_rate_by_match
+        return trend.ffill()
+
+    def match_summary(self, match):
+        if match not in self.match_team_scores:
+            return None
+        return {
+            'team_scores': self.match_team_scores[match],
+            'top_batsmen': self.match_top_batsmen[match],
+        }
+
+    def batting_form(self, player):
+        # Rolling average and strike rate after each innings of one player
+        return self.form.batting(player)
+
+    def bowling_form(self, player):
+        # Rolling economy and wickets after each spell of one player
+        return self.form.bowling(player)
+
+    def players_in_form(self, metric='Average', k=10, min_innings=None):
+        # Current form leaderboard: Average, Strike_Rate, Economy or
+        # Recent_Wickets over each player's last FORM_WINDOW innings
+        return self.form.leaders(metric, k, min_innings)
+
+    def top_players(self, metric='Runs', **filters):
+        # One leaderboard page; see Leaderboard.query for the filters
+        return self.leaderboard.query(metric, **filters)
+
+    def batting_trend(self):
+        # Average runs per batting innings, by match number
+        return self.match_batting['sum'] / self.match_batting['count']
+
+    def bowling_trend(self):
+        # Average bowling economy, by match number
+        return self.match_bowling['sum'] / self.match_bowling['count']
+
+    def team_trend(self):
+        # Team total per match number, one column per team
+        return self.team_runs_by_match
+
+    def trend_window(self, kind, start=None, end=None, points=None, top=None):
+        # One trend ('batting', 'bowling', 'win_rates' or 'team_runs') for
+        # the match range [start, end], min/max downsampled to about `points`
+        # matches and with all but the `top` teams grouped. The trend is
+        # filled and indexed once (TrendView), so zooming and panning only
+        # slice it.
+        view = self.trend_views.get(kind)
+        if view is None:
+            view = self.trend_views[kind] = TrendView(getattr(self, TREND_SERIES[kind])())
+        return view.window(start, end, points, top)
+
+
+def player_batting_totals(batting):
+    key = normalized_names(batting['Batsman_Name'])
+    return batting.groupby(key, sort=True, observed=True).agg(
+        innings=('Runs', 'size'),
+        runs=('Runs', 'sum'),
+        highest=('Runs', 'max'),
+    )
+
+
+def player_bowling_totals(bowling, start=0):
+    # `start` is the position of the first row in the full bowling frame
+    key = normalized_names(bowling['Bowler_Name'])
+    totals = bowling.groupby(key, sort=True, observed=True).agg(
+        spells=('Wickets', 'size'),
+        wickets=('Wickets', 'sum'),
+        runs=('Runs', 'sum'),
+        balls=('Balls', 'sum'),
+    )
+
+    # Best bowling: first spell with the most wickets, in file order
+    best = pd.DataFrame({
+        'key': key.to_numpy(),
+        'wickets': bowling['Wickets'].to_numpy(),
+        'position': np.arange(start, start + len(bowling)),
+    }).dropna(subset=['key'])
+    best = best.sort_values(['key', 'wickets', 'position'], ascending=[True, False, True])
+    best = best.drop_duplicates('key').set_index('key')
+    totals['best_position'] = best['position']
+    totals['best_wickets'] = best['wickets']
+    return totals
+
+
+def team_match_totals(batting):
+    return batting.groupby(['Team_Innings', 'Match_no'], sort=True, observed=True)['Runs'].sum()
+
+
+def team_bowling_totals(bowling):
+    return bowling.groupby('Bowling_Team', sort=True, observed=True)['Economy'].agg(['sum', 'count'])
+
+
+def match_score_totals(batting):
+    return batting.groupby(['Match_Between', 'Team_Innings'], sort=True, observed=True)['Runs'].sum()
+
+
+def match_top_rows(batting, n=5):
+    # (match, top n rows by runs) pairs; ties keep file order
+    ranked = batting.sort_values('Runs', ascending=False, kind='mergesort')
+    top = ranked.groupby('Match_Between', sort=False, observed=True).head(n)
+    for match, rows in top.groupby('Match_Between', sort=False, observed=True):
+        yield match, rows[['Batsman_Name', 'Runs']]
+
+
+def result_sides(schedule):
+    # Two rows per fixture, one from each side's point of view
+    if schedule is None:
+        schedule = pd.DataFrame(columns=['Match_no', 'Venue', 'Team1', 'Team2', 'Winner'])
+
+    sides = []
+    for team, opponent in (('Team1', 'Team2'), ('Team2', 'Team1')):
+        sides.append(pd.DataFrame({
+            'Match_no': schedule['Match_no'].to_numpy(),
+            'Team': schedule[team].astype(object).to_numpy(),
+            'Opponent': schedule[opponent].astype(object).to_numpy(),
+            'Venue': schedule['Venue'].astype(object).to_numpy(),
+            'Winner': schedule['Winner'].astype(object).to_numpy(),
+        }))
+    results = pd.concat(sides, ignore_index=True)
+
+    # Ties and no-results have a winner that is neither side
+    results['won'] = (results['Winner'] == results['Team']).astype(np.int32)
+    results['decided'] = (results['won'].astype(bool) | (results['Winner'] == results['Opponent'])).astype(np.int32)
+    return results
+
+
+def team_results(sides, team_match_runs, window):
+    # Sides joined to the team's batting total, with the cumulative and
+    # rolling win rate after each match
+    runs = team_match_runs.rename('Runs').reset_index()
+    runs['Team_Innings'] = runs['Team_Innings'].astype(object)
+    runs = runs.rename(columns={'Team_Innings': 'Team'})
+    results = sides.merge(runs, on=['Team', 'Match_no'], how='left')
+    results = results.sort_values(['Team', 'Match_no'], kind='mergesort').reset_index(drop=True)
+
+    grouped = results.groupby('Team', sort=False)
+    results['win_rate'] = grouped['won'].cumsum() / grouped['decided'].cumsum()
+    rolling = grouped[['won', 'decided']].rolling(window, min_periods=1).sum()
+    rolling = rolling.reset_index(level=0, drop=True)
+    results['rolling_win_rate'] = rolling['won'] / rolling['decided']
+    return results
+
+
+def result_counts(results):
+    # Win/decided counts by opponent, by venue and overall
+    counts = {}
+    for name, column, values in (('head_to_head_wins', 'Opponent', 'won'),
+                                 ('head_to_head_played', 'Opponent', 'decided'),
+                                 ('venue_wins', 'Venue', 'won'),
+                                 ('venue_played', 'Venue', 'decided')):
+        counts[name] = results.pivot_table(index='Team', columns=column, values=values,
+                                           aggfunc='sum', fill_value=0)
+    counts['team_record'] = results.groupby('Team', sort=True)[['won', 'decided']].sum()
+    return counts
+
+
+def changed_fixtures(previous, schedule):
+    # (old rows, new rows) for the fixtures that were added to `schedule`
+    # or had their winner changed since `previous`. None when a fixture was
+    # removed or re-drawn, or Match_no is not a key, and the results have
+    # to be rebuilt.
+    if previous is None or schedule is None:
+        return None
+    old = previous.set_index('Match_no')
+    new = schedule.set_index('Match_no')
+    if not old.index.is_unique or not new.index.is_unique or not old.index.isin(new.index).all():
+        return None
+
+    kept = new.loc[old.index]
+    for column in ('Team1', 'Team2', 'Venue'):
+        if not same_values(old[column], kept[column]).all():
+            return None
+    changed = ~same_values(old['Winner'], kept['Winner'])
+    added = ~new.index.isin(old.index)
+    return (previous[changed.to_numpy()],
+            schedule[new.index.isin(old.index[changed.to_numpy()]) | added])
+
+
+def same_values(a, b):
+    # Elementwise equality with missing == missing
+    a, b = a.astype(object).to_numpy(), b.astype(object).to_numpy()
+    return pd.Series((a == b) | (pd.isna(a) & pd.isna(b)))
+
+
+def patch_counts(table, added, removed):
+    # `table` + `added` - `removed`, cell by cell; the counts keep the
+    # int32 of the won/decided flags
+    table = table.add(added, fill_value=0).sub(removed, fill_value=0)
+    return table.fillna(0).astype(np.int32)
+
+
+def merge_sorted(values, added):
+    # Sorted, distinct `values` with the distinct `added` ones inserted
+    values = list(values)
+    for value in added:
+        position = bisect.bisect_left(values, value)
+        if position == len(values) or values[position] != value:
+            values.insert(position, value)
+    return values
+
+
+def fold(table, added, how, sort=False):
+    # Merge per-key aggregates of new rows into `table`, touching only the
+    # keys in `added`. how: column -> 'sum', 'max' or 'replace'. Keys seen
+    # for the first time are appended (then sorted when sort=True).
+    positions = table.index.get_indexer(added.index)
+    present = positions >= 0
+    rows = positions[present]
+    for column, method in how.items():
+        new = added[column].to_numpy()[present]
+        old = table[column].to_numpy()[rows]
+        if method == 'sum':
+            new = old + new
+        elif method == 'max':
+            new = np.maximum(old, new)
+        dtype = np.result_type(table[column].dtype, new.dtype)
+        if table[column].dtype != dtype:
+            table[column] = table[column].astype(dtype)
+        table.iloc[rows, table.columns.get_loc(column)] = new
+
+    if not present.all():
+        table = pd.concat([table, added.loc[~present, list(table.columns)]])
+        if sort:
+            table = table.sort_index()
+    return table
+
+
+def matrix_value(matrix, row, column):
+    if row not in matrix.index or column not in matrix.columns:
+        return 0
+    return int(matrix.at[row, column])
+
+
+def mean_of(sums, key):
+    if key not in sums.index:
+        return np.nan
+    row = sums.loc[key]
+    return row['sum'] / row['count'] if row['count'] else np.nan
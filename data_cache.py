@@ -0,0 +1,158 @@
+import hashlib
+import json
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+# Parsed CSVs are cached as one .npy file per column. Numeric columns are
+# stored as-is and memory-mapped on load (the frame keeps them as separate
+# blocks, so they are not copied); text columns are stored as int32 codes
+# plus a fixed-width unicode array of the distinct values, in the category
+# order of a cold categorical load, so a warm load returns the same frame.
+CACHE_DIR = '.cricket_cache'
+CACHE_VERSION = 2
+
+
+def file_hash(path, chunk_size=1 << 20):
+    digest = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def cache_path(path, cache_dir=CACHE_DIR):
+    stem = os.path.splitext(os.path.basename(path))[0]
+    return os.path.join(os.path.dirname(os.path.abspath(path)), cache_dir, stem)
+
+
+def load_csv(path, cache_dir=CACHE_DIR, categorical=False):
+    # Drop-in for pd.read_csv(path). With categorical=True text columns come
+    # back as pandas Categoricals built straight from the cached codes.
+    start = time.perf_counter()
+    target = cache_path(path, cache_dir)
+    stat = os.stat(path)
+
+    meta = read_meta(target)
+    if meta is not None and is_fresh(meta, path, stat, target):
+        try:
+            df = read_columns(target, meta, categorical)
+        except (OSError, ValueError) as e:
+            print(f"Ignoring unreadable cache for {path}: {e}")
+        else:
+            print(f"Loaded {path} from cache in {time.perf_counter() - start:.3f}s (warm)")
+            return df
+
+    df = pd.read_csv(path)
+    parsed = time.perf_counter()
+    try:
+        write_columns(target, df, path, stat)
+    except OSError as e:
+        print(f"Could not write cache for {path}: {e}")
+    print(f"Loaded {path} in {parsed - start:.3f}s (cold, cache written in "
+          f"{time.perf_counter() - parsed:.3f}s)")
+
+    if categorical:
+        df = df.apply(lambda col: col if col.dtype.kind in 'biufcmM' else col.astype('category'))
+    return df
+
+
+def read_meta(target):
+    try:
+        with open(os.path.join(target, 'meta.json')) as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if meta.get('version') != CACHE_VERSION:
+        return None
+    return meta
+
+
+def is_fresh(meta, path, stat, target):
+    # An unchanged mtime and size is trusted without reading the file. Only a
+    # file that was touched but kept its size is hashed; when the content
+    # turns out the same, the new mtime is recorded so the next load skips
+    # the hash again.
+    if meta['size'] != stat.st_size:
+        return False
+    if meta['mtime_ns'] == stat.st_mtime_ns:
+        return True
+    if meta['sha1'] != file_hash(path):
+        return False
+    try:
+        write_meta(target, dict(meta, mtime_ns=stat.st_mtime_ns))
+    except OSError:
+        pass
+    return True
+
+
+def write_columns(target, df, path, stat):
+    os.makedirs(target, exist_ok=True)
+    columns = []
+    for i, name in enumerate(df.columns):
+        series = df[name]
+        if series.dtype.kind in 'biufcmM':
+            save_array(target, f'c{i}.npy', series.to_numpy())
+            columns.append({'name': name, 'kind': 'raw', 'values': f'c{i}.npy'})
+        else:
+            # The categories as load_csv(categorical=True) builds them cold
+            # (sorted), not factorize's first-seen order
+            column = series.astype('category')
+            save_array(target, f'c{i}.codes.npy', column.cat.codes.to_numpy().astype(np.int32))
+            save_array(target, f'c{i}.values.npy', np.array([str(v) for v in column.cat.categories], dtype=str))
+            columns.append({
+                'name': name, 'kind': 'text',
+                'codes': f'c{i}.codes.npy', 'values': f'c{i}.values.npy',
+            })
+
+    meta = {
+        'version': CACHE_VERSION,
+        'source': os.path.basename(path),
+        'mtime_ns': stat.st_mtime_ns,
+        'size': stat.st_size,
+        'sha1': file_hash(path),
+        'rows': len(df),
+        'columns': columns,
+    }
+    # meta.json is written last, so a half-written cache is never picked up
+    write_meta(target, meta)
+
+
+def write_meta(target, meta):
+    tmp = os.path.join(target, 'meta.json.tmp')
+    with open(tmp, 'w') as f:
+        json.dump(meta, f)
+    os.replace(tmp, os.path.join(target, 'meta.json'))
+
+
+def save_array(target, filename, array):
+    tmp = os.path.join(target, filename + '.tmp')
+    with open(tmp, 'wb') as f:
+        np.save(f, array, allow_pickle=False)
+    os.replace(tmp, os.path.join(target, filename))
+
+
+def read_columns(target, meta, categorical=False):
+    data = {}
+    for column in meta['columns']:
+        values = np.load(os.path.join(target, column['values']), mmap_mode='r', allow_pickle=False)
+        if column['kind'] == 'raw':
+            data[column['name']] = values
+            continue
+
+        codes = np.load(os.path.join(target, column['codes']), mmap_mode='r', allow_pickle=False)
+        if categorical:
+            data[column['name']] = pd.Categorical.from_codes(np.asarray(codes), categories=values.tolist())
+        else:
+            strings = np.asarray(values, dtype=object).take(codes)
+            strings[np.asarray(codes) < 0] = np.nan
+            data[column['name']] = strings
+
+    # copy=False keeps one block per column instead of consolidating the
+    # memory-mapped arrays into a fresh copy
+    df = pd.DataFrame(data, columns=[column['name'] for column in meta['columns']], copy=False)
+    if len(df) != meta['rows']:
+        raise ValueError("row count mismatch")
+    return df
@@ -0,0 +1,214 @@
+import re
+
+import numpy as np
+import pandas as pd
+
+from player_index import extend_rows, normalize_name, normalized_names
+
+# Scorecard dismissal text -> (type, bowler, fielder).
+#
+#   "c Daryl Mitchell b Mitchell Santner"  caught, Mitchell Santner, Daryl Mitchell
+#   "c & b Logan van Beek"                 caught, Logan van Beek, Logan van Beek
+#   "st Scott Edwards b Aryan Dutt"        stumped, Aryan Dutt, Scott Edwards
+#   "run out (Babar Azam/Mohammad Rizwan)" run out, -, Babar Azam/Mohammad Rizwan
+#
+# The patterns are combined into one alternation, so each distinct string is
+# matched once and the first branch that matches decides its type. Only the
+# distinct strings are parsed; rows pick up their result through the
+# factorized codes.
+DISMISSAL_PATTERNS = [
+    ('not out', r'^not out$'),
+    ('retired hurt', r'^retired hurt'),
+    ('absent hurt', r'^(?:hurt absent|absent hurt)'),
+    ('timed out', r'^timed out$'),
+    ('caught', r'^c (?:&|and) b (?P<bowler>.+)$'),
+    ('caught', r'^c (?P<fielder>.+?) b (?P<bowler>.+)$'),
+    ('stumped', r'^st (?P<fielder>.+?) b (?P<bowler>.+)$'),
+    ('lbw', r'^lbw b (?P<bowler>.+)$'),
+    ('hit wicket', r'^hit wicket b (?P<bowler>.+)$'),
+    ('bowled', r'^b (?P<bowler>.+)$'),
+    ('run out', r'^run out(?: \((?P<fielder>[^)]*)\)| (?P<fielder_plain>.+))?$'),
+    ('obstructing the field', r'^obstructing the field'),
+    ('handled the ball', r'^handled the ball'),
+]
+CAUGHT_AND_BOWLED = r'^c (?:&|and) b '
+DISMISSAL_COLUMNS = ['Dismissal_Type', 'Dismissal_Bowler', 'Dismissal_Fielder']
+
+
+def combined_pattern(patterns):
+    # One regex with a named group per branch (t0, t1, ...) and the branch's
+    # own groups renamed to t0_bowler, t1_fielder, ...
+    branches = []
+    for i, (_, pattern) in enumerate(patterns):
+        body = re.sub(r'\(\?P<(\w+)>', rf'(?P<t{i}_\1>', pattern.lstrip('^'))
+        branches.append(f'(?P<t{i}>{body})')
+    return '^(?:' + '|'.join(branches) + ')'
+
+
+DISMISSAL_REGEX = combined_pattern(DISMISSAL_PATTERNS)
+
+
+def first_valid(groups, columns):
+    # Row-wise first non-null value across the given columns
+    result = pd.Series(np.nan, index=groups.index, dtype=object)
+    for column in columns:
+        if column in groups:
+            result = result.fillna(groups[column])
+    return result
+
+
+def clean_fielders(fielders):
+    # "David Willey sub /Jos Buttler" -> "David Willey/Jos Buttler"; keeper
+    # daggers and substitute markers are dropped. Each distinct value is
+    # cleaned once.
+    codes, uniques = pd.factorize(fielders)
+    parts = (
+        pd.Series(np.asarray(uniques, dtype=object))
+        .str.replace('†', '', regex=False)
+        .str.replace(r'\bsub\b|[()]', '', regex=True)
+        .str.split('/')
+    )
+    cleaned = np.array(
+        ['/'.join(p.strip() for p in names if p.strip()) or np.nan for names in parts] + [np.nan],
+        dtype=object,
+    )
+    return pd.Series(cleaned[codes], index=fielders.index)
+
+
+def parse_unique(text):
+    # text: Series of distinct dismissal strings
+    groups = text.str.strip().str.extract(DISMISSAL_REGEX, flags=re.IGNORECASE)
+    branches = [f't{i}' for i in range(len(DISMISSAL_PATTERNS))]
+    names = np.array([name for name, _ in DISMISSAL_PATTERNS] + ['other'], dtype=object)
+
+    matched = groups[branches].notna().to_numpy()
+    branch = np.where(matched.any(axis=1), matched.argmax(axis=1), len(branches))
+    kind = pd.Series(names[branch], index=text.index).where(text.notna())
+
+    bowler = first_valid(groups, [f'{b}_bowler' for b in branches]).str.strip()
+    fielder = first_valid(groups, [f'{b}_{g}' for b in branches for g in ('fielder', 'fielder_plain')])
+
+    caught_and_bowled = text.str.strip().str.contains(CAUGHT_AND_BOWLED, flags=re.IGNORECASE)
+    caught_and_bowled = caught_and_bowled.fillna(False).astype(bool)
+    fielder[caught_and_bowled] = bowler[caught_and_bowled]
+    return kind, bowler, clean_fielders(fielder.astype(object))
+
+
+def parse_dismissals(dismissals):
+    # Vectorized parse of a Dismissal column into Dismissal_Type,
+    # Dismissal_Bowler and Dismissal_Fielder categoricals
+    if isinstance(dismissals.dtype, pd.CategoricalDtype):
+        codes = dismissals.cat.codes.to_numpy()
+        uniques = pd.Series(dismissals.cat.categories.astype(object))
+    else:
+        codes, uniques = pd.factorize(dismissals)
+        uniques = pd.Series(np.asarray(uniques, dtype=object))
+
+    parsed = {}
+    for column, values in zip(DISMISSAL_COLUMNS, parse_unique(uniques)):
+        # Categorical over the parsed uniques, then broadcast by row code
+        per_unique = pd.Categorical(values)
+        row_codes = np.where(codes >= 0, per_unique.codes.take(np.maximum(codes, 0)), -1)
+        parsed[column] = pd.Categorical.from_codes(row_codes, categories=per_unique.categories)
+    return pd.DataFrame(parsed, index=dismissals.index)
+
+
+def with_dismissals(batting):
+    # Batting frame with the parsed dismissal columns added (no-op when
+    # they are already there)
+    if all(column in batting.columns for column in DISMISSAL_COLUMNS):
+        return batting
+    return pd.concat([batting, parse_dismissals(batting['Dismissal'])], axis=1)
+
+
+class MatchupIndex:
+    # Batter-vs-bowler and fielder lookups over the parsed dismissals.
+    # Keys are normalized names; values are row positions in the batting
+    # frame, so every query is a dict hit plus the size of its slice.
+    def __init__(self, batting):
+        self.batting = batting
+        batter = normalized_names(batting['Batsman_Name'])
+        bowler = normalized_names(batting['Dismissal_Bowler'])
+
+        keys = pd.DataFrame({'bowler': bowler.to_numpy(), 'batter': batter.to_numpy()})
+        self.pair_rows = {
+            key: np.asarray(rows)
+            for key, rows in keys.groupby(['bowler', 'batter'], sort=False).indices.items()
+        }
+        self.bowler_rows = {key: np.asarray(rows) for key, rows in keys.groupby('bowler', sort=False).indices.items()}
+        self.batter_rows = {key: np.asarray(rows) for key, rows in keys.groupby('batter', sort=False).indices.items()}
+
+        # Run outs can credit several fielders: one entry per fielder,
+        # indexed by row position
+        fielders = pd.Series(batting['Dismissal_Fielder'].astype(object).to_numpy()).str.split('/')
+        exploded = fielders.explode().dropna()
+        positions = exploded.index.to_numpy()
+        fielder_keys = normalized_names(exploded.str.strip().reset_index(drop=True))
+        self.fielder_rows = {
+            key: np.sort(positions[rows])
+            for key, rows in fielder_keys.groupby(fielder_keys, sort=False).indices.items()
+        }
+
+        # Full matchup table: dismissals per (bowler, batter, type)
+        table = pd.DataFrame({
+            'Bowler': bowler.to_numpy(),
+            'Batter': batter.to_numpy(),
+            'Type': batting['Dismissal_Type'].astype(object).to_numpy(),
+        }).dropna(subset=['Bowler'])
+        self.table = table.groupby(['Bowler', 'Batter', 'Type'], sort=True).size().rename('Dismissals')
+        self.table_by_batter = self.table.reorder_levels(['Batter', 'Bowler', 'Type']).sort_index()
+
+    def extend(self, batting, start):
+        # Index rows appended to the batting frame at position `start`
+        added = MatchupIndex(batting.iloc[start:])
+        self.batting = batting
+        extend_rows(self.pair_rows, added.pair_rows, start)
+        extend_rows(self.bowler_rows, added.bowler_rows, start)
+        extend_rows(self.batter_rows, added.batter_rows, start)
+        extend_rows(self.fielder_rows, added.fielder_rows, start)
+
+        # The count table is sized by distinct matchups, not rows
+        self.table = self.table.add(added.table, fill_value=0).astype(self.table.dtype).rename('Dismissals')
+        self.table_by_batter = self.table.reorder_levels(['Batter', 'Bowler', 'Type']).sort_index()
+
+    def rows(self, positions):
+        return self.batting.iloc[positions if positions is not None else []]
+
+    def dismissals(self, bowler, batter):
+        # How bowler dismissed batter: one row per innings
+        positions = self.pair_rows.get((normalize_name(bowler), normalize_name(batter)))
+        return self.rows(positions)[['Match_no', 'Match_Between', 'Runs', 'Balls', 'Dismissal_Type',
+                                     'Dismissal_Fielder']]
+
+    def fielding(self, fielder, kind=None):
+        rows = self.rows(self.fielder_rows.get(normalize_name(fielder)))
+        if kind is not None:
+            rows = rows[rows['Dismissal_Type'] == kind]
+        return rows
+
+    def catches(self, fielder):
+        return self.fielding(fielder, 'caught')
+
+    def matchups(self, bowler=None, batter=None):
+        # Slice of the (bowler, batter, type) table; the sorted MultiIndex
+        # makes each slice a binary search
+        if bowler is None and batter is None:
+            return self.table
+        if bowler is None:
+            return self.slice(self.table_by_batter, (normalize_name(batter),))
+        if batter is None:
+            return self.slice(self.table, (normalize_name(bowler),))
+        return self.slice(self.table, (normalize_name(bowler), normalize_name(batter)))
+
+    @staticmethod
+    def slice(table, key):
+        try:
+            return table.loc[key + (slice(None),) * (table.index.nlevels - len(key))]
+        except KeyError:
+            return table.iloc[:0]
+
+    def bowler_victims(self, bowler):
+        return self.rows(self.bowler_rows.get(normalize_name(bowler)))
+
+    def batter_dismissals(self, batter):
+        return self.rows(self.batter_rows.get(normalize_name(batter)))
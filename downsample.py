@@ -0,0 +1,127 @@
+import numpy as np
+import pandas as pd
+
+# Screen-resolution views of the trend series (one row per match number,
+# one column per series).
+#
+# A long line is cut down to what `points` pixels can show: in each
+# pixel-wide bucket of the x range only the lowest and the highest value are
+# kept (in x order), so the drawn line has the same envelope and the same
+# peaks as the full series. Every line is cut down on its own x, so a chart
+# with many lines still draws about 2 x `points` points per line. Frames
+# with many series keep the top N by their latest value and fold the rest
+# into one averaged series.
+OTHERS = 'Others'
+# trend kind -> stats method, as served by the query server
+TREND_SERIES = {
+    'batting': 'batting_trend',
+    'bowling': 'bowling_trend',
+    'win_rates': 'win_rate_trend',
+    'team_runs': 'team_trend',
+}
+
+
+def minmax_positions(x, y, start, end, points):
+    # Positions of the first lowest and first highest non-missing y in each
+    # of `points` equal buckets over [start, end]; x is sorted
+    valid = np.flatnonzero(~np.isnan(y))
+    if not len(valid):
+        return valid
+    scale = points / (end - start) if end > start else 0.0
+    buckets = np.clip(((x[valid] - start) * scale).astype(np.int64), 0, points - 1)
+    values = y[valid]
+    bounds = np.flatnonzero(np.r_[True, buckets[1:] != buckets[:-1]])
+    group = np.repeat(np.arange(len(bounds)), np.diff(np.r_[bounds, len(buckets)]))
+
+    positions = []
+    for extreme in (np.minimum.reduceat(values, bounds), np.maximum.reduceat(values, bounds)):
+        hits = np.flatnonzero(values == extreme[group])
+        first = np.r_[True, group[hits][1:] != group[hits][:-1]]
+        positions.append(valid[hits[first]])
+    return np.concatenate(positions)
+
+
+def line_window(x, y, start=None, end=None, points=None):
+    # Positions of the points of one line with start <= x <= end, plus the
+    # nearest point outside each end so the line runs on to the edges of the
+    # view, cut down to the per-bucket minima and maxima when there are more
+    # than two points per pixel. x is sorted.
+    low = 0 if start is None else max(np.searchsorted(x, start, 'left') - 1, 0)
+    high = len(x) if end is None else min(np.searchsorted(x, end, 'right') + 1, len(x))
+    if points is None or high - low <= 2 * points:
+        return np.arange(low, high)
+    x, y = x[low:high], y[low:high]
+    keep = np.zeros(len(x), dtype=bool)
+    keep[[0, -1]] = True
+    keep[minmax_positions(x, y, x[0] if start is None else start, x[-1] if end is None else end, points)] = True
+    return low + np.flatnonzero(keep)
+
+
+def top_columns(frame, top):
+    # The `top` columns with the highest latest value (the last non-missing
+    # one, e.g. a team's current win rate), best first
+    if top is None or frame.shape[1] <= top or not len(frame):
+        return list(frame.columns)[:top]
+    values = frame.to_numpy(dtype=float)
+    present = ~np.isnan(values)
+    last = len(values) - 1 - np.argmax(present[::-1], axis=0)
+    latest = np.where(present.any(axis=0), values[last, np.arange(values.shape[1])], -np.inf)
+    order = np.argsort(-latest, kind='stable')[:top]
+    return list(frame.columns[order])
+
+
+class TrendView:
+    # A trend prepared once for repeated windowing (zoom and pan redraws).
+    # Each line is held as the x, y and index values of its non-missing
+    # points, so a window is a binary search plus the points inside it; the
+    # top-N selection and the averaged "Others" line are computed once per
+    # N. The stats engines keep one per trend until their data changes.
+    def __init__(self, trend):
+        self.is_series = isinstance(trend, pd.Series)
+        self.name = trend.name if self.is_series else None
+        frame = trend.to_frame() if self.is_series else trend
+        self.frame = frame
+        self.index = frame.index
+        self.x = frame.index.to_numpy(dtype=float)
+        self.lines = {column: self.points(frame[column].to_numpy(dtype=float)) for column in frame.columns}
+        self.groups = {}
+
+    def points(self, y):
+        present = ~np.isnan(y)
+        return self.x[present], y[present], self.index[present]
+
+    def top_lines(self, top):
+        # The lines to draw with all but the `top` columns grouped (ranked
+        # over the whole trend, so the selection does not change while
+        # zooming)
+        if self.is_series or top is None or len(self.lines) <= top:
+            return self.lines
+        if top not in self.groups:
+            kept = top_columns(self.frame, top)
+            rest = ~self.frame.columns.isin(kept)
+            values = self.frame.to_numpy(dtype=float)[:, rest]
+            present = ~np.isnan(values)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                mean = np.where(present, values, 0.0).sum(axis=1) / present.sum(axis=1)
+            lines = {column: self.lines[column] for column in kept}
+            lines[f'{OTHERS} ({rest.sum()})'] = self.points(mean)
+            self.groups[top] = lines
+        return self.groups[top]
+
+    def window(self, start=None, end=None, points=None, top=None):
+        # The trend for the x range [start, end] at `points` pixels: a
+        # Series for a single trend, otherwise {line name: Series}, each
+        # line with its own x
+        lines = {}
+        for name, (x, y, index) in self.top_lines(top).items():
+            positions = line_window(x, y, start, end, points)
+            lines[name] = pd.Series(y[positions], index=index[positions], name=name)
+        if self.is_series:
+            line, = lines.values()
+            return line.rename(self.name)
+        return lines
+
+
+def trend_window(trend, start=None, end=None, points=None, top=None):
+    # One-off TrendView(trend).window(...), for trends that are not kept
+    return TrendView(trend).window(start, end, points, top)
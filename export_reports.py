@@ -0,0 +1,342 @@
+import argparse
+import hashlib
+import html
+import itertools
+import json
+import os
+import re
+import textwrap
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+from charts import MatchChart, TeamChart, make_batting_chart, make_bowling_chart, player_plot
+from cricket_stats import CricketStats
+from data_cache import file_hash
+from schema import load_schedule, load_scorecards
+from summaries import batting_text, bowling_text, match_text, team_text
+
+# Headless batch export of the player, match and team-comparison views.
+#
+#   python export_reports.py --out reports --jobs 4
+#
+# Every report is rendered by the same chart classes and summary text as the
+# GUI tabs, on the Agg canvas, and written as PNG/SVG images plus a JSON
+# summary and an HTML page. Reports are spread over a process pool; each
+# worker loads the data once and reuses one figure per chart type.
+#
+# reports/manifest.json records which reports were written for which
+# version of the input CSVs. A rerun skips reports that are up to date and
+# redoes the ones that are missing or failed, so an interrupted or partly
+# failed export resumes where it stopped.
+DATA_FILES = ['batting_summary.csv', 'bowling_summary.csv', 'match_schedule_results.csv']
+FORMATS = ['png', 'svg', 'json', 'html']
+MANIFEST = 'manifest.json'
+KINDS = ['player', 'match', 'team']
+KIND_DIRS = {'player': 'players', 'match': 'matches', 'team': 'teams'}
+
+_writer = None
+
+
+def slug(text):
+    return re.sub(r'[^A-Za-z0-9]+', '_', str(text)).strip('_')
+
+
+def data_version(paths=DATA_FILES):
+    # Changes whenever an input CSV (or this exporter) changes
+    digest = hashlib.sha1()
+    for path in list(paths) + [os.path.abspath(__file__)]:
+        digest.update(file_hash(path).encode())
+    return digest.hexdigest()
+
+
+def plain(value):
+    # numpy/pandas values -> JSON-serializable Python values
+    if isinstance(value, dict):
+        return {str(k): plain(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple, np.ndarray)):
+        return [plain(v) for v in value]
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, float) and value != value:
+        return None
+    return value
+
+
+def load_stats():
+    batting, bowling = load_scorecards()
+    schedule = load_schedule(teams=batting['Team_Innings'].cat.categories)
+    return CricketStats(batting, bowling, schedule)
+
+
+def report_players(stats):
+    # Everyone who batted or bowled; stats.players only lists batsmen
+    bowlers = stats.bowling_data['Bowler_Name'].dropna().unique()
+    return sorted(set(stats.players).union(bowlers))
+
+
+def report_jobs(stats, kinds=KINDS):
+    # (kind, key) for every report, in a stable order
+    jobs = []
+    if 'player' in kinds:
+        jobs += [('player', player) for player in report_players(stats)]
+    if 'match' in kinds:
+        jobs += [('match', match) for match in stats.matches]
+    if 'team' in kinds:
+        jobs += [('team', pair) for pair in itertools.combinations(stats.teams, 2)]
+    return jobs
+
+
+def report_name(kind, key):
+    if kind == 'team':
+        return os.path.join(KIND_DIRS[kind], f'{slug(key[0])}_vs_{slug(key[1])}')
+    return os.path.join(KIND_DIRS[kind], slug(key))
+
+
+class ReportWriter:
+    # Renders reports in one process. Figures are created on first use per
+    # chart type and updated in place for every later report.
+    def __init__(self, out_dir, formats, stats=None):
+        import matplotlib
+        matplotlib.use('Agg')
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+        from matplotlib.figure import Figure
+
+        self.out_dir = out_dir
+        self.formats = formats
+        self.stats = stats if stats is not None else load_stats()
+        self.figure_type = Figure
+        self.canvas_type = FigureCanvasAgg
+        self.charts = {}
+
+    def chart(self, name, figsize, make_chart):
+        if name not in self.charts:
+            figure = self.figure_type(figsize=figsize)
+            self.canvas_type(figure)
+            self.charts[name] = make_chart(figure)
+        return self.charts[name]
+
+    def write(self, kind, key):
+        name = report_name(kind, key)
+        os.makedirs(os.path.join(self.out_dir, os.path.dirname(name)), exist_ok=True)
+        if kind == 'player':
+            title, sections, data = self.player_report(key, name)
+        elif kind == 'match':
+            title, sections, data = self.match_report(key, name)
+        else:
+            title, sections, data = self.team_report(*key, name=name)
+
+        written = [image for _, _, images in sections for image in images]
+        if 'json' in self.formats:
+            written.append(self.write_file(name + '.json', json.dumps(plain(data), indent=2)))
+        if 'html' in self.formats:
+            written.append(self.write_file(name + '.html', self.html_page(title, sections, name)))
+        return written
+
+    def save_chart(self, chart, name):
+        # Image files for one chart, relative to out_dir
+        images = []
+        for fmt in ('png', 'svg'):
+            if fmt in self.formats:
+                path = f'{name}.{fmt}'
+                chart.figure.savefig(os.path.join(self.out_dir, path))
+                images.append(path)
+        return images
+
+    def write_file(self, path, text):
+        with open(os.path.join(self.out_dir, path), 'w', encoding='utf-8') as f:
+            f.write(text)
+        return path
+
+    def player_report(self, player, name):
+        result = self.stats.player_stats(player)
+        sections = []
+        data = {'player': player, 'batting_summary': None, 'bowling_summary': None}
+
+        # The player tab's charts, form lines included
+        if result['batting_summary']:
+            rows = result['batting']
+            chart = self.chart('batting', (10, 6), make_batting_chart)
+            plot, form = player_plot('batting', rows, self.stats.batting_form(player))
+            chart.update(player, *plot, form=form)
+            sections.append((batting_text(player, result['batting_summary']), 'Batting',
+                             self.save_chart(chart, name + '_batting')))
+            data['batting_summary'] = result['batting_summary']
+            data['batting'] = {column: rows[column].tolist() for column in ('Match_no', 'Runs', 'Strike_Rate')}
+
+        if result['bowling_summary']:
+            rows = result['bowling']
+            chart = self.chart('bowling', (10, 6), make_bowling_chart)
+            plot, form = player_plot('bowling', rows, self.stats.bowling_form(player))
+            chart.update(player, *plot, form=form)
+            sections.append((bowling_text(player, result['bowling_summary']), 'Bowling',
+                             self.save_chart(chart, name + '_bowling')))
+            data['bowling_summary'] = result['bowling_summary']
+            data['bowling'] = {column: rows[column].tolist() for column in ('Match_no', 'Wickets', 'Economy')}
+
+        return player, sections, data
+
+    def match_report(self, match, name):
+        summary = self.stats.match_summary(match)
+        team_scores, top_batsmen = summary['team_scores'], summary['top_batsmen']
+        chart = self.chart('match', (12, 6), MatchChart)
+        chart.update(team_scores, top_batsmen)
+        sections = [(match_text(match, team_scores, top_batsmen), None, self.save_chart(chart, name))]
+        data = {
+            'match': match,
+            'team_scores': {str(team): runs for team, runs in team_scores.items()},
+            'top_batsmen': [
+                {'name': str(batsman), 'runs': runs}
+                for batsman, runs in zip(top_batsmen['Batsman_Name'], top_batsmen['Runs'])
+            ],
+        }
+        return match, sections, data
+
+    def team_report(self, team1, team2, name):
+        team1_stats, team2_stats = self.stats.team_stats(team1), self.stats.team_stats(team2)
+        head_to_head = self.stats.head_to_head(team1, team2)
+        chart = self.chart('team', (12, 6), TeamChart)
+        chart.update([team1, team2], [team1_stats['avg_runs'], team2_stats['avg_runs']],
+                     [team1_stats['avg_economy'], team2_stats['avg_economy']])
+        text = team_text(team1, team2, team1_stats, team2_stats, head_to_head)
+        data = {'teams': [team1, team2], team1: team1_stats, team2: team2_stats, 'head_to_head': head_to_head}
+        return f'{team1} vs {team2}', [(text, None, self.save_chart(chart, name))], data
+
+    def html_page(self, title, sections, name):
+        body = []
+        for text, heading, images in sections:
+            if heading:
+                body.append(f'<h2>{html.escape(heading)}</h2>')
+            body.append(f'<pre>{html.escape(textwrap.dedent(text).strip())}</pre>')
+            # Prefer the scalable image when both were written
+            image = next((path for path in images if path.endswith('.svg')), images[0] if images else None)
+            if image:
+                src = os.path.relpath(image, os.path.dirname(name))
+                body.append(f'<img src="{html.escape(src)}" alt="{html.escape(title)}">')
+        return (f'<!DOCTYPE html>\n<html><head><meta charset="utf-8"><title>{html.escape(title)}</title></head>\n'
+                f'<body>\n<h1>{html.escape(title)}</h1>\n' + '\n'.join(body) + '\n</body></html>\n')
+
+
+def init_worker(out_dir, formats):
+    global _writer
+    _writer = ReportWriter(out_dir, formats)
+
+
+def run_job(job):
+    # Returns (job, written files, error text); failures do not stop the pool
+    try:
+        return job, _writer.write(*job), None
+    except Exception:
+        return job, None, traceback.format_exc()
+
+
+def read_manifest(path):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {'reports': {}}
+
+
+def write_manifest(path, manifest):
+    tmp = path + '.tmp'
+    with open(tmp, 'w') as f:
+        json.dump(manifest, f, indent=1)
+    os.replace(tmp, path)
+
+
+def is_current(entry, version, formats, out_dir):
+    return (
+        entry is not None
+        and entry['version'] == version
+        and set(formats) <= set(entry['formats'])
+        and all(os.path.exists(os.path.join(out_dir, path)) for path in entry['files'])
+    )
+
+
+def export(out_dir='reports', jobs=None, formats=FORMATS, kinds=KINDS, force=False):
+    start = time.perf_counter()
+    os.makedirs(out_dir, exist_ok=True)
+    stats = load_stats()
+    version = data_version()
+    manifest_path = os.path.join(out_dir, MANIFEST)
+    manifest = read_manifest(manifest_path)
+    reports = manifest['reports']
+
+    todo = []
+    skipped = 0
+    for job in report_jobs(stats, kinds):
+        if not force and is_current(reports.get(report_name(*job)), version, formats, out_dir):
+            skipped += 1
+        else:
+            todo.append(job)
+    print(f"{len(todo)} reports to write, {skipped} up to date")
+
+    failed = []
+    done = 0
+
+    def record(job, written, error):
+        nonlocal done
+        name = report_name(*job)
+        if error is not None:
+            failed.append(job)
+            reports.pop(name, None)
+            print(f"Failed {name}:\n{error}")
+            return
+        reports[name] = {'version': version, 'formats': list(formats), 'files': written}
+        done += 1
+        if done % 50 == 0:
+            write_manifest(manifest_path, manifest)
+
+    render_start = time.perf_counter()
+    try:
+        if jobs == 0:
+            # In-process, for debugging
+            writer = ReportWriter(out_dir, formats, stats)
+            for job in todo:
+                try:
+                    record(job, writer.write(*job), None)
+                except Exception:
+                    record(job, None, traceback.format_exc())
+        elif todo:
+            with ProcessPoolExecutor(jobs, initializer=init_worker, initargs=(out_dir, formats)) as pool:
+                for future in as_completed([pool.submit(run_job, job) for job in todo]):
+                    record(*future.result())
+    finally:
+        write_manifest(manifest_path, manifest)
+
+    elapsed = time.perf_counter() - start
+    rendering = time.perf_counter() - render_start
+    rate = done / rendering if rendering > 0 else 0.0
+    print(f"Wrote {done} reports, skipped {skipped}, failed {len(failed)} in {elapsed:.1f}s "
+          f"({rate:.1f} reports/sec)")
+    return {'written': done, 'skipped': skipped, 'failed': failed, 'seconds': elapsed, 'reports_per_sec': rate}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export player, match and team reports without the GUI.")
+    parser.add_argument('--out', default='reports', help="output directory (default %(default)s)")
+    parser.add_argument('--jobs', type=int, default=os.cpu_count(),
+                        help="worker processes (default: CPU count, 0 renders in this process)")
+    parser.add_argument('--formats', default=','.join(FORMATS),
+                        help="comma-separated subset of %(default)s")
+    parser.add_argument('--only', default=','.join(KINDS),
+                        help="comma-separated report kinds (default %(default)s)")
+    parser.add_argument('--force', action='store_true', help="rewrite reports that are up to date")
+    args = parser.parse_args()
+
+    formats = [fmt for fmt in args.formats.split(',') if fmt]
+    kinds = [kind for kind in args.only.split(',') if kind]
+    for value, allowed in ((formats, FORMATS), (kinds, KINDS)):
+        unknown = set(value) - set(allowed)
+        if unknown:
+            parser.error(f"unknown value(s): {', '.join(sorted(unknown))}")
+
+    result = export(args.out, args.jobs, formats, kinds, args.force)
+    raise SystemExit(1 if result['failed'] else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,166 @@
+import numpy as np
+import pandas as pd
+
+from player_index import extend_rows, normalize_name, normalized_names
+
+FORM_WINDOW = 5
+
+# Rolling sums kept per row, and the form metrics derived from them. The
+# average is runs per innings, the same definition as the batting summary.
+FORM_SPECS = {
+    'batting': {
+        'name': 'Batsman_Name',
+        'sums': ['Runs', 'Balls'],
+        'metrics': {
+            'Average': lambda sums, innings: sums['Runs'] / innings,
+            'Strike_Rate': lambda sums, innings: sums['Runs'] * 100 / sums['Balls'],
+        },
+    },
+    'bowling': {
+        'name': 'Bowler_Name',
+        'sums': ['Runs', 'Balls', 'Wickets'],
+        'metrics': {
+            'Economy': lambda sums, innings: sums['Runs'] * 6 / sums['Balls'],
+            'Recent_Wickets': lambda sums, innings: sums['Wickets'],
+        },
+    },
+}
+# Leaderboard order: the lowest economy is the best
+ASCENDING = {'Economy'}
+
+
+def rolling_sums(codes, values, window):
+    # `codes` groups the rows, each group contiguous and in innings order.
+    # Returns the sums of `values` (rows x columns) over each row's last
+    # `window` rows within its group, and how many rows each sum covers.
+    # One cumulative sum serves every group: a window is the difference of
+    # two prefix sums, with the lower end clamped to the group's first row.
+    positions = np.arange(len(codes))
+    starts = np.r_[True, codes[1:] != codes[:-1]] if len(codes) else np.empty(0, dtype=bool)
+    first = np.maximum.accumulate(np.where(starts, positions, 0)) if len(codes) else positions
+    lower = np.maximum(positions - window + 1, first)
+    cumulative = np.vstack([np.zeros((1, values.shape[1]), dtype=values.dtype), np.cumsum(values, axis=0)])
+    return cumulative[positions + 1] - cumulative[lower], positions - lower + 1
+
+
+class FormIndex:
+    # Rolling form over each player's last `window` innings (batting) or
+    # spells (bowling), for every player at once.
+    #
+    # `tables[kind]` holds one row per innings with the rolling sums and
+    # metrics after it, grouped by player in innings order; `rows[kind]`
+    # maps each normalized name to its row positions, so a form curve is a
+    # dict hit plus a slice. `latest[kind]` has each player's current form
+    # (the last row) for the leaderboard.
+    #
+    # Appended scorecard rows are treated as the newest innings: only the
+    # previous window - 1 rows of the players involved are read back to
+    # seed their windows.
+    def __init__(self, batting_data, bowling_data, window=FORM_WINDOW):
+        self.window = window
+        self.tables, self.rows, self.latest = {}, {}, {}
+        for kind, spec in FORM_SPECS.items():
+            columns = ['Player', 'Match_no'] + spec['sums'] + ['Innings'] + list(spec['metrics'])
+            self.tables[kind] = pd.DataFrame(columns=columns)
+            self.rows[kind] = {}
+            self.latest[kind] = pd.DataFrame(columns=['Match_no', 'Innings', 'Total_Innings'] + list(spec['metrics']))
+        self.extend(batting_data, bowling_data)
+
+    def extend(self, batting_data, bowling_data):
+        # Fold in scorecard rows appended since the last call (all rows on
+        # the first call)
+        self.extend_kind('batting', batting_data)
+        self.extend_kind('bowling', bowling_data)
+
+    def extend_kind(self, kind, frame):
+        spec = FORM_SPECS[kind]
+        keys = normalized_names(frame[spec['name']])
+        valid = keys.notna().to_numpy()
+        if not valid.any():
+            return
+        names = keys.to_numpy()[valid]
+        matches = frame['Match_no'].to_numpy()[valid]
+        values = np.column_stack([frame[column].to_numpy(dtype=np.int64)[valid] for column in spec['sums']])
+
+        # New rows grouped by player, in match order within a player
+        codes, uniques = pd.factorize(names)
+        order = np.lexsort((matches, codes))
+        codes, matches, values = codes[order], matches[order], values[order]
+
+        # Seed each known player's window with their previous rows
+        table, rows = self.tables[kind], self.rows[kind]
+        tails = [(code, rows[name][-(self.window - 1):]) for code, name in enumerate(uniques)
+                 if name in rows and self.window > 1]
+        if tails:
+            tail_codes = np.concatenate([np.full(len(positions), code) for code, positions in tails])
+            tail_positions = np.concatenate([positions for _, positions in tails])
+            tail_values = table[spec['sums']].to_numpy(dtype=np.int64)[tail_positions]
+            combined_codes = np.concatenate([tail_codes, codes])
+            combined = np.lexsort((np.arange(len(combined_codes)), combined_codes))
+            is_new = combined >= len(tail_codes)
+            sums, innings = rolling_sums(combined_codes[combined],
+                                         np.vstack([tail_values, values])[combined], self.window)
+            sums, innings = sums[is_new], innings[is_new]
+        else:
+            sums, innings = rolling_sums(codes, values, self.window)
+
+        added = pd.DataFrame({'Player': uniques[codes], 'Match_no': matches})
+        sums = pd.DataFrame(sums, columns=spec['sums'])
+        with np.errstate(divide='ignore', invalid='ignore'):
+            metrics = {name: np.asarray(metric(sums, innings), dtype=float)
+                       for name, metric in spec['metrics'].items()}
+        for column in spec['sums']:
+            added[column] = values[:, spec['sums'].index(column)]
+        added['Innings'] = innings
+        for name, metric in metrics.items():
+            added[name] = np.where(np.isfinite(metric), metric, np.nan)
+
+        offset = len(table)
+        bounds = np.searchsorted(codes, np.arange(len(uniques) + 1))
+        extend_rows(rows, {name: np.arange(bounds[code], bounds[code + 1]) for code, name in enumerate(uniques)},
+                    offset)
+        self.tables[kind] = added if not offset else pd.concat([table, added], ignore_index=True)
+
+        # Current form: each player's last new row, innings counts carried over
+        latest = added.iloc[bounds[1:] - 1].set_index('Player')
+        latest = latest.drop(columns=spec['sums'])
+        latest['Total_Innings'] = np.diff(bounds)
+        previous = self.latest[kind]
+        known = previous.index.intersection(latest.index)
+        latest.loc[known, 'Total_Innings'] += previous.loc[known, 'Total_Innings'].to_numpy(dtype=np.int64)
+        latest = latest[previous.columns]
+        self.latest[kind] = latest if previous.empty else pd.concat([previous.drop(index=known), latest])
+
+    def curve(self, kind, player):
+        # Per-innings rolling form of one player, empty if unknown
+        positions = self.rows[kind].get(normalize_name(player))
+        if positions is None:
+            return self.tables[kind].iloc[:0]
+        return self.tables[kind].iloc[positions]
+
+    def batting(self, player):
+        return self.curve('batting', player)[['Match_no', 'Innings', 'Average', 'Strike_Rate']]
+
+    def bowling(self, player):
+        return self.curve('bowling', player)[['Match_no', 'Innings', 'Economy', 'Recent_Wickets']]
+
+    def leaders(self, metric='Average', k=10, min_innings=None):
+        # Top k players by current form on `metric`, among players whose
+        # window is full (or has at least min_innings rows)
+        kind = 'bowling' if metric in FORM_SPECS['bowling']['metrics'] else 'batting'
+        latest = self.latest[kind]
+        min_innings = self.window if min_innings is None else min_innings
+        eligible = latest[latest['Innings'].to_numpy(dtype=np.int64) >= min_innings]
+
+        score = eligible[metric].to_numpy(dtype=float)
+        if metric not in ASCENDING:
+            score = -score
+        score = np.where(np.isnan(score), np.inf, score)
+        k = min(k, len(score))
+        if not k:
+            return eligible.iloc[:0]
+        # Everything tied with the k-th score competes on name, so the
+        # result does not depend on the partition order
+        top = np.flatnonzero(score <= np.partition(score, k - 1)[k - 1])
+        top = top[np.lexsort((eligible.index.to_numpy()[top].astype(str), score[top]))][:k]
+        return eligible.iloc[top]
@@ -0,0 +1,271 @@
+import bisect
+import math
+
+import numpy as np
+import pandas as pd
+
+from player_index import normalized_names
+
+# Leaderboard metrics: which side of the game they come from, and whether a
+# lower value ranks higher. Averages follow the batting summary (runs per
+# innings).
+METRICS = {
+    'Runs': ('batting', False),
+    'Average': ('batting', False),
+    'Strike_Rate': ('batting', False),
+    'Boundaries': ('batting', False),
+    'Wickets': ('bowling', False),
+    'Economy': ('bowling', True),
+}
+ROLES = ['Batter', 'All-rounder', 'Bowler']
+# Batting_Position groups offered by the GUI
+POSITION_GROUPS = {
+    'Openers (1-2)': [1, 2],
+    'Top order (1-3)': [1, 2, 3],
+    'Middle order (4-7)': [4, 5, 6, 7],
+    'Lower order (8-11)': [8, 9, 10, 11],
+}
+COLUMNS = ['Team', 'Role', 'Innings', 'Runs', 'Balls', 'Average', 'Strike_Rate', '4s', '6s', 'Boundaries',
+           'Highest', 'Spells', 'Wickets', 'Runs_Conceded', 'Economy']
+# Columns the `ranges` filter accepts
+RANGE_COLUMNS = [column for column in COLUMNS if column not in ('Team', 'Role')]
+# How grain rows for the same key combine when scorecard rows are appended
+BATTING_GRAIN = (['Player', 'Team', 'Position'],
+                 {'Innings': 'sum', 'Runs': 'sum', 'Balls': 'sum', '4s': 'sum', '6s': 'sum', 'Highest': 'max'})
+BOWLING_GRAIN = (['Player', 'Team'], {'Spells': 'sum', 'Balls_Bowled': 'sum', 'Runs_Conceded': 'sum', 'Wickets': 'sum'})
+
+
+def batting_grain(batting):
+    # Batting sums per (player, team, batting position); every leaderboard
+    # scope is a sum over some of these rows
+    frame = pd.DataFrame({
+        'Player': normalized_names(batting['Batsman_Name']).to_numpy(),
+        'Team': batting['Team_Innings'].astype(object).to_numpy(),
+        'Position': batting['Batting_Position'].to_numpy(),
+        'Runs': batting['Runs'].to_numpy(dtype=np.int64),
+        'Balls': batting['Balls'].to_numpy(dtype=np.int64),
+        '4s': batting['4s'].to_numpy(dtype=np.int64),
+        '6s': batting['6s'].to_numpy(dtype=np.int64),
+    }).dropna(subset=['Player', 'Team'])
+    return frame.groupby(['Player', 'Team', 'Position'], sort=True).agg(
+        Innings=('Runs', 'size'), Runs=('Runs', 'sum'), Balls=('Balls', 'sum'),
+        **{'4s': ('4s', 'sum'), '6s': ('6s', 'sum')}, Highest=('Runs', 'max'),
+    ).reset_index()
+
+
+def bowling_grain(bowling):
+    frame = pd.DataFrame({
+        'Player': normalized_names(bowling['Bowler_Name']).to_numpy(),
+        'Team': bowling['Bowling_Team'].astype(object).to_numpy(),
+        'Balls': bowling['Balls'].to_numpy(dtype=np.int64),
+        'Runs': bowling['Runs'].to_numpy(dtype=np.int64),
+        'Wickets': bowling['Wickets'].to_numpy(dtype=np.int64),
+    }).dropna(subset=['Player', 'Team'])
+    return frame.groupby(['Player', 'Team'], sort=True).agg(
+        Spells=('Wickets', 'size'), Balls_Bowled=('Balls', 'sum'), Runs_Conceded=('Runs', 'sum'),
+        Wickets=('Wickets', 'sum'),
+    ).reset_index()
+
+
+def main_team(grain, weight):
+    # The team a player appeared for most often
+    counts = grain.groupby(['Player', 'Team'], sort=True)[weight].sum()
+    counts = counts.sort_values(ascending=False, kind='mergesort').reset_index()
+    return counts.drop_duplicates('Player').set_index('Player')['Team']
+
+
+def player_table(batting, bowling, roles=None):
+    # One row per player with the sums and metrics of the given grain rows
+    bat = batting.groupby('Player', sort=True).agg(
+        Innings=('Innings', 'sum'), Runs=('Runs', 'sum'), Balls=('Balls', 'sum'),
+        **{'4s': ('4s', 'sum'), '6s': ('6s', 'sum')}, Highest=('Highest', 'max'),
+    )
+    bowl = bowling.groupby('Player', sort=True)[['Spells', 'Balls_Bowled', 'Runs_Conceded', 'Wickets']].sum()
+    table = bat.join(bowl, how='outer').sort_index()
+
+    team = main_team(batting, 'Innings')
+    team = team.reindex(table.index).fillna(main_team(bowling, 'Spells').reindex(table.index))
+    table['Team'] = team.to_numpy()
+    for column in ('Innings', 'Runs', 'Balls', '4s', '6s', 'Spells', 'Balls_Bowled', 'Runs_Conceded', 'Wickets'):
+        table[column] = table[column].fillna(0).astype(np.int64)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        innings = table['Innings'].to_numpy(dtype=float)
+        table['Average'] = np.where(innings > 0, table['Runs'] / innings, np.nan)
+        table['Strike_Rate'] = np.where(table['Balls'] > 0, table['Runs'] * 100 / table['Balls'], np.nan)
+        table['Economy'] = np.where(table['Balls_Bowled'] > 0,
+                                    table['Runs_Conceded'] * 6 / table['Balls_Bowled'], np.nan)
+    table['Boundaries'] = table['4s'] + table['6s']
+    table['Role'] = player_roles(batting, table) if roles is None else roles.reindex(table.index).to_numpy()
+    return table[COLUMNS]
+
+
+def player_roles(batting, table):
+    # Scorecards carry no roles, so they are inferred: bowling in at least a
+    # third of a player's appearances makes a bowler, or an all-rounder when
+    # they also bat in the top seven on average
+    appearances = np.maximum(table['Innings'], table['Spells']).to_numpy(dtype=float)
+    bowls = table['Spells'].to_numpy(dtype=float) * 3 >= appearances
+    weighted = (batting['Position'] * batting['Innings']).groupby(batting['Player']).sum()
+    position = (weighted / batting.groupby('Player')['Innings'].sum()).reindex(table.index).to_numpy()
+    return np.where(~bowls, 'Batter', np.where(position <= 7, 'All-rounder', 'Bowler'))
+
+
+def merge_grain(grain, added, grain_keys):
+    # Grain rows of appended scorecard rows folded into `grain`: the
+    # players in `added` are re-aggregated, everyone else's rows are kept
+    keys, how = grain_keys
+    players = grain['Player'].isin(added['Player'].unique()).to_numpy()
+    merged = pd.concat([grain[players], added]).groupby(keys, sort=True).agg(how).reset_index()
+    return pd.concat([grain[~players], merged[list(grain.columns)]], ignore_index=True)
+
+
+def metric_key(values, ascending):
+    # Sort key per row: best first, missing values last
+    key = values if ascending else -values
+    return np.where(np.isnan(key), np.inf, key)
+
+
+def presorted(table):
+    # Row order per metric, best first, ties by name; missing values last
+    names = table.index.to_numpy().astype(str)
+    orders = {}
+    for metric, (_, ascending) in METRICS.items():
+        orders[metric] = np.lexsort((names, metric_key(table[metric].to_numpy(dtype=float), ascending)))
+    return orders
+
+
+def update_scope(table, orders, rows):
+    # `rows` (player_table rows of re-aggregated players) replace their rows
+    # in `table`, or are appended for new players. Each presorted order
+    # keeps the other rows as they were and puts the changed ones back in
+    # with a binary search, so nothing is sorted again.
+    positions = table.index.get_indexer(rows.index)
+    present = positions >= 0
+    added = ~present
+    data = {}
+    for column in table.columns:
+        values, new = table[column].to_numpy(), rows[column].to_numpy()
+        values = np.concatenate([values, new[added]]) if added.any() else values.copy()
+        values[positions[present]] = new[present]
+        data[column] = values
+    positions[added] = np.arange(len(table), len(table) + added.sum())
+    table = pd.DataFrame(data, index=table.index.append(rows.index[added]), copy=False).astype(table.dtypes)
+
+    names = table.index.to_numpy()
+    changed = np.sort(positions)
+    merged = {}
+    for metric, (_, ascending) in METRICS.items():
+        keys = metric_key(table[metric].to_numpy(dtype=float), ascending)
+
+        def row_key(row):
+            return keys[row], str(names[row])
+        kept = orders[metric][~np.isin(orders[metric], changed)]
+        moved = sorted(changed, key=row_key)
+        at = [bisect.bisect_left(kept, row_key(row), key=row_key) for row in moved]
+        merged[metric] = np.insert(kept, at, moved)
+    return table, merged
+
+
+class Leaderboard:
+    # Career (or per-tournament, depending on the rows given) leaderboards
+    # over runs, average, strike rate, boundaries, wickets and economy.
+    #
+    # Batting is aggregated once per (player, team, batting position) and
+    # bowling per (player, team). The per-player table and one presorted
+    # row order per metric are built up front; a query turns its filters
+    # into a boolean mask and walks the presorted order, so paging through
+    # results never sorts. A Batting_Position filter needs its own sums:
+    # those tables and orders are built on first use and kept.
+    def __init__(self, batting_data, bowling_data):
+        self.batting = batting_grain(batting_data)
+        self.bowling = bowling_grain(bowling_data)
+        self.table = player_table(self.batting, self.bowling)
+        self.orders = presorted(self.table)
+        self.position_scopes = {}
+
+    def extend(self, batting_data, bowling_data):
+        # Scorecard rows appended since the leaderboard was built. Only the
+        # players in them are re-aggregated and re-ranked (update_scope);
+        # merging their grain rows is a vectorized pass over the grain,
+        # which has one row per player, team and position, not per innings.
+        batting, bowling = batting_grain(batting_data), bowling_grain(bowling_data)
+        self.batting = merge_grain(self.batting, batting, BATTING_GRAIN)
+        self.bowling = merge_grain(self.bowling, bowling, BOWLING_GRAIN)
+
+        players = pd.unique(np.concatenate([batting['Player'].to_numpy(), bowling['Player'].to_numpy()]))
+        batting = self.batting[self.batting['Player'].isin(players).to_numpy()]
+        bowling = self.bowling[self.bowling['Player'].isin(players).to_numpy()]
+        self.table, self.orders = update_scope(self.table, self.orders, player_table(batting, bowling))
+        for key, (table, orders) in self.position_scopes.items():
+            rows = player_table(batting[batting['Position'].isin(key)], bowling, roles=self.table['Role'])
+            self.position_scopes[key] = update_scope(table, orders, rows)
+
+    @property
+    def teams(self):
+        return sorted(self.table['Team'].dropna().unique())
+
+    def scope(self, positions=None):
+        # (table, orders) for all innings or only those at `positions`
+        if not positions:
+            return self.table, self.orders
+        key = tuple(sorted(set(int(position) for position in positions)))
+        if key not in self.position_scopes:
+            batting = self.batting[self.batting['Position'].isin(key)]
+            table = player_table(batting, self.bowling, roles=self.table['Role'])
+            self.position_scopes[key] = (table, presorted(table))
+        return self.position_scopes[key]
+
+    def query(self, metric='Runs', team=None, positions=None, role=None, ranges=None, min_innings=1,
+              players=None, page=0, page_size=20):
+        # One page of the ranking on `metric`. Filters:
+        #   team       team name or list of names
+        #   positions  batting positions whose innings count (e.g. [1, 2])
+        #   role       'Batter', 'All-rounder' or 'Bowler', or a list
+        #   ranges     {column: (low, high)}, either bound may be None,
+        #              e.g. {'Strike_Rate': (100, None)}
+        #   min_innings  innings (batting metrics) or spells (bowling
+        #              metrics); players who never batted or bowled are
+        #              always left out
+        #   players    only these (normalized) names, e.g. from the
+        #              player profile filters
+        # Returns the page rows with their rank, the number of qualifying
+        # players and the page count.
+        if metric not in METRICS:
+            raise ValueError(f"Unknown metric {metric!r}, expected one of {', '.join(METRICS)}")
+        if page < 0:
+            raise ValueError(f"Page must be 0 or more, got {page}")
+        if page_size < 1:
+            raise ValueError(f"Page size must be at least 1, got {page_size}")
+        for column in ranges or {}:
+            if column not in RANGE_COLUMNS:
+                raise ValueError(f"Unknown range column {column!r}, expected one of {', '.join(RANGE_COLUMNS)}")
+        table, orders = self.scope(positions)
+
+        side, _ = METRICS[metric]
+        mask = table[metric].notna().to_numpy(copy=True)
+        mask &= table['Innings' if side == 'batting' else 'Spells'].to_numpy() >= max(min_innings, 1)
+        if team is not None:
+            mask &= table['Team'].isin([team] if isinstance(team, str) else team).to_numpy()
+        if role is not None:
+            mask &= table['Role'].isin([role] if isinstance(role, str) else role).to_numpy()
+        if players is not None:
+            mask &= table.index.isin(list(players))
+        for column, (low, high) in (ranges or {}).items():
+            values = table[column].to_numpy(dtype=float)
+            if low is not None:
+                mask &= values >= low
+            if high is not None:
+                mask &= values <= high
+
+        order = orders[metric]
+        hits = order[mask[order]]
+        start = page * page_size
+        rows = table.iloc[hits[start:start + page_size]]
+        rows.insert(0, 'Rank', np.arange(start + 1, start + len(rows) + 1))
+        return {
+            'rows': rows,
+            'total': len(hits),
+            'page': page,
+            'pages': math.ceil(len(hits) / page_size),
+        }
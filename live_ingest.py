@@ -0,0 +1,80 @@
+import io
+import os
+
+import pandas as pd
+
+from schema import ScorecardBuffer, load_schedule
+
+
+class CsvTail:
+    # Reads the rows appended to a CSV since the previous call by tracking
+    # a byte offset. Only complete lines are consumed; a row that is still
+    # being written stays in the file until its newline arrives.
+    def __init__(self, path, offset=None):
+        self.path = path
+        with open(path, 'rb') as f:
+            self.header = f.readline()
+        self.offset = os.path.getsize(path) if offset is None else offset
+
+    def read(self):
+        # New rows as a DataFrame (empty when nothing was appended), or None
+        # when the file was truncated or rewritten and has to be reloaded
+        size = os.path.getsize(self.path)
+        with open(self.path, 'rb') as f:
+            if size < self.offset or f.readline() != self.header:
+                return None
+            f.seek(self.offset)
+            chunk = f.read(size - self.offset)
+
+        end = chunk.rfind(b'\n') + 1
+        self.offset += end
+        return pd.read_csv(io.BytesIO(self.header + chunk[:end]))
+
+
+class LiveIngest:
+    # Watch mode for the scorecard CSVs. Create it before loading the data
+    # so that rows written during the load are picked up by the first poll.
+    def __init__(self, batting_path='batting_summary.csv', bowling_path='bowling_summary.csv',
+                 schedule_path='match_schedule_results.csv'):
+        self.batting = CsvTail(batting_path)
+        self.bowling = CsvTail(bowling_path)
+        self.schedule_path = schedule_path
+        self.schedule_mtime = self.mtime(schedule_path)
+        self.buffer = None
+
+    @staticmethod
+    def mtime(path):
+        try:
+            return os.stat(path).st_mtime_ns
+        except OSError:
+            return None
+
+    def poll(self, batting, bowling):
+        # Appended rows merged onto the current typed frames. Returns None
+        # when nothing changed, {'reload': True} when a file was rewritten,
+        # otherwise the new frames plus the schedule if it changed (results
+        # are filled in after each match; the file is a few dozen rows).
+        new_batting = self.batting.read()
+        new_bowling = self.bowling.read()
+        if new_batting is None or new_bowling is None:
+            return {'reload': True}
+
+        update = {'reload': False, 'batting_rows': len(new_batting), 'bowling_rows': len(new_bowling)}
+        mtime = self.mtime(self.schedule_path)
+        if mtime != self.schedule_mtime:
+            self.schedule_mtime = mtime
+            update['schedule'] = load_schedule(self.schedule_path, teams=batting['Team_Innings'].cat.categories)
+        if not len(new_batting) and not len(new_bowling):
+            if 'schedule' not in update:
+                return None
+            update['batting'], update['bowling'] = batting, bowling
+            return update
+
+        # The buffer carries on from the frames it returned last; other
+        # frames (the first poll, or an update that was not applied) are
+        # copied into a new one
+        frames = self.buffer.frames if self.buffer is not None else {}
+        if frames.get('batting') is not batting or frames.get('bowling') is not bowling:
+            self.buffer = ScorecardBuffer(batting, bowling)
+        update['batting'], update['bowling'] = self.buffer.append(new_batting, new_bowling)
+        return update
@@ -0,0 +1,100 @@
+import bisect
+
+import numpy as np
+import pandas as pd
+
+
+def normalize_name(name):
+    # Same normalization the player tab has always used: strip + title case
+    return str(name).strip().title()
+
+
+def normalized_names(names):
+    # Normalize each distinct spelling once and broadcast back to the rows
+    codes, uniques = pd.factorize(names)
+    keys = np.array([normalize_name(name) for name in uniques] + [None], dtype=object)
+    return pd.Series(keys[codes], index=names.index)
+
+
+def extend_rows(rows, added, offset):
+    # Append the positions in `added` (relative to `offset`) to the
+    # position arrays in `rows`, keeping each array sorted
+    for key, positions in added.items():
+        positions = np.asarray(positions) + offset
+        rows[key] = np.concatenate([rows[key], positions]) if key in rows else positions
+
+
+class PlayerIndex:
+    # Built once at load time. Maps each normalized player name to the row
+    # positions of that player in the batting and bowling frames, so lookups
+    # cost a dict hit plus the size of the result slice.
+    def __init__(self, batting_data, bowling_data):
+        self.batting_rows = self._build(batting_data['Batsman_Name'])
+        self.bowling_rows = self._build(bowling_data['Bowler_Name'])
+
+        # Canonical names used for partial matching and "did you mean"
+        self.names = sorted(set(self.batting_rows) | set(self.bowling_rows))
+        self._lower_names = [name.lower() for name in self.names]
+
+    @staticmethod
+    def _build(names):
+        # Normalize each distinct spelling once, then group row positions
+        # by the normalized key
+        codes, uniques = pd.factorize(names)
+        keys = [normalize_name(name) for name in uniques]
+        order = np.argsort(codes, kind='stable')
+        bounds = np.searchsorted(codes[order], np.arange(len(uniques) + 1))
+
+        rows = {}
+        for code, key in enumerate(keys):
+            positions = order[bounds[code]:bounds[code + 1]]
+            if key in rows:
+                positions = np.sort(np.concatenate([rows[key], positions]))
+            rows[key] = positions
+        return rows
+
+    def extend(self, batting_data, bowling_data, batting_start, bowling_start):
+        # Index rows appended at the given positions
+        extend_rows(self.batting_rows, self._build(batting_data['Batsman_Name']), batting_start)
+        extend_rows(self.bowling_rows, self._build(bowling_data['Bowler_Name']), bowling_start)
+
+        known = set(self.names)
+        for name in sorted((set(self.batting_rows) | set(self.bowling_rows)) - known):
+            i = bisect.bisect(self.names, name)
+            self.names.insert(i, name)
+            self._lower_names.insert(i, name.lower())
+
+    def __contains__(self, player):
+        player = normalize_name(player)
+        return player in self.batting_rows or player in self.bowling_rows
+
+    def lookup(self, player):
+        # Exact match on the normalized name; returns (batting, bowling)
+        # row positions
+        player = normalize_name(player)
+        empty = np.empty(0, dtype=np.intp)
+        return self.batting_rows.get(player, empty), self.bowling_rows.get(player, empty)
+
+    def search(self, text):
+        # Case-insensitive substring match against the canonical names
+        # instead of every row
+        text = str(text).strip().lower()
+        if not text:
+            return []
+        return [name for name, lower in zip(self.names, self._lower_names) if text in lower]
+
+    def partial_lookup(self, text):
+        matches = self.search(text)
+        batting = [self.batting_rows[name] for name in matches if name in self.batting_rows]
+        bowling = [self.bowling_rows[name] for name in matches if name in self.bowling_rows]
+        return self._merge(batting), self._merge(bowling)
+
+    def suggestions(self, text, limit=5):
+        return self.search(text)[:limit]
+
+    @staticmethod
+    def _merge(position_lists):
+        if not position_lists:
+            return np.empty(0, dtype=np.intp)
+        return np.sort(np.concatenate(position_lists))
+
@@ -0,0 +1,160 @@
+import io
+import mmap
+
+import numpy as np
+import pandas as pd
+
+from player_index import normalize_name
+
+# Player profiles from world_cup_players_info.csv.
+#
+# Everything except the biography is loaded at startup: the team, role and
+# style columns as categoricals (the filters work on their codes). The
+# `description` column is most of the file, so only its byte span is kept
+# and a biography is read from disk when a player is shown. One chunked pass
+# over the raw bytes finds the record and field boundaries; the short columns
+# are then parsed from the bytes in front of each description, so the long
+# text is never tokenized or held in memory.
+DEFAULT_PROFILES = 'world_cup_players_info.csv'
+LAZY_COLUMN = 'description'
+INDEX_COLUMNS = ['team_name', 'playingRole', 'battingStyle', 'bowlingStyle']
+# The file spells the same style several ways ("Right-hand bat", "Right hand
+# Bat"); styles are compared in one spelling
+STYLE_COLUMNS = ['battingStyle', 'bowlingStyle']
+# Bytes scanned at a time when indexing the file
+SCAN_CHUNK = 1 << 20
+
+
+def clean_style(value):
+    return value.replace('-', ' ').title()
+
+
+def record_spans(buffer, chunk_size=SCAN_CHUNK):
+    # (record start, last field start, record end) for every non-empty
+    # line of a CSV held as a uint8 array. Commas and newlines only count
+    # outside double quotes: a byte is quoted when an odd number of quotes
+    # precede it. The bytes are scanned one chunk at a time, carrying the
+    # quote state and the last comma seen into the next chunk, so the scan
+    # only holds chunk-sized arrays plus one entry per record.
+    ends, last_commas = [], []
+    in_quotes, last_comma = False, -1
+    for offset in range(0, len(buffer), chunk_size):
+        chunk = buffer[offset:offset + chunk_size]
+        quoted = np.bitwise_xor.accumulate((chunk == ord('"')).view(np.uint8)).view(bool)
+        if in_quotes:
+            quoted = ~quoted
+        in_quotes = bool(quoted[-1])
+        newlines = np.flatnonzero((chunk == ord('\n')) & ~quoted)
+        commas = np.flatnonzero((chunk == ord(',')) & ~quoted) + offset
+        # The last comma before each newline, from this chunk or an earlier one
+        previous = np.r_[last_comma, commas]
+        ends.append(newlines + offset)
+        last_commas.append(previous[np.searchsorted(commas, newlines + offset)])
+        last_comma = previous[-1]
+
+    ends = np.concatenate(ends) if ends else np.zeros(0, dtype=np.int64)
+    last_field = (np.concatenate(last_commas) if last_commas else np.zeros(0, dtype=np.int64)) + 1
+    if not len(buffer) or buffer[-1] != ord('\n'):
+        ends = np.r_[ends, len(buffer)]
+        last_field = np.r_[last_field, last_comma + 1]
+    starts = np.r_[0, ends[:-1] + 1]
+
+    # A trailing \r belongs to the line ending, not to the last field
+    crlf = (ends > starts) & (buffer[np.maximum(ends - 1, 0)] == ord('\r'))
+    ends = ends - crlf
+    keep = (ends > starts) & (last_field > starts) & (last_field <= ends)
+    return starts[keep], last_field[keep], ends[keep]
+
+
+def unquote(text):
+    if len(text) >= 2 and text[0] == '"' and text[-1] == '"':
+        return text[1:-1].replace('""', '"')
+    return text
+
+
+class PlayerProfiles:
+    # `frame` has one row per profile with the short columns; `description`
+    # maps a row position to that player's biography. Rows are looked up by
+    # normalized player name.
+    def __init__(self, frame, description):
+        frame = frame.copy()
+        for column in INDEX_COLUMNS:
+            values = frame[column].astype(object).where(frame[column].notna(), '').astype(str).str.strip()
+            if column in STYLE_COLUMNS:
+                values = values.map(clean_style)
+            frame[column] = values.replace('', np.nan).astype('category')
+        frame['player'] = [normalize_name(name) for name in frame['player_name']]
+        self.frame = frame
+        self.read_description = description
+
+        # Normalized name -> row (first profile wins for duplicates)
+        self.rows = {}
+        for position, name in enumerate(frame['player']):
+            self.rows.setdefault(name, position)
+
+    @classmethod
+    def from_csv(cls, path=DEFAULT_PROFILES):
+        with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            buffer = np.frombuffer(data, dtype=np.uint8)
+            starts, lazy, ends = record_spans(buffer)
+            del buffer
+            header = data[starts[0]:ends[0]].decode('utf-8').split(',')
+            if header[-1] != LAZY_COLUMN:
+                raise ValueError(f"{path}: expected '{LAZY_COLUMN}' as the last column")
+
+            # The short columns: each record up to its description
+            prefix = b'\n'.join(data[start:field - 1] for start, field in zip(starts, lazy))
+        frame = pd.read_csv(io.BytesIO(prefix), dtype=str, keep_default_na=False, na_values=[''])
+
+        spans = np.column_stack([lazy[1:], ends[1:]])
+
+        def description(position):
+            start, end = spans[position]
+            with open(path, 'rb') as f:
+                f.seek(start)
+                return unquote(f.read(end - start).decode('utf-8'))
+
+        print(f"Indexed {len(frame)} player profiles from {path}")
+        return cls(frame, description)
+
+    def __contains__(self, player):
+        return normalize_name(player) in self.rows
+
+    def values(self, column):
+        # Distinct values of an indexed column, for the filter widgets
+        return list(self.frame[column].cat.categories)
+
+    def profile(self, player, description=True):
+        # Team, role and styles of one player (plus the biography, read from
+        # disk, unless description=False); None without a profile
+        position = self.rows.get(normalize_name(player))
+        if position is None:
+            return None
+        row = self.frame.iloc[position]
+        profile = {column: (None if pd.isna(row[column]) else row[column]) for column in INDEX_COLUMNS}
+        profile['player_name'] = row['player_name']
+        if description:
+            profile['description'] = self.read_description(position)
+        return profile
+
+    def players(self, team=None, role=None, batting_style=None, bowling_style=None):
+        # Normalized names of the players matching every given filter; each
+        # filter is a value or a list of values of the indexed column
+        mask = np.ones(len(self.frame), dtype=bool)
+        for column, wanted in zip(INDEX_COLUMNS, (team, role, batting_style, bowling_style)):
+            if wanted is None:
+                continue
+            series = self.frame[column]
+            wanted = [wanted] if isinstance(wanted, str) else list(wanted)
+            codes = series.cat.categories.get_indexer(wanted)
+            mask &= np.isin(series.cat.codes.to_numpy(), codes[codes >= 0])
+        return list(self.frame['player'].to_numpy()[mask])
+
+
+def load_profiles(path=DEFAULT_PROFILES):
+    # Profiles are optional: without the file the app works as before
+    try:
+        return PlayerProfiles.from_csv(path)
+    except FileNotFoundError:
+        print(f"No player profiles: {path} not found")
+        return None
@@ -0,0 +1,813 @@
+import argparse
+import asyncio
+import hashlib
+import io
+import json
+import os
+import time
+import traceback
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qs, urlencode, urlsplit
+
+import pandas as pd
+
+from charts import (LRUCache, MatchChart, TeamChart, make_batting_chart, make_bowling_chart, plot_batting_trend,
+                    plot_bowling_trend, plot_form_leaders, plot_win_rates, player_plot)
+from cricket_stats import CricketStats
+from data_cache import file_hash
+from downsample import TREND_SERIES, TrendView, trend_window
+from export_reports import DATA_FILES, load_stats, plain
+from live_ingest import LiveIngest
+from player_profiles import DEFAULT_PROFILES, INDEX_COLUMNS, load_profiles
+from storage import CricketStore, StoreStats
+from tracing import span
+
+# Headless query server: loads the data once and serves the player, team,
+# match and trend analyses of the GUI tabs to any number of clients.
+#
+#   python query_server.py [--port 8765] [--db cricket.db --tournament NAME]
+#   python cricket_analyzer.py --server http://127.0.0.1:8765
+#
+# JSON endpoints (GET, query string parameters):
+#   /players /teams /matches    selector values
+#   /player?name=               scorecard rows, summaries, rolling form and
+#                               profile, or suggestions when nothing matches
+#   /team?team=A&team=B         team stats, plus head to head for two teams
+#   /match?match=               team scores and top batsmen
+#   /trend?type=                batting, bowling, win_rates (rolling=1),
+#                               team_runs or form (metric=, k=, min_innings=);
+#                               start=, end=, points= and top= return the
+#                               match range downsampled for a chart, one
+#                               series per line under 'lines' (see
+#                               downsample.TrendView)
+#   /leaderboard?metric=        one leaderboard page, filters as in
+#                               Leaderboard.query (positions=1,2 and
+#                               range=Strike_Rate:100: for the list ones)
+#   /profiles /profile?player=  player profile filters and lookups
+#   /status                     data version and cache counters
+# PNG endpoints render the same charts as the tabs: /player.png?name=&kind=
+# (batting or bowling), /team.png?team=A&team=B, /match.png?match= and
+# /trend.png?type=.
+#
+# Requests are served on one asyncio loop and the queries run on a thread
+# pool. Identical requests that arrive while one is being computed wait for
+# that result instead of computing it again, and finished responses are kept
+# in an LRU cache keyed on the request and the data version, so a cached
+# response is never served for data it was not computed from.
+DEFAULT_PORT = 8765
+RENDER_SIZES = {'batting': (10, 6), 'bowling': (10, 6), 'team': (12, 6), 'match': (12, 6), 'trend': (12, 6)}
+TREND_CHARTS = ['batting', 'bowling', 'win_rates', 'form']
+REASONS = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed', 500: 'Internal Server Error'}
+
+
+class QueryError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+def frame_json(frame):
+    return {
+        'index_name': frame.index.name,
+        'columns': [str(column) for column in frame.columns],
+        'index': plain(frame.index.tolist()),
+        'data': plain(frame.astype(object).to_numpy().tolist()),
+    }
+
+
+def json_frame(data):
+    frame = pd.DataFrame(data['data'], index=data['index'], columns=data['columns']).infer_objects()
+    frame.index.name = data['index_name']
+    return frame
+
+
+def series_json(series):
+    return {'name': series.name, 'index_name': series.index.name, 'index': plain(series.index.tolist()),
+            'data': plain(series.tolist())}
+
+
+def json_series(data):
+    series = pd.Series(data['data'], index=data['index'], name=data['name'])
+    series.index.name = data['index_name']
+    return series
+
+
+def csv_version(paths=DATA_FILES + [DEFAULT_PROFILES]):
+    digest = hashlib.sha1()
+    for path in paths:
+        if os.path.exists(path):
+            digest.update(file_hash(path).encode())
+    return digest.hexdigest()[:12]
+
+
+def store_version(store, tournament):
+    digest = hashlib.sha1(f'{os.path.abspath(store.path)}|{tournament}'.encode())
+    for path in (store.path, store.path + '-wal'):
+        if os.path.exists(path):
+            stat = os.stat(path)
+            digest.update(f'{stat.st_size}:{stat.st_mtime_ns}'.encode())
+    return digest.hexdigest()[:12]
+
+
+class StoreSource:
+    # A --db store. Its version follows the database and WAL files, which
+    # `storage.py add` and `remove` change while the server is running;
+    # load() reopens the stats (selectors, leaderboards) on the new data.
+    def __init__(self, store, tournament=None):
+        self.store = store
+        self.tournament = tournament
+
+    def version(self):
+        return store_version(self.store, self.tournament)
+
+    def load(self):
+        stats = StoreStats(self.store, self.tournament)
+        return stats, stats.player_profiles()
+
+
+class QueryService:
+    # The analyses behind the endpoints, plus the coalescing and caching.
+    # Handlers run on worker threads and return (status, content type,
+    # body); only the asyncio loop touches the cache and in-flight table.
+    #
+    # Charts reuse one figure per chart type like the report exporter, so
+    # PNGs are rendered on a single thread.
+    #
+    # With a `source` (see StoreSource) its version is checked on every
+    # request, and a changed store is reloaded before the request is served.
+    def __init__(self, stats, profiles, version, workers=4, cache_size=256, source=None):
+        import matplotlib
+        matplotlib.use('Agg')
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+        from matplotlib.figure import Figure
+
+        self.stats = stats
+        self.profiles = profiles
+        self.version = version
+        self.source = source
+        self.reload_lock = None
+        self.figure_type = Figure
+        self.canvas_type = FigureCanvasAgg
+        self.charts = {}
+        self.executor = ThreadPoolExecutor(workers, thread_name_prefix='query')
+        self.renderer = ThreadPoolExecutor(1, thread_name_prefix='render')
+        self.cache = LRUCache(cache_size)
+        self.inflight = {}
+        self.counts = {'requests': 0, 'cache_hits': 0, 'coalesced': 0, 'computed': 0, 'errors': 0}
+
+        # Data updates wait for running queries to finish and hold new ones
+        # back until they are applied
+        self.running = 0
+        self.updating = False
+        self.condition = None
+
+        self.routes = {
+            '/players': (self.executor, self.players),
+            '/teams': (self.executor, self.teams),
+            '/matches': (self.executor, self.matches),
+            '/player': (self.executor, self.player),
+            '/team': (self.executor, self.team),
+            '/match': (self.executor, self.match),
+            '/trend': (self.executor, self.trend),
+            '/leaderboard': (self.executor, self.leaderboard),
+            '/profiles': (self.executor, self.profile_filters),
+            '/profile': (self.executor, self.profile),
+            '/player.png': (self.renderer, self.player_png),
+            '/team.png': (self.renderer, self.team_png),
+            '/match.png': (self.renderer, self.match_png),
+            '/trend.png': (self.renderer, self.trend_png),
+        }
+
+    # ------------------------------------------------------------------
+    # Dispatch
+    # ------------------------------------------------------------------
+    async def respond(self, path, params):
+        self.counts['requests'] += 1
+        if self.source is not None:
+            await self.check_source()
+        if path == '/status':
+            return self.json_response(self.status())
+        if path not in self.routes:
+            return self.error_response(404, f"Unknown endpoint {path}")
+
+        key = (path, tuple(sorted((name, tuple(values)) for name, values in params.items())), self.version)
+        cached = self.cache.get(key)
+        if cached is not None:
+            self.counts['cache_hits'] += 1
+            return cached
+        pending = self.inflight.get(key)
+        if pending is not None:
+            self.counts['coalesced'] += 1
+            return await asyncio.shield(pending)
+
+        pending = self.inflight[key] = asyncio.get_running_loop().create_future()
+        try:
+            executor, handler = self.routes[path]
+            response = await self.run(executor, self.call, path, handler, params)
+            self.counts['computed'] += 1
+            if response[0] == 200:
+                self.cache.put(key, response)
+            else:
+                self.counts['errors'] += 1
+            pending.set_result(response)
+            return response
+        finally:
+            del self.inflight[key]
+            if not pending.done():
+                pending.cancel()
+
+    async def check_source(self):
+        # Reload once when the source has changed; requests that arrive
+        # meanwhile wait for it
+        if self.source.version() == self.version:
+            return
+        async with self.reload_lock:
+            version = self.source.version()
+            if version == self.version:
+                return
+
+            def apply():
+                self.stats, self.profiles = self.source.load()
+            print(f"Data changed, reloading (version {version})")
+            await self.update(apply)
+            self.version = version
+
+    async def run(self, executor, fn, *args):
+        async with self.condition:
+            await self.condition.wait_for(lambda: not self.updating)
+            self.running += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(executor, fn, *args)
+        finally:
+            async with self.condition:
+                self.running -= 1
+                self.condition.notify_all()
+
+    async def update(self, apply):
+        # Run apply() (which changes the data) with no query in flight
+        async with self.condition:
+            self.updating = True
+            await self.condition.wait_for(lambda: not self.running)
+        try:
+            await asyncio.get_running_loop().run_in_executor(self.executor, apply)
+        finally:
+            async with self.condition:
+                self.updating = False
+                self.condition.notify_all()
+
+    def call(self, path, handler, params):
+        try:
+            with span(path):
+                result = handler(params)
+            if isinstance(result, bytes):
+                return 200, 'image/png', result
+            return self.json_response(result)
+        except QueryError as e:
+            return self.error_response(e.status, str(e))
+        except Exception as e:
+            traceback.print_exc()
+            return self.error_response(500, f"{type(e).__name__}: {e}")
+
+    @staticmethod
+    def json_response(data, status=200):
+        return status, 'application/json', json.dumps(data).encode()
+
+    def error_response(self, status, message):
+        return self.json_response({'error': message}, status)
+
+    def status(self):
+        return dict(self.counts, version=self.version, cached=len(self.cache), inflight=len(self.inflight))
+
+    # ------------------------------------------------------------------
+    # Parameters
+    # ------------------------------------------------------------------
+    @staticmethod
+    def param(params, name, default=None, required=False, kind=str, minimum=None):
+        values = params.get(name)
+        if not values or not values[-1]:
+            if required:
+                raise QueryError(400, f"Missing parameter '{name}'")
+            return default
+        try:
+            value = kind(values[-1])
+        except ValueError:
+            raise QueryError(400, f"Bad value for '{name}': {values[-1]!r}")
+        if minimum is not None and value < minimum:
+            raise QueryError(400, f"'{name}' must be at least {minimum}, got {value}")
+        return value
+
+    @staticmethod
+    def flag(params, name):
+        return QueryService.param(params, name, '0').lower() in ('1', 'true', 'yes')
+
+    def team_params(self, params):
+        teams = params.get('team', [])
+        if not 1 <= len(teams) <= 2:
+            raise QueryError(400, "Expected one or two 'team' parameters")
+        unknown = [team for team in teams if team not in self.stats.teams]
+        if unknown:
+            raise QueryError(404, f"Unknown team {unknown[0]!r}")
+        return teams
+
+    # ------------------------------------------------------------------
+    # JSON endpoints
+    # ------------------------------------------------------------------
+    def players(self, params):
+        return plain(self.stats.players)
+
+    def teams(self, params):
+        return plain(self.stats.teams)
+
+    def matches(self, params):
+        return plain(self.stats.matches)
+
+    def player(self, params):
+        player = self.param(params, 'name', required=True).strip().title()
+        data = {
+            'player': player,
+            'batting_form': frame_json(self.stats.batting_form(player)),
+            'bowling_form': frame_json(self.stats.bowling_form(player)),
+            'profile': self.profiles.profile(player) if self.profiles is not None else None,
+        }
+        result = self.stats.player_stats(player)
+        if result is None:
+            data['suggestions'] = plain(self.stats.player_suggestions(player))
+            return data
+        data.update({
+            'name': result['name'],
+            'batting': frame_json(result['batting']),
+            'bowling': frame_json(result['bowling']),
+            'batting_summary': plain(result['batting_summary']),
+            'bowling_summary': plain(result['bowling_summary']),
+        })
+        return data
+
+    def team(self, params):
+        teams = self.team_params(params)
+        data = {'teams': {team: plain(self.stats.team_stats(team)) for team in teams}}
+        if len(teams) == 2:
+            data['head_to_head'] = plain(self.stats.head_to_head(*teams))
+        return data
+
+    def match(self, params):
+        match = self.param(params, 'match', required=True)
+        summary = self.stats.match_summary(match)
+        if summary is None:
+            raise QueryError(404, f"Unknown match {match!r}")
+        return {
+            'match': match,
+            'team_scores': series_json(summary['team_scores']),
+            'top_batsmen': frame_json(summary['top_batsmen'][['Batsman_Name', 'Runs']]),
+        }
+
+    def trend_data(self, params):
+        kind = self.param(params, 'type', required=True)
+        if kind == 'batting':
+            return self.stats.batting_trend()
+        if kind == 'bowling':
+            return self.stats.bowling_trend()
+        if kind == 'win_rates':
+            return self.stats.win_rate_trend(rolling=self.flag(params, 'rolling'))
+        if kind == 'team_runs':
+            return self.stats.team_trend()
+        if kind == 'form':
+            try:
+                return self.stats.players_in_form(self.param(params, 'metric', 'Average'),
+                                                  self.param(params, 'k', 10, kind=int, minimum=1),
+                                                  self.param(params, 'min_innings', kind=int))
+            except KeyError as e:
+                raise QueryError(400, f"Unknown form metric {e}")
+        raise QueryError(400, f"Unknown trend type {kind!r}")
+
+    def trend_view(self, params):
+        # The trend limited to the requested range, resolution and top N.
+        # The stats keep the prepared trend per data version, so a zoom
+        # request only slices it; rolling win rates are prepared per request.
+        kind = self.param(params, 'type', required=True)
+        view = [self.param(params, 'start', kind=float), self.param(params, 'end', kind=float),
+                self.param(params, 'points', kind=int, minimum=1),
+                self.param(params, 'top', kind=int, minimum=0)]
+        if kind == 'form' or all(value is None for value in view):
+            return self.trend_data(params)
+        if kind in TREND_SERIES and not self.flag(params, 'rolling'):
+            return self.stats.trend_window(kind, *view)
+        return trend_window(self.trend_data(params), *view)
+
+    def trend(self, params):
+        data = self.trend_view(params)
+        if isinstance(data, dict):
+            return {'type': params['type'][-1], 'lines': [series_json(line) for line in data.values()]}
+        if isinstance(data, pd.Series):
+            return {'type': params['type'][-1], 'series': series_json(data)}
+        return {'type': params['type'][-1], 'frame': frame_json(data)}
+
+    def leaderboard(self, params):
+        filters = {
+            'team': self.param(params, 'team'),
+            'role': self.param(params, 'role'),
+            'min_innings': self.param(params, 'min_innings', 1, kind=int),
+            'page': self.param(params, 'page', 0, kind=int),
+            'page_size': self.param(params, 'page_size', 20, kind=int),
+        }
+        positions = self.param(params, 'positions')
+        if positions:
+            try:
+                filters['positions'] = [int(position) for position in positions.split(',')]
+            except ValueError:
+                raise QueryError(400, f"Bad value for 'positions': {positions!r}")
+        if 'player' in params:
+            filters['players'] = params['player']
+        ranges = {}
+        for value in params.get('range', []):
+            column, low, high = (value.split(':') + ['', ''])[:3]
+            try:
+                ranges[column] = (float(low) if low else None, float(high) if high else None)
+            except ValueError:
+                raise QueryError(400, f"Bad value for 'range': {value!r}")
+        if ranges:
+            filters['ranges'] = ranges
+        if self.flag(params, 'career'):
+            if not isinstance(self.stats, StoreStats):
+                raise QueryError(400, "career=1 needs a server started with --db")
+            filters['career'] = True
+        try:
+            result = self.stats.top_players(self.param(params, 'metric', 'Runs'), **filters)
+        except (ValueError, KeyError) as e:
+            raise QueryError(400, str(e))
+        return dict(result, rows=frame_json(result['rows']))
+
+    def profile_filters(self, params):
+        # Filter values, and the matching players when filters are given
+        if self.profiles is None:
+            raise QueryError(404, "No player profiles loaded")
+        data = {'values': {column: plain(self.profiles.values(column)) for column in INDEX_COLUMNS}}
+        filters = {name: params[name] for name in ('team', 'role', 'batting_style', 'bowling_style')
+                   if name in params}
+        if filters:
+            data['players'] = plain(self.profiles.players(**filters))
+        return data
+
+    def profile(self, params):
+        if self.profiles is None:
+            raise QueryError(404, "No player profiles loaded")
+        player = self.param(params, 'player', required=True)
+        return {'profile': self.profiles.profile(player, description=self.param(params, 'description', '1') != '0')}
+
+    # ------------------------------------------------------------------
+    # PNG endpoints
+    # ------------------------------------------------------------------
+    def chart(self, name, make_chart):
+        if name not in self.charts:
+            figure = self.figure_type(figsize=RENDER_SIZES[name])
+            self.canvas_type(figure)
+            self.charts[name] = make_chart(figure)
+        return self.charts[name]
+
+    @staticmethod
+    def png(figure):
+        buffer = io.BytesIO()
+        figure.savefig(buffer, format='png')
+        return buffer.getvalue()
+
+    def player_png(self, params):
+        player = self.param(params, 'name', required=True).strip().title()
+        kind = self.param(params, 'kind', 'batting')
+        if kind not in ('batting', 'bowling'):
+            raise QueryError(400, f"Unknown chart kind {kind!r}")
+        result = self.stats.player_stats(player)
+        if result is None or not result[f'{kind}_summary']:
+            raise QueryError(404, f"No {kind} data for {player!r}")
+
+        if kind == 'batting':
+            chart = self.chart('batting', make_batting_chart)
+            form = self.stats.batting_form(player)
+        else:
+            chart = self.chart('bowling', make_bowling_chart)
+            form = self.stats.bowling_form(player)
+        plot, form_lines = player_plot(kind, result[kind], form)
+        chart.update(player, *plot, form=form_lines)
+        return self.png(chart.figure)
+
+    def team_png(self, params):
+        teams = self.team_params(params)
+        if len(teams) != 2:
+            raise QueryError(400, "Expected two 'team' parameters")
+        team_stats = [self.stats.team_stats(team) for team in teams]
+        chart = self.chart('team', TeamChart)
+        chart.update(teams, [stats['avg_runs'] for stats in team_stats], [stats['avg_economy'] for stats in team_stats])
+        return self.png(chart.figure)
+
+    def match_png(self, params):
+        match = self.param(params, 'match', required=True)
+        summary = self.stats.match_summary(match)
+        if summary is None:
+            raise QueryError(404, f"Unknown match {match!r}")
+        chart = self.chart('match', MatchChart)
+        chart.update(summary['team_scores'], summary['top_batsmen'])
+        return self.png(chart.figure)
+
+    def trend_png(self, params):
+        kind = self.param(params, 'type', required=True)
+        if kind not in TREND_CHARTS:
+            raise QueryError(400, f"No chart for trend type {kind!r}")
+        figure = self.chart('trend', lambda fig: fig)
+        figure.clear()
+        ax = figure.add_subplot(111)
+        if kind == 'form':
+            plot_form_leaders(ax, self.trend_data(params), CricketStats.FORM_WINDOW)
+        else:
+            # Downsampled to the axes width, as in the trends tab
+            top = self.param(params, 'top', kind=int, minimum=0)
+            rolling = TrendView(self.trend_data(params)) if self.flag(params, 'rolling') else None
+
+            def fetch(start, end, points):
+                if rolling is not None:
+                    return rolling.window(start, end, points, top)
+                return self.stats.trend_window(kind, start, end, points, top)
+            if kind == 'batting':
+                plot_batting_trend(ax, fetch)
+            elif kind == 'bowling':
+                plot_bowling_trend(ax, fetch)
+            else:
+                plot_win_rates(ax, fetch)
+        return self.png(figure)
+
+
+class QueryServer:
+    # Minimal HTTP/1.1 on asyncio streams: GET and HEAD, keep-alive, no
+    # request bodies. Meant for localhost clients, not the open internet.
+    def __init__(self, service, host='127.0.0.1', port=DEFAULT_PORT):
+        self.service = service
+        self.host = host
+        self.port = port
+        self.server = None
+
+    async def start(self):
+        self.service.condition = asyncio.Condition()
+        self.service.reload_lock = asyncio.Lock()
+        self.server = await asyncio.start_server(self.handle, self.host, self.port)
+        self.port = self.server.sockets[0].getsockname()[1]
+        print(f"Serving on http://{self.host}:{self.port} (data version {self.service.version})")
+
+    async def handle(self, reader, writer):
+        try:
+            while True:
+                request = await reader.readline()
+                if not request:
+                    break
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+                if headers.get('content-length'):
+                    await reader.readexactly(int(headers['content-length']))
+
+                try:
+                    method, target, protocol = request.decode('latin-1').split()
+                except ValueError:
+                    await self.send(writer, 'GET', self.service.error_response(400, "Malformed request"), False)
+                    break
+                connection = headers.get('connection', '').lower()
+                keep_alive = connection == 'keep-alive' if protocol == 'HTTP/1.0' else connection != 'close'
+
+                if method not in ('GET', 'HEAD'):
+                    response = self.service.error_response(405, f"{method} not supported")
+                else:
+                    url = urlsplit(target)
+                    response = await self.service.respond(url.path, parse_qs(url.query, keep_blank_values=True))
+                await self.send(writer, method, response, keep_alive)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def send(self, writer, method, response, keep_alive):
+        status, content_type, body = response
+        head = (f"HTTP/1.1 {status} {REASONS.get(status, '')}\r\n"
+                f"Content-Type: {content_type}\r\n"
+                f"Content-Length: {len(body)}\r\n"
+                f"X-Data-Version: {self.service.version}\r\n"
+                f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n")
+        writer.write(head.encode('latin-1'))
+        if method != 'HEAD':
+            writer.write(body)
+        await writer.drain()
+
+    async def watch(self, live, interval):
+        # Tail the scorecard CSVs like the GUI's --watch. The version
+        # changes with every applied update, which retires cached responses.
+        service = self.service
+        base, updates = service.version, 0
+        failed = False
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                if failed:
+                    update = {'reload': True}
+                else:
+                    stats = service.stats
+                    update = await service.run(service.executor, live.poll, stats.batting_data, stats.bowling_data)
+                if update is None:
+                    continue
+
+                def apply():
+                    nonlocal live
+                    if update['reload']:
+                        print("Reloading after a failed update" if failed else "Scorecard file rewritten, reloading")
+                        live = LiveIngest()
+                        service.stats = load_stats()
+                    else:
+                        service.stats.extend(update['batting'], update['bowling'], update.get('schedule'))
+                        print(f"Ingested {update['batting_rows']} batting and {update['bowling_rows']} bowling rows")
+
+                await service.update(apply)
+            except Exception:
+                # The rows read for a failed update are not in the data, so
+                # keep watching and reload everything on the next poll
+                print("Live update failed:")
+                traceback.print_exc()
+                failed = True
+                continue
+            failed = False
+            updates += 1
+            service.version = f'{base}.{updates}'
+
+    async def serve(self, live=None, interval=None):
+        await self.start()
+        if live is not None:
+            asyncio.get_running_loop().create_task(self.watch(live, interval))
+        async with self.server:
+            await self.server.serve_forever()
+
+
+class RemoteStats:
+    # The CricketStats query interface over a running query server, so the
+    # GUI can use a shared server instead of loading the data itself. Like
+    # StoreStats, only the selector values are held locally.
+    def __init__(self, url, timeout=30):
+        self.url = url.rstrip('/')
+        self.timeout = timeout
+        self.players = self.get('/players')
+        self.teams = self.get('/teams')
+        self.matches = self.get('/matches')
+
+    def get(self, path, **params):
+        query = urlencode({name: value for name, value in params.items() if value is not None}, doseq=True)
+        try:
+            with urllib.request.urlopen(f'{self.url}{path}?{query}', timeout=self.timeout) as response:
+                return json.loads(response.read())
+        except urllib.error.HTTPError as e:
+            try:
+                message = json.loads(e.read())['error']
+            except (ValueError, KeyError):
+                message = e.reason
+            if e.code == 404:
+                raise KeyError(message)
+            raise RuntimeError(f"{path}: {message}")
+
+    def player_stats(self, player):
+        data = self.get('/player', name=player)
+        if 'suggestions' in data:
+            return None
+        return {
+            'name': data['name'],
+            'batting': json_frame(data['batting']),
+            'bowling': json_frame(data['bowling']),
+            'batting_summary': data['batting_summary'],
+            'bowling_summary': data['bowling_summary'],
+        }
+
+    def player_suggestions(self, player, limit=5):
+        return self.get('/player', name=player).get('suggestions', [])[:limit]
+
+    def batting_form(self, player):
+        return json_frame(self.get('/player', name=player)['batting_form'])
+
+    def bowling_form(self, player):
+        return json_frame(self.get('/player', name=player)['bowling_form'])
+
+    def team_stats(self, team):
+        return self.get('/team', team=[team])['teams'][team]
+
+    def head_to_head(self, team1, team2):
+        return self.get('/team', team=[team1, team2])['head_to_head']
+
+    def match_summary(self, match):
+        try:
+            data = self.get('/match', match=match)
+        except KeyError:
+            return None
+        return {'team_scores': json_series(data['team_scores']), 'top_batsmen': json_frame(data['top_batsmen'])}
+
+    def trend(self, kind, **params):
+        data = self.get('/trend', type=kind, **params)
+        if 'lines' in data:
+            return {line['name']: json_series(line) for line in data['lines']}
+        return json_series(data['series']) if 'series' in data else json_frame(data['frame'])
+
+    def batting_trend(self):
+        return self.trend('batting')
+
+    def bowling_trend(self):
+        return self.trend('bowling')
+
+    def team_trend(self):
+        return self.trend('team_runs')
+
+    def win_rate_trend(self, rolling=False):
+        return self.trend('win_rates', rolling=int(rolling))
+
+    def players_in_form(self, metric='Average', k=10, min_innings=None):
+        return self.trend('form', metric=metric, k=k, min_innings=min_innings)
+
+    def trend_window(self, kind, start=None, end=None, points=None, top=None):
+        # Downsampled on the server, so only the points drawn are sent
+        return self.trend(kind, start=start, end=end, points=points, top=top)
+
+    def top_players(self, metric='Runs', team=None, positions=None, role=None, ranges=None, min_innings=1,
+                    players=None, page=0, page_size=20, career=False):
+        params = {'metric': metric, 'team': team, 'role': role, 'min_innings': min_innings, 'page': page,
+                  'page_size': page_size, 'career': int(career) if career else None}
+        if positions:
+            params['positions'] = ','.join(str(position) for position in positions)
+        if ranges:
+            params['range'] = [f"{column}:{'' if low is None else low}:{'' if high is None else high}"
+                               for column, (low, high) in ranges.items()]
+        if players is not None:
+            # An empty selection must still filter everything out
+            params['player'] = list(players) or ['']
+        data = self.get('/leaderboard', **params)
+        return dict(data, rows=json_frame(data['rows']))
+
+    def player_profiles(self):
+        try:
+            return RemoteProfiles(self, self.get('/profiles')['values'])
+        except KeyError:
+            return None
+
+
+class RemoteProfiles:
+    # PlayerProfiles lookups answered by the server
+    def __init__(self, remote, values):
+        self.remote = remote
+        self.filter_values = values
+
+    def values(self, column):
+        return self.filter_values[column]
+
+    def profile(self, player, description=True):
+        return self.remote.get('/profile', player=player, description=int(description))['profile']
+
+    def players(self, team=None, role=None, batting_style=None, bowling_style=None):
+        return self.remote.get('/profiles', team=team, role=role, batting_style=batting_style,
+                               bowling_style=bowling_style).get('players', [])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve the cricket analyses as JSON and PNG over HTTP.")
+    parser.add_argument('--host', default='127.0.0.1', help="address to bind (default %(default)s)")
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT, help="port (default %(default)s, 0 picks one)")
+    parser.add_argument('--workers', type=int, default=4, help="query threads (default %(default)s)")
+    parser.add_argument('--cache-size', type=int, default=256,
+                        help="responses kept in the LRU cache (default %(default)s)")
+    parser.add_argument('--db', metavar='PATH',
+                        help="read from a SQLite store built with storage.py instead of the CSVs")
+    parser.add_argument('--tournament', help="with --db, restrict every query to one tournament")
+    parser.add_argument('--watch', type=float, metavar='SECONDS', nargs='?', const=2.0,
+                        help="poll the scorecard CSVs for appended rows (default every 2 seconds)")
+    args = parser.parse_args()
+    if args.watch and args.db:
+        parser.error("--watch tails the CSVs and cannot be combined with --db")
+
+    start = time.perf_counter()
+    live = source = None
+    if args.db:
+        source = StoreSource(CricketStore(args.db), args.tournament)
+        version = source.version()
+        stats, profiles = source.load()
+    else:
+        if args.watch:
+            # Offsets are taken before loading so no appended row is missed
+            live = LiveIngest()
+        stats = load_stats()
+        profiles = load_profiles()
+        version = csv_version()
+    print(f"Data loaded in {time.perf_counter() - start:.2f}s")
+
+    service = QueryService(stats, profiles, version, workers=args.workers, cache_size=args.cache_size,
+                           source=source)
+    try:
+        asyncio.run(QueryServer(service, args.host, args.port).serve(live, args.watch))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
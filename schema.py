@@ -0,0 +1,302 @@
+import numpy as np
+import pandas as pd
+
+from data_cache import load_csv
+from dismissals import with_dismissals
+
+# Typed in-memory layout for the scorecard frames.
+#
+# Names, teams and fixtures become categoricals whose categories are shared
+# between the batting and bowling frames, so the same player or team has the
+# same code in both. Counters are downcast to the smallest integer type that
+# holds them, rates to float32, and bowling Overs (e.g. 9.3) is replaced by
+# an integer Balls count. The Dismissal text is parsed into type, bowler and
+# fielder categoricals (see dismissals.py).
+
+# Columns grouped by shared category set
+SHARED_CATEGORIES = {
+    'players': [('batting', 'Batsman_Name'), ('bowling', 'Bowler_Name')],
+    'teams': [('batting', 'Team_Innings'), ('bowling', 'Bowling_Team')],
+    'matches': [('batting', 'Match_Between'), ('bowling', 'Match_Between')],
+}
+CATEGORY_COLUMNS = {
+    'batting': ['Dismissal'],
+    'bowling': [],
+}
+INTEGER_COLUMNS = {
+    'batting': ['Match_no', 'Batting_Position', 'Runs', 'Balls', '4s', '6s'],
+    'bowling': ['Match_no', 'Maidens', 'Runs', 'Wickets'],
+}
+FLOAT_COLUMNS = {
+    'batting': ['Strike_Rate'],
+    'bowling': ['Economy'],
+}
+
+
+def overs_to_balls(overs):
+    # 9.3 overs -> 9 * 6 + 3 = 57 balls
+    overs = pd.to_numeric(overs, errors='coerce').to_numpy(dtype=float)
+    whole = np.floor(overs)
+    balls = whole * 6 + np.round((overs - whole) * 10)
+    return downcast(pd.Series(balls))
+
+
+def as_numeric(series):
+    if series.dtype == object or isinstance(series.dtype, pd.CategoricalDtype):
+        series = series.astype(object)
+    return pd.to_numeric(series, errors='coerce')
+
+
+def downcast(series):
+    # Smallest integer type that fits, or float32 when values are missing
+    series = as_numeric(series)
+    if series.isna().any():
+        return series.astype(np.float32)
+    return pd.to_numeric(series, downcast='integer')
+
+
+def to_float32(series):
+    return as_numeric(series).astype(np.float32)
+
+
+def as_category(series, categories):
+    # astype() treats unordered dtypes with the same values as equal and
+    # would keep the existing category order, so remap explicitly
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        return series.cat.set_categories(categories)
+    return series.astype(pd.CategoricalDtype(categories))
+
+
+def apply_schema(batting, bowling):
+    frames = {'batting': batting.copy(), 'bowling': bowling.copy()}
+
+    for columns in SHARED_CATEGORIES.values():
+        values = set()
+        for frame, column in columns:
+            values.update(frames[frame][column].dropna().unique())
+        categories = sorted(values)
+        for frame, column in columns:
+            frames[frame][column] = as_category(frames[frame][column], categories)
+
+    for frame, columns in CATEGORY_COLUMNS.items():
+        for column in columns:
+            frames[frame][column] = frames[frame][column].astype('category')
+    frames['batting'] = with_dismissals(frames['batting'])
+
+    for frame, columns in INTEGER_COLUMNS.items():
+        for column in columns:
+            frames[frame][column] = downcast(frames[frame][column])
+
+    for frame, columns in FLOAT_COLUMNS.items():
+        for column in columns:
+            frames[frame][column] = to_float32(frames[frame][column])
+
+    bowling = frames['bowling']
+    position = bowling.columns.get_loc('Overs')
+    balls = overs_to_balls(bowling['Overs'])
+    bowling = bowling.drop(columns='Overs')
+    bowling.insert(position, 'Balls', balls.to_numpy())
+
+    return frames['batting'], bowling
+
+
+def codes_dtype(count):
+    # The integer type pandas uses for the codes of `count` categories
+    for dtype in (np.int8, np.int16, np.int32):
+        if count < np.iinfo(dtype).max:
+            return dtype
+    return np.int64
+
+
+class ScorecardBuffer:
+    # The typed batting and bowling frames in watch mode, kept in per-column
+    # buffers with spare capacity (categoricals as codes). Appended rows are
+    # written after the current ones and the frames are rebuilt as views of
+    # the longer prefix, so an update costs the new rows rather than the
+    # whole frame. Frames handed out earlier only see their own prefix,
+    # which later appends never write to.
+    #
+    # Categorical codes are kept as they are unless a new value appears. A
+    # new name, team or fixture re-sorts that shared category set and
+    # remaps its columns into fresh buffers; other categoricals add new
+    # values at the end of their categories.
+    def __init__(self, batting, bowling):
+        self.rows = {'batting': len(batting), 'bowling': len(bowling)}
+        self.buffers = {}
+        self.categories = {}
+        # Category -> code, shared by the columns of one category set. The
+        # dtype objects are reused until the categories change, so a frame
+        # rebuild does not validate the categories again.
+        self.codes = {}
+        self.dtypes = {}
+        for frame, data in (('batting', batting), ('bowling', bowling)):
+            for column in data.columns:
+                series = data[column]
+                if isinstance(series.dtype, pd.CategoricalDtype):
+                    values = series.array.codes
+                    self.categories[frame, column] = series.cat.categories
+                    self.dtypes[frame, column] = series.dtype
+                    self.codes[frame, column] = None
+                else:
+                    values = series.to_numpy()
+                buffer = np.empty(max(2 * len(values), 1024), dtype=values.dtype)
+                buffer[:len(values)] = values
+                self.buffers[frame, column] = buffer
+        for columns in SHARED_CATEGORIES.values():
+            categories = self.categories[columns[0]]
+            lookup = dict(zip(categories.tolist(), range(len(categories))))
+            for key in columns:
+                self.codes[key] = lookup
+        for key, lookup in self.codes.items():
+            if lookup is None:
+                self.codes[key] = dict(zip(self.categories[key].tolist(), range(len(self.categories[key]))))
+        self.columns = {'batting': list(batting.columns), 'bowling': list(bowling.columns)}
+        self.frames = {frame: self.frame(frame) for frame in self.rows}
+
+    def frame(self, frame):
+        rows = self.rows[frame]
+        data = {}
+        for column in self.columns[frame]:
+            values = self.buffers[frame, column][:rows]
+            values.flags.writeable = False
+            dtype = self.dtypes.get((frame, column))
+            if dtype is not None:
+                values = pd.Categorical.from_codes(values, dtype=dtype, validate=False)
+            data[column] = values
+        return pd.DataFrame(data, columns=self.columns[frame], copy=False)
+
+    def append(self, new_batting, new_bowling):
+        # The frames with raw appended rows added at the end
+        new = dict(zip(('batting', 'bowling'), apply_schema(new_batting, new_bowling)))
+        shared = {(frame, column) for columns in SHARED_CATEGORIES.values() for frame, column in columns}
+        for columns in SHARED_CATEGORIES.values():
+            self.extend_categories(columns, new, sorted_values=True)
+        for frame in new:
+            for column in self.columns[frame]:
+                if (frame, column) in self.categories and (frame, column) not in shared:
+                    self.extend_categories([(frame, column)], new, sorted_values=False)
+
+        for frame, rows in new.items():
+            if not len(rows):
+                continue
+            start, end = self.rows[frame], self.rows[frame] + len(rows)
+            for column in self.columns[frame]:
+                categories = self.categories.get((frame, column))
+                if categories is None:
+                    values = rows[column].to_numpy()
+                else:
+                    # New codes in this column's (possibly extended) categories
+                    lookup = self.codes[frame, column]
+                    mapping = np.array([lookup[value] for value in rows[column].cat.categories] + [-1],
+                                       dtype=self.buffers[frame, column].dtype)
+                    values = mapping[rows[column].array.codes]
+                self.write(frame, column, start, end, values)
+            self.rows[frame] = end
+        self.frames = {frame: self.frame(frame) for frame in self.rows}
+        return self.frames['batting'], self.frames['bowling']
+
+    def extend_categories(self, columns, new, sorted_values):
+        # Add the values of the new rows to the categories of `columns`
+        # (which share one category set when there are several)
+        current = self.categories[columns[0]]
+        lookup = self.codes[columns[0]]
+        added = {}
+        for frame, column in columns:
+            series = new[frame][column]
+            seen = series.cat.categories[pd.unique(series.array.codes[series.array.codes >= 0])]
+            added.update((value, None) for value in seen if value not in lookup)
+        if not added:
+            return
+        if sorted_values:
+            categories = pd.Index(sorted(current.tolist() + list(added)), dtype=current.dtype)
+            lookup = dict(zip(categories.tolist(), range(len(categories))))
+            mapping = categories.get_indexer(current).astype(codes_dtype(len(categories)))
+        else:
+            categories = current.append(pd.Index(list(added), dtype=current.dtype))
+            lookup.update((value, code) for code, value in enumerate(added, len(current)))
+            mapping = None
+        dtype = pd.CategoricalDtype(categories)
+        codes_type = codes_dtype(len(categories))
+        for frame, column in columns:
+            rows = self.rows[frame]
+            buffer = self.buffers[frame, column]
+            if mapping is not None or buffer.dtype != codes_type:
+                # Fresh buffer: earlier frames keep reading the old codes
+                codes = buffer[:rows]
+                remapped = np.empty(len(buffer), dtype=codes_type)
+                remapped[:rows] = codes if mapping is None else np.where(codes < 0, -1, mapping[codes])
+                self.buffers[frame, column] = remapped
+            self.categories[frame, column] = categories
+            self.dtypes[frame, column] = dtype
+            self.codes[frame, column] = lookup
+
+    def write(self, frame, column, start, end, values):
+        buffer = self.buffers[frame, column]
+        dtype = np.result_type(buffer.dtype, values.dtype)
+        if end > len(buffer) or dtype != buffer.dtype:
+            grown = np.empty(max(2 * len(buffer), end), dtype=dtype)
+            grown[:start] = buffer[:start]
+            buffer = self.buffers[frame, column] = grown
+        buffer[start:end] = values
+
+
+SCHEDULE_TEAM_COLUMNS = ['Team1', 'Team2', 'Winner']
+
+
+def strip_text(series):
+    # Team names in the schedule are padded ("England ", " New Zealand")
+    return series.astype(object).where(series.notna()).str.strip()
+
+
+def apply_schedule_schema(schedule, teams=()):
+    # Stripped team names share one category set with the scorecard teams
+    schedule = schedule.copy()
+    for column in SCHEDULE_TEAM_COLUMNS + ['Venue']:
+        schedule[column] = strip_text(schedule[column])
+
+    values = set(teams)
+    for column in SCHEDULE_TEAM_COLUMNS:
+        values.update(schedule[column].dropna().unique())
+    categories = sorted(values)
+    for column in SCHEDULE_TEAM_COLUMNS:
+        schedule[column] = as_category(schedule[column], categories)
+
+    schedule['Venue'] = schedule['Venue'].astype('category')
+    schedule['Match_no'] = downcast(schedule['Match_no'])
+    return schedule
+
+
+def load_schedule(path='match_schedule_results.csv', teams=()):
+    return apply_schedule_schema(load_csv(path, categorical=True), teams)
+
+
+def load_scorecards(batting_path='batting_summary.csv', bowling_path='bowling_summary.csv'):
+    # Cached CSV load straight into categoricals, then the typed schema
+    batting = load_csv(batting_path, categorical=True)
+    bowling = load_csv(bowling_path, categorical=True)
+    return apply_schema(batting, bowling)
+
+
+def memory_report(before, after):
+    # Per-column deep memory use of two versions of the same frame
+    before_bytes = before.memory_usage(deep=True, index=False)
+    after_bytes = after.memory_usage(deep=True, index=False)
+    columns = list(before.columns) + [column for column in after.columns if column not in before.columns]
+    report = pd.DataFrame({
+        'before_dtype': before.dtypes.astype(str),
+        'after_dtype': after.dtypes.astype(str),
+        'before_bytes': before_bytes,
+        'after_bytes': after_bytes,
+    }).reindex(columns)
+    report.loc['total', ['before_bytes', 'after_bytes']] = [before_bytes.sum(), after_bytes.sum()]
+    report['ratio'] = report['after_bytes'] / report['before_bytes']
+    return report
+
+
+if __name__ == '__main__':
+    raw_batting = pd.read_csv('batting_summary.csv')
+    raw_bowling = pd.read_csv('bowling_summary.csv')
+    batting, bowling = apply_schema(raw_batting, raw_bowling)
+    with pd.option_context('display.width', 120):
+        print("batting_summary.csv\n", memory_report(raw_batting, batting), "\n")
+        print("bowling_summary.csv\n", memory_report(raw_bowling, bowling))
@@ -0,0 +1,149 @@
+from bisect import bisect_left
+
+import numpy as np
+
+
+class SearchIndex:
+    # Autocompletion index over a list of player names.
+    #
+    # Matches are ranked in three tiers: names starting with the query,
+    # names with a later word starting with the query, then names containing
+    # the query anywhere. The first two tiers come from sorted prefix arrays
+    # (binary search), the last one from bigram/trigram postings lists, so a
+    # keystroke only touches the candidates that can actually match.
+    def __init__(self, names):
+        self.names = sorted(set(names))
+        self._lower = [name.lower() for name in self.names]
+        self._name_set = set(self.names)
+
+        # Sorted (lowercased name, id) prefix array
+        order = sorted(range(len(self.names)), key=self._lower.__getitem__)
+        self._prefix_keys = [self._lower[i] for i in order]
+        self._prefix_ids = order
+
+        # Sorted (word, id) array for every word after the first one
+        tokens = sorted(
+            (token, i)
+            for i, lower in enumerate(self._lower)
+            for token in lower.split()[1:]
+        )
+        self._token_keys = [token for token, _ in tokens]
+        self._token_ids = [i for _, i in tokens]
+
+        # Gram -> ascending name ids
+        postings = {}
+        for i, lower in enumerate(self._lower):
+            for gram in _grams(lower):
+                postings.setdefault(gram, []).append(i)
+        self._postings = {gram: np.array(ids, dtype=np.int32) for gram, ids in postings.items()}
+
+    def extended(self, names):
+        # A new index with `names` added, or this one when they are all
+        # known. This index is left untouched, so it can keep serving
+        # searches while the new one is built: existing ids are shifted
+        # with one vectorized pass per array and only the new names are
+        # tokenized, instead of rebuilding from every name.
+        added = sorted(set(names) - self._name_set)
+        if not added:
+            return self
+
+        # Old id i moves up by the number of new names sorted before it
+        points = np.array([bisect_left(self.names, name) for name in added])
+        remap = np.arange(len(self.names)) + np.searchsorted(points, np.arange(len(self.names)), side='right')
+        new_ids = points + np.arange(len(added))
+
+        index = SearchIndex.__new__(SearchIndex)
+        index.names = list(self.names)
+        index._lower = list(self._lower)
+        for name, i in zip(added, new_ids.tolist()):
+            index.names.insert(i, name)
+            index._lower.insert(i, name.lower())
+        index._name_set = self._name_set | set(added)
+
+        index._prefix_keys = list(self._prefix_keys)
+        index._prefix_ids = remap[self._prefix_ids].tolist()
+        index._token_keys = list(self._token_keys)
+        index._token_ids = remap[self._token_ids].tolist() if self._token_ids else []
+        postings = {gram: remap[ids].astype(np.int32) for gram, ids in self._postings.items()}
+        for i in new_ids.tolist():
+            lower = index._lower[i]
+            _insert_pair(index._prefix_keys, index._prefix_ids, lower, i)
+            for token in lower.split()[1:]:
+                _insert_pair(index._token_keys, index._token_ids, token, i)
+            for gram in _grams(lower):
+                ids = postings.get(gram)
+                if ids is None:
+                    postings[gram] = np.array([i], dtype=np.int32)
+                else:
+                    postings[gram] = np.insert(ids, np.searchsorted(ids, i), i)
+        index._postings = postings
+        return index
+
+    def __len__(self):
+        return len(self.names)
+
+    def __contains__(self, name):
+        return name in self._name_set
+
+    def search(self, query, limit=10):
+        query = query.lower()
+        if not query.strip():
+            return []
+
+        found = []
+        seen = set()
+
+        def take(ids):
+            for i in ids:
+                if len(found) >= limit:
+                    return
+                if i not in seen:
+                    seen.add(i)
+                    found.append(i)
+
+        take(self._prefix_range(self._prefix_keys, self._prefix_ids, query))
+        take(self._prefix_range(self._token_keys, self._token_ids, query))
+        if len(found) < limit and len(query) >= 2:
+            take(self._substring_candidates(query))
+
+        return [self.names[i] for i in found]
+
+    @staticmethod
+    def _prefix_range(keys, ids, query):
+        i = bisect_left(keys, query)
+        while i < len(keys) and keys[i].startswith(query):
+            yield ids[i]
+            i += 1
+
+    def _substring_candidates(self, query):
+        # Walk the rarest gram's postings in id (alphabetical) order and
+        # verify each candidate, so the scan stops as soon as the caller
+        # has enough matches
+        n = min(len(query), 3)
+        grams = {query[j:j + n] for j in range(len(query) - n + 1)}
+        postings = [self._postings.get(gram) for gram in grams]
+        if any(p is None for p in postings):
+            return
+        rarest = min(postings, key=len)
+        exact = len(query) <= 3
+        for i in rarest:
+            i = int(i)
+            if exact or query in self._lower[i]:
+                yield i
+
+
+def _grams(lower):
+    # Distinct bigrams and trigrams of a lowercased name
+    grams = set()
+    for n in (2, 3):
+        grams.update(lower[j:j + n] for j in range(len(lower) - n + 1))
+    return grams
+
+
+def _insert_pair(keys, ids, key, i):
+    # Insert (key, i) into parallel lists sorted by key, then id
+    position = bisect_left(keys, key)
+    while position < len(keys) and keys[position] == key and ids[position] < i:
+        position += 1
+    keys.insert(position, key)
+    ids.insert(position, i)
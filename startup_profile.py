@@ -0,0 +1,28 @@
+import time
+
+
+class StartupProfile:
+    # Records named checkpoints from process start for --profile-startup.
+    # Each mark is reported with its time since start and since the
+    # previous mark.
+    def __init__(self, start=None):
+        self.start = time.perf_counter() if start is None else start
+        self.marks = []
+        self.reported = False
+
+    def mark(self, name):
+        self.marks.append((name, time.perf_counter()))
+        if self.reported:
+            # Late checkpoints (e.g. the first chart) are printed as they happen
+            self.print_mark(len(self.marks) - 1)
+
+    def report(self):
+        self.reported = True
+        print("Startup profile:")
+        for i in range(len(self.marks)):
+            self.print_mark(i)
+
+    def print_mark(self, i):
+        name, at = self.marks[i]
+        previous = self.marks[i - 1][1] if i else self.start
+        print(f"  {name:<32} {(at - self.start) * 1000:9.1f} ms  (+{(at - previous) * 1000:.1f} ms)")
@@ -0,0 +1,478 @@
+import argparse
+import sqlite3
+import threading
+
+import numpy as np
+import pandas as pd
+
+from cricket_stats import CricketStats
+from downsample import TREND_SERIES, TrendView
+from form import FORM_SPECS, FormIndex
+from leaderboard import Leaderboard
+from player_profiles import LAZY_COLUMN, PlayerProfiles
+from player_index import normalize_name, normalized_names
+from schema import FLOAT_COLUMNS, apply_schedule_schema, apply_schema
+
+# Optional SQLite storage for several tournaments' worth of scorecards.
+#
+# Each CSV gets a table with the typed columns from schema.py (Balls instead
+# of Overs, parsed dismissals, stripped schedule team names) plus a
+# `tournament` column. A tournament is ingested in one transaction with
+# executemany, replacing any earlier rows for that tournament, so adding a
+# season never rebuilds the rest of the database. The tabs' filters (player,
+# team, fixture, match number) are indexed and StoreStats only reads the
+# rows a query needs.
+#
+# Match numbers and fixture names repeat from one tournament to the next.
+# A StoreStats over several tournaments therefore numbers the matches
+# across the store (each tournament's matches follow the previous one's,
+# in the order they were added) and labels fixtures with their tournament,
+# so every per-match grouping stays within one tournament.
+DEFAULT_DB = 'cricket.db'
+DEFAULT_FILES = {
+    'batting': 'batting_summary.csv',
+    'bowling': 'bowling_summary.csv',
+    'schedule': 'match_schedule_results.csv',
+    'players': 'world_cup_players_info.csv',
+}
+# Indexed columns: every filter the tabs push down
+INDEXES = {
+    'batting': ['tournament', 'Match_no', 'Batsman_Name', 'Team_Innings', 'Match_Between'],
+    'bowling': ['tournament', 'Match_no', 'Bowler_Name', 'Bowling_Team', 'Match_Between'],
+    'schedule': ['tournament', 'Match_no', 'Team1', 'Team2'],
+    'players': ['tournament', 'player_name', 'team_name'],
+}
+PLAYER_COLUMNS = {'batting': 'Batsman_Name', 'bowling': 'Bowler_Name'}
+
+
+def quote(name):
+    return '"' + name.replace('"', '""') + '"'
+
+
+def sql_type(dtype):
+    if dtype.kind in 'biu':
+        return 'INTEGER'
+    if dtype.kind == 'f':
+        return 'REAL'
+    return 'TEXT'
+
+
+def sql_values(frame):
+    # Rows as plain Python values with NaN -> NULL, ready for executemany
+    frame = frame.astype(object).where(frame.notna(), None)
+    for row in frame.itertuples(index=False, name=None):
+        yield tuple(value.item() if isinstance(value, np.generic) else value for value in row)
+
+
+def read_tournament(files):
+    # CSV paths -> typed frames, keyed by table
+    batting, bowling = apply_schema(pd.read_csv(files['batting']), pd.read_csv(files['bowling']))
+    frames = {'batting': batting, 'bowling': bowling}
+    if files.get('schedule'):
+        frames['schedule'] = apply_schedule_schema(pd.read_csv(files['schedule']))
+    if files.get('players'):
+        frames['players'] = pd.read_csv(files['players'])
+    return frames
+
+
+class CricketStore:
+    # Thin wrapper around the database file. Connections are per thread so
+    # the query workers can read concurrently.
+    def __init__(self, path=DEFAULT_DB):
+        self.path = path
+        self.local = threading.local()
+
+    @property
+    def connection(self):
+        connection = getattr(self.local, 'connection', None)
+        if connection is None:
+            connection = sqlite3.connect(self.path)
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=NORMAL')
+            self.local.connection = connection
+        return connection
+
+    def close(self):
+        connection = getattr(self.local, 'connection', None)
+        if connection is not None:
+            connection.close()
+            self.local.connection = None
+
+    # ------------------------------------------------------------------
+    # Ingestion
+    # ------------------------------------------------------------------
+    def add_tournament(self, tournament, files=None):
+        # Bulk-load one tournament's CSVs, replacing that tournament only
+        frames = read_tournament(dict(DEFAULT_FILES, **(files or {})))
+        connection = self.connection
+        with connection:
+            self.ensure_tournaments()
+            for table, frame in frames.items():
+                self.ensure_table(table, frame)
+                connection.execute(f'DELETE FROM {table} WHERE tournament = ?', (tournament,))
+                columns = ['tournament'] + list(frame.columns)
+                placeholders = ', '.join('?' * len(columns))
+                connection.executemany(
+                    f'INSERT INTO {table} ({", ".join(map(quote, columns))}) VALUES ({placeholders})',
+                    ((tournament,) + row for row in sql_values(frame)),
+                )
+            # A re-ingested tournament keeps its place in the store
+            connection.execute('INSERT INTO tournaments (name) VALUES (?) ON CONFLICT(name) DO NOTHING', (tournament,))
+            self.ensure_indexes()
+        connection.execute('ANALYZE')
+        return {table: len(frame) for table, frame in frames.items()}
+
+    def ensure_tournaments(self):
+        # Tournaments numbered in the order they were first added; seq never
+        # goes back, unlike the one-second added_at. Stores written before
+        # the seq column are converted once, in their added_at order.
+        connection = self.connection
+        create = ('CREATE TABLE IF NOT EXISTS tournaments (seq INTEGER PRIMARY KEY AUTOINCREMENT, '
+                  'name TEXT NOT NULL UNIQUE, added_at TEXT DEFAULT CURRENT_TIMESTAMP)')
+        if 'tournaments' in self.tables() and 'seq' not in self.columns('tournaments'):
+            connection.execute('ALTER TABLE tournaments RENAME TO tournaments_by_time')
+            connection.execute(create)
+            connection.execute('INSERT INTO tournaments (name, added_at) '
+                               'SELECT name, added_at FROM tournaments_by_time ORDER BY added_at, name')
+            connection.execute('DROP TABLE tournaments_by_time')
+        else:
+            connection.execute(create)
+
+    def ensure_table(self, table, frame):
+        # Creates the table on first use; columns that a later tournament's
+        # CSV brings are added (earlier tournaments read NULL for them)
+        columns = ', '.join(f'{quote(name)} {sql_type(frame[name].dtype)}' for name in frame.columns)
+        self.connection.execute(f'CREATE TABLE IF NOT EXISTS {table} (tournament TEXT NOT NULL, {columns})')
+        existing = set(self.columns(table))
+        for name in frame.columns:
+            if name not in existing:
+                self.connection.execute(f'ALTER TABLE {table} ADD COLUMN {quote(name)} {sql_type(frame[name].dtype)}')
+
+    def ensure_indexes(self):
+        existing = set(self.tables())
+        for table, columns in INDEXES.items():
+            if table not in existing:
+                continue
+            for column in columns:
+                self.connection.execute(
+                    f'CREATE INDEX IF NOT EXISTS {table}_{column.lower()} ON {table} ({quote(column)})'
+                )
+
+    def remove_tournament(self, tournament):
+        with self.connection:
+            for table in self.tables():
+                if table != 'tournaments':
+                    self.connection.execute(f'DELETE FROM {table} WHERE tournament = ?', (tournament,))
+            self.connection.execute('DELETE FROM tournaments WHERE name = ?', (tournament,))
+
+    # ------------------------------------------------------------------
+    # Reads
+    # ------------------------------------------------------------------
+    def tables(self):
+        # Not SQLite's own tables (sqlite_sequence, sqlite_stat1)
+        rows = self.connection.execute("SELECT name FROM sqlite_master WHERE type = 'table' "
+                                       "AND name NOT LIKE 'sqlite_%'")
+        return [name for name, in rows]
+
+    def tournaments(self):
+        if 'tournaments' not in self.tables():
+            return []
+        return [name for name, in self.connection.execute('SELECT name FROM tournaments ORDER BY seq')]
+
+    def columns(self, table):
+        rows = self.connection.execute(f'PRAGMA table_info({table})')
+        return [name for _, name, *_ in rows if name != 'tournament']
+
+    def select(self, table, where=(), params=(), tournament=None, with_tournament=False):
+        # Rows in ingest order as a DataFrame, with the tournament column only
+        # when with_tournament=True. `where` is a list of SQL conditions
+        # ANDed together.
+        where = list(where)
+        params = list(params)
+        if tournament is not None:
+            where.append('tournament = ?')
+            params.append(tournament)
+        columns = (['tournament'] if with_tournament else []) + self.columns(table)
+        sql = f'SELECT {", ".join(map(quote, columns))} FROM {table}'
+        if where:
+            sql += ' WHERE ' + ' AND '.join(f'({condition})' for condition in where)
+        frame = pd.read_sql_query(sql + ' ORDER BY rowid', self.connection, params=params)
+        # REAL columns hold the float32 rates exactly; narrow them back
+        for column in FLOAT_COLUMNS.get(table, []):
+            frame[column] = frame[column].astype(np.float32)
+        return frame
+
+    def distinct(self, table, column, tournament=None):
+        sql = f'SELECT DISTINCT {quote(column)} FROM {table} WHERE {quote(column)} IS NOT NULL'
+        params = ()
+        if tournament is not None:
+            sql += ' AND tournament = ?'
+            params = (tournament,)
+        return [value for value, in self.connection.execute(sql, params)]
+
+    def match_offsets(self):
+        # Tournament -> number added to its match numbers so they follow the
+        # previous tournaments' matches, in the order the tournaments were
+        # added
+        tables = [table for table in ('batting', 'bowling', 'schedule') if table in self.tables()]
+        if not tables:
+            return {}
+        union = ' UNION ALL '.join(f'SELECT tournament, Match_no FROM {table}' for table in tables)
+        last = dict(self.connection.execute(f'SELECT tournament, MAX(Match_no) FROM ({union}) GROUP BY tournament'))
+        offsets, offset = {}, 0
+        for name in self.tournaments():
+            offsets[name] = offset
+            offset += int(last.get(name) or 0)
+        return offsets
+
+    def aggregate(self, sql, params=(), tournament=None):
+        # `sql` has a {where} placeholder for the tournament filter
+        where = 'WHERE tournament = ?' if tournament is not None else ''
+        params = tuple(params) + ((tournament,) if tournament is not None else ())
+        return pd.read_sql_query(sql.format(where=where), self.connection, params=params)
+
+
+def in_list(column, values):
+    return f'{quote(column)} IN ({", ".join("?" * len(values))})'
+
+
+def fixture_label(match, tournament):
+    return f'{match} ({tournament})'
+
+
+class StoreStats:
+    # The CricketStats query interface on top of a CricketStore. Each query
+    # reads only the rows behind it through the indexes and runs the usual
+    # CricketStats aggregation on that slice; the trends are aggregated in
+    # SQL. Only the distinct names for the selectors are held in memory.
+    #
+    # Without a tournament, a store holding several is read with store-wide
+    # match numbers and fixtures labelled "<fixture> (<tournament>)"; see the
+    # module comment.
+    def __init__(self, store, tournament=None):
+        self.store = store
+        self.tournament = tournament
+        self.offsets = store.match_offsets() if tournament is None else {}
+        if len(self.offsets) < 2:
+            self.offsets = {}
+
+        # Normalized player name -> spellings in the data
+        self.spellings = {}
+        for table, column in PLAYER_COLUMNS.items():
+            for name in store.distinct(table, column, tournament):
+                self.spellings.setdefault(normalize_name(name), set()).add(name)
+        self.names = sorted(self.spellings)
+        self._lower_names = [name.lower() for name in self.names]
+
+        self.players = sorted(store.distinct('batting', 'Batsman_Name', tournament))
+        self.teams = sorted(store.distinct('batting', 'Team_Innings', tournament))
+        # Fixture label -> (fixture, tournament or None)
+        if self.offsets:
+            pairs = store.connection.execute('SELECT DISTINCT Match_Between, tournament FROM batting '
+                                             'WHERE Match_Between IS NOT NULL')
+            self.fixtures = {fixture_label(match, name): (match, name) for match, name in pairs}
+        else:
+            self.fixtures = {match: (match, None) for match in store.distinct('batting', 'Match_Between', tournament)}
+        self.matches = sorted(self.fixtures)
+        self.leaderboards = {}
+        self.trend_views = {}
+
+    def select(self, table, where=(), params=()):
+        if not self.offsets:
+            return self.store.select(table, where, params, self.tournament)
+        frame = self.store.select(table, where, params, with_tournament=True)
+        tournaments = frame.pop('tournament')
+        frame['Match_no'] = frame['Match_no'] + tournaments.map(self.offsets).to_numpy()
+        if 'Match_Between' in frame:
+            frame['Match_Between'] = [fixture_label(match, name)
+                                      for match, name in zip(frame['Match_Between'], tournaments)]
+        return frame
+
+    def match_number(self):
+        # SQL expression for the match number the trends group on, and its
+        # parameters (store-wide when reading several tournaments)
+        if not self.offsets:
+            return 'Match_no', ()
+        cases = ' '.join('WHEN ? THEN ?' for _ in self.offsets)
+        params = tuple(value for item in self.offsets.items() for value in item)
+        return f'(Match_no + CASE tournament {cases} ELSE 0 END)', params
+
+    def slice_stats(self, batting=None, bowling=None, schedule=None):
+        # CricketStats over just the rows a query needs
+        if batting is None:
+            batting = self.select('batting', ['0'])
+        if bowling is None:
+            bowling = self.select('bowling', ['0'])
+        return CricketStats(batting, bowling, schedule)
+
+    def search(self, text):
+        text = str(text).strip().lower()
+        if not text:
+            return []
+        return [name for name, lower in zip(self.names, self._lower_names) if text in lower]
+
+    def player_stats(self, player):
+        player = normalize_name(player)
+        names = [player] if player in self.spellings else self.search(player)
+        if not names:
+            return None
+
+        spellings = sorted(set().union(*(self.spellings[name] for name in names)))
+        return self.slice_stats(
+            self.select('batting', [in_list('Batsman_Name', spellings)], spellings),
+            self.select('bowling', [in_list('Bowler_Name', spellings)], spellings),
+        ).player_stats(player)
+
+    def player_suggestions(self, player, limit=5):
+        return self.search(normalize_name(player))[:limit]
+
+    def team_stats(self, team):
+        return self.slice_stats(
+            self.select('batting', ['Team_Innings = ?'], [team]),
+            self.select('bowling', ['Bowling_Team = ?'], [team]),
+            self.team_schedule(team),
+        ).team_stats(team)
+
+    def head_to_head(self, team1, team2):
+        schedule = self.select('schedule', ['(Team1 = ? AND Team2 = ?) OR (Team1 = ? AND Team2 = ?)'],
+                               [team1, team2, team2, team1])
+        return self.slice_stats(schedule=schedule).head_to_head(team1, team2)
+
+    def venue_splits(self, team):
+        return self.slice_stats(schedule=self.team_schedule(team)).venue_splits(team)
+
+    def team_schedule(self, team):
+        return self.select('schedule', ['Team1 = ? OR Team2 = ?'], [team, team])
+
+    def match_summary(self, match):
+        if match not in self.fixtures:
+            return None
+        fixture, tournament = self.fixtures[match]
+        where, params = ['Match_Between = ?'], [fixture]
+        if tournament is not None:
+            where.append('tournament = ?')
+            params.append(tournament)
+        return self.slice_stats(self.select('batting', where, params)).match_summary(match)
+
+    def player_rows(self, player):
+        spellings = sorted(self.spellings.get(normalize_name(player), ()))
+        return (self.select('batting', [in_list('Batsman_Name', spellings)], spellings),
+                self.select('bowling', [in_list('Bowler_Name', spellings)], spellings))
+
+    def batting_form(self, player):
+        return FormIndex(*self.player_rows(player), CricketStats.FORM_WINDOW).batting(player)
+
+    def bowling_form(self, player):
+        return FormIndex(*self.player_rows(player), CricketStats.FORM_WINDOW).bowling(player)
+
+    def recent_rows(self, table):
+        # Each player's last FORM_WINDOW rows, ranked in SQL, with their
+        # total row count
+        spec = FORM_SPECS[table]
+        name = quote(spec['name'])
+        match_no, params = self.match_number()
+        return self.store.aggregate(
+            f'SELECT * FROM (SELECT position, {name}, Match_no, {", ".join(spec["sums"])}, '
+            f'ROW_NUMBER() OVER (PARTITION BY {name} ORDER BY Match_no DESC, position DESC) AS recent, '
+            f'COUNT(*) OVER (PARTITION BY {name}) AS total FROM (SELECT rowid AS position, {name}, '
+            f'{match_no} AS Match_no, {", ".join(spec["sums"])} FROM {table} {{where}})) '
+            f'WHERE recent <= {int(CricketStats.FORM_WINDOW)} ORDER BY position',
+            params, tournament=self.tournament)
+
+    def players_in_form(self, metric='Average', k=10, min_innings=None):
+        recent = {table: self.recent_rows(table) for table in FORM_SPECS}
+        form = FormIndex(recent['batting'], recent['bowling'], CricketStats.FORM_WINDOW)
+        for kind, rows in recent.items():
+            # Career innings counts come from SQL, not the truncated rows
+            name = FORM_SPECS[kind]['name']
+            rows = rows.drop_duplicates(name)
+            totals = rows.groupby(normalized_names(rows[name]))['total'].sum()
+            form.latest[kind]['Total_Innings'] = totals.reindex(form.latest[kind].index).to_numpy()
+        return form.leaders(metric, k, min_innings)
+
+    def player_profiles(self):
+        # Profiles from the players table. The short columns are read now;
+        # a biography is fetched by rowid when its player is shown.
+        if 'players' not in self.store.tables():
+            return None
+        columns = [quote(column) for column in self.store.columns('players') if column != LAZY_COLUMN]
+        frame = self.store.aggregate(f'SELECT rowid AS position, {", ".join(columns)} FROM players {{where}} '
+                                     f'ORDER BY rowid', tournament=self.tournament)
+        positions = frame.pop('position').to_numpy()
+
+        def description(position):
+            row = self.store.connection.execute(f'SELECT {LAZY_COLUMN} FROM players WHERE rowid = ?',
+                                                (int(positions[position]),)).fetchone()
+            return row[0] or '' if row else ''
+        return PlayerProfiles(frame, description)
+
+    def top_players(self, metric='Runs', career=False, **filters):
+        # Leaderboard for this tournament, or across every tournament in the
+        # store when career=True. Each scope is read and ranked once.
+        tournament = None if career else self.tournament
+        if tournament not in self.leaderboards:
+            self.leaderboards[tournament] = Leaderboard(self.store.select('batting', tournament=tournament),
+                                                        self.store.select('bowling', tournament=tournament))
+        return self.leaderboards[tournament].query(metric, **filters)
+
+    def batting_trend(self):
+        match_no, params = self.match_number()
+        trend = self.store.aggregate(f'SELECT {match_no} AS match_key, SUM(Runs) * 1.0 / COUNT(Runs) AS value '
+                                     'FROM batting {where} GROUP BY match_key ORDER BY match_key',
+                                     params, tournament=self.tournament)
+        return trend.set_index('match_key').rename_axis('Match_no')['value']
+
+    def bowling_trend(self):
+        match_no, params = self.match_number()
+        trend = self.store.aggregate(f'SELECT {match_no} AS match_key, SUM(Economy) / COUNT(Economy) AS value '
+                                     'FROM bowling {where} GROUP BY match_key ORDER BY match_key',
+                                     params, tournament=self.tournament)
+        return trend.set_index('match_key').rename_axis('Match_no')['value']
+
+    def team_trend(self):
+        match_no, params = self.match_number()
+        runs = self.store.aggregate(f'SELECT Team_Innings, {match_no} AS match_key, SUM(Runs) AS Runs '
+                                    'FROM batting {where} GROUP BY Team_Innings, match_key',
+                                    params, tournament=self.tournament)
+        runs = runs.rename(columns={'match_key': 'Match_no'})
+        return runs.set_index(['Team_Innings', 'Match_no'])['Runs'].unstack(level=0)
+
+    def win_rate_trend(self, rolling=False):
+        return self.slice_stats(schedule=self.select('schedule')).win_rate_trend(rolling)
+
+    def trend_window(self, kind, start=None, end=None, points=None, top=None):
+        # Aggregated in SQL once, then windowed in memory like CricketStats
+        view = self.trend_views.get(kind)
+        if view is None:
+            view = self.trend_views[kind] = TrendView(getattr(self, TREND_SERIES[kind])())
+        return view.window(start, end, points, top)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Manage the SQLite scorecard store.")
+    parser.add_argument('--db', default=DEFAULT_DB, help="database file (default %(default)s)")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    add = commands.add_parser('add', help="ingest (or re-ingest) one tournament's CSVs")
+    add.add_argument('tournament')
+    for table, path in DEFAULT_FILES.items():
+        add.add_argument(f'--{table}', default=path, help="CSV path (default %(default)s)")
+    remove = commands.add_parser('remove', help="delete one tournament's rows")
+    remove.add_argument('tournament')
+    commands.add_parser('list', help="list ingested tournaments")
+
+    args = parser.parse_args()
+    store = CricketStore(args.db)
+    if args.command == 'add':
+        counts = store.add_tournament(args.tournament, {table: getattr(args, table) for table in DEFAULT_FILES})
+        print(f"Added {args.tournament}: " + ', '.join(f"{rows} {table} rows" for table, rows in counts.items()))
+    elif args.command == 'remove':
+        store.remove_tournament(args.tournament)
+        print(f"Removed {args.tournament}")
+    else:
+        for name in store.tournaments():
+            print(name)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,60 @@
+# Summary text shown next to the charts. Shared by the GUI tabs and the
+# batch exporter so both print exactly the same figures.
+
+
+def batting_text(player, summary):
+    return f"""
+            Batting Statistics for {player}:
+            Total Matches: {summary['matches']}
+            Total Runs: {summary['total_runs']}
+            Average: {summary['average']:.2f}
+            Highest Score: {summary['highest_score']}
+            """
+
+
+def bowling_text(player, summary):
+    return f"""
+            Bowling Statistics for {player}:
+            Total Matches: {summary['matches']}
+            Total Wickets: {summary['total_wickets']}
+            Economy Rate: {summary['economy_rate']:.2f}
+            Best Bowling: {summary['best_wickets']} wickets for {summary['best_runs']} runs
+            """
+
+
+def team_text(team1, team2, team1_stats, team2_stats, head_to_head):
+    return f"""
+        Team Comparison:
+        
+        Head to Head: {team1} {head_to_head['wins']} - {head_to_head['losses']} {team2} ({head_to_head['played']} played)
+        
+        {team1}:
+        Average Runs: {team1_stats['avg_runs']:.2f}
+        Average Economy: {team1_stats['avg_economy']:.2f}
+        Win Rate: {team1_stats['win_rate']:.0%} ({team1_stats['won']} of {team1_stats['played']})
+        
+        {team2}:
+        Average Runs: {team2_stats['avg_runs']:.2f}
+        Average Economy: {team2_stats['avg_economy']:.2f}
+        Win Rate: {team2_stats['win_rate']:.0%} ({team2_stats['won']} of {team2_stats['played']})
+        """
+
+
+def profile_text(profile):
+    styles = [f"{label}: {profile[column]}" for label, column in
+              (("Bats", 'battingStyle'), ("Bowls", 'bowlingStyle')) if profile[column]]
+    heading = profile['player_name'] + (f" ({profile['team_name']})" if profile['team_name'] else "")
+    if profile['playingRole']:
+        heading += f" - {profile['playingRole']}"
+    return "\n".join([heading, ", ".join(styles), "", profile.get('description') or ""]).strip()
+
+
+def match_text(match, team_scores, top_batsmen):
+    return f"""
+        Match Summary: {match}
+        
+        Team Scores:
+        {team_scores.to_string()}
+        
+        Top Scorer: {top_batsmen.iloc[0]['Batsman_Name']} ({top_batsmen.iloc[0]['Runs']} runs)
+        """
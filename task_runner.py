@@ -0,0 +1,126 @@
+import queue
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+
+
+class TaskRunner:
+    # Runs query work off the Tk main loop and hands results back to it.
+    #
+    # Each channel (one per tab) has a generation counter. Submitting new
+    # work bumps the counter and cancels the previous request if it has not
+    # started yet; results that come back for an older generation are
+    # dropped instead of painted. Completed futures are queued by the worker
+    # threads and drained on the Tk thread with root.after, since Tk calls
+    # are only safe from the thread that owns the interpreter.
+    #
+    # Work that changes the shared data (a live update) goes through
+    # exclusive(): it runs on the Tk thread once no query is running, and
+    # queries submitted in the meantime are held back until it has run.
+    def __init__(self, root, max_workers=2, poll_ms=20, on_busy=None, on_error=None):
+        self.root = root
+        self.poll_ms = poll_ms
+        self.on_busy = on_busy
+        self.on_error = on_error
+        self.executor = ThreadPoolExecutor(max_workers, thread_name_prefix='query') if max_workers else None
+        self.results = queue.Queue()
+        self.generations = {}
+        self.pending = {}
+        self.running = set()
+        self.exclusive_work = []
+        self.held = {}
+        self.polling = None
+
+    def submit(self, channel, work, done):
+        generation = self.generations.get(channel, 0) + 1
+        self.generations[channel] = generation
+
+        previous = self.pending.pop(channel, None)
+        if previous is not None:
+            previous.cancel()
+
+        if self.executor is None:
+            # Synchronous mode: run on the calling (Tk) thread
+            try:
+                result = work()
+            except Exception as error:
+                self.report_error(channel, error)
+                return
+            done(result)
+            return
+
+        if self.exclusive_work:
+            # Started once the pending exclusive work has run; a newer
+            # submission for the channel replaces this one
+            self.held[channel] = (work, done)
+            self.set_busy(channel, True)
+            return
+        self.start(channel, generation, work, done)
+
+    def start(self, channel, generation, work, done):
+        future = self.executor.submit(work)
+        self.pending[channel] = future
+        self.running.add(future)
+        self.set_busy(channel, True)
+        future.add_done_callback(lambda f: self.results.put((channel, generation, f, done)))
+        self.schedule_poll()
+
+    def exclusive(self, channel, work):
+        # Run work on the Tk thread when no query is running; errors are
+        # reported for `channel`
+        self.exclusive_work.append((channel, work))
+        if self.executor is None or not self.running:
+            self.run_exclusive()
+        else:
+            self.schedule_poll()
+
+    def schedule_poll(self):
+        if self.polling is None:
+            self.polling = self.root.after(self.poll_ms, self.poll)
+
+    def poll(self):
+        self.polling = None
+        while True:
+            try:
+                channel, generation, future, done = self.results.get_nowait()
+            except queue.Empty:
+                break
+            self.running.discard(future)
+            if generation != self.generations.get(channel) or future.cancelled():
+                continue  # superseded by a newer selection
+
+            self.pending.pop(channel, None)
+            self.set_busy(channel, False)
+            error = future.exception()
+            if error is not None:
+                self.report_error(channel, error)
+                continue
+            done(future.result())
+
+        if self.exclusive_work and not self.running:
+            self.run_exclusive()
+        if self.pending or self.exclusive_work:
+            self.schedule_poll()
+
+    def run_exclusive(self):
+        queued, self.exclusive_work = self.exclusive_work, []
+        for channel, work in queued:
+            try:
+                work()
+            except Exception as error:
+                self.report_error(channel, error)
+        held, self.held = self.held, {}
+        for channel, (work, done) in held.items():
+            self.start(channel, self.generations[channel], work, done)
+
+    def set_busy(self, channel, busy):
+        if self.on_busy is not None:
+            self.on_busy(channel, busy)
+
+    def report_error(self, channel, error):
+        traceback.print_exception(type(error), error, error.__traceback__)
+        if self.on_error is not None:
+            self.on_error(channel, error)
+
+    def shutdown(self):
+        if self.executor is not None:
+            self.executor.shutdown(wait=False, cancel_futures=True)
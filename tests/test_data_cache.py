@@ -0,0 +1,23 @@
+import os
+import shutil
+
+import pandas as pd
+import pytest
+
+from conftest import ROOT
+from data_cache import load_csv
+
+
+@pytest.mark.parametrize('filename', ['batting_summary.csv', 'match_schedule_results.csv'])
+@pytest.mark.parametrize('categorical', [False, True])
+def test_warm_load_returns_the_cold_frame(tmp_path, filename, categorical):
+    path = str(tmp_path / filename)
+    shutil.copy(os.path.join(ROOT, filename), path)
+    cold = load_csv(path, categorical=categorical)
+    warm = load_csv(path, categorical=categorical)
+    # check_exact=False: the exact check also compares the array class, and
+    # the warm numeric columns are memory-mapped
+    pd.testing.assert_frame_equal(warm, cold, check_exact=False, rtol=0)
+    if categorical:
+        for name in cold.select_dtypes('category'):
+            assert list(warm[name].cat.categories) == list(cold[name].cat.categories)
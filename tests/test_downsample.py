@@ -0,0 +1,53 @@
+import numpy as np
+import pandas as pd
+
+from downsample import OTHERS, TrendView, trend_window
+
+
+def sparse_trend(matches=5000, teams=6, seed=0):
+    # Each team only plays some matches, so its line has gaps in the others'
+    rng = np.random.default_rng(seed)
+    values = rng.normal(size=(matches, teams)).cumsum(axis=0)
+    values[rng.random(values.shape) < 0.7] = np.nan
+    return pd.DataFrame(values, index=pd.RangeIndex(1, matches + 1, name='Match_no'),
+                        columns=[f'Team {i}' for i in range(teams)])
+
+
+def test_each_line_is_downsampled_on_its_own_x():
+    trend = sparse_trend()
+    lines = trend_window(trend, points=100)
+    assert list(lines) == list(trend.columns)
+    for name, line in lines.items():
+        full = trend[name].dropna()
+        # Two points per pixel at most, plus the ends
+        assert len(line) <= 2 * 100 + 2
+        assert not line.isna().any()
+        assert line.index.is_monotonic_increasing
+        assert line.max() == full.max() and line.min() == full.min()
+        assert line.index[0] == full.index[0] and line.index[-1] == full.index[-1]
+
+
+def test_window_keeps_one_point_beyond_each_edge():
+    trend = sparse_trend()
+    line = trend_window(trend, 1000, 1100)['Team 0']
+    full = trend['Team 0'].dropna()
+    inside = full[(full.index >= 1000) & (full.index <= 1100)]
+    assert line.index[0] == full.index[full.index < 1000][-1]
+    assert line.index[-1] == full.index[full.index > 1100][0]
+    pd.testing.assert_series_equal(line.iloc[1:-1], inside, check_names=False)
+
+
+def test_top_lines_and_others_are_ranked_once():
+    trend = sparse_trend()
+    view = TrendView(trend)
+    whole = view.window(points=50, top=2)
+    zoomed = view.window(2000, 2500, points=50, top=2)
+    assert list(whole) == list(zoomed)
+    assert list(whole)[-1] == f'{OTHERS} (4)'
+    assert list(view.groups) == [2]
+
+
+def test_series_trend_keeps_its_name():
+    series = sparse_trend()['Team 1'].rename('Average')
+    line = trend_window(series, 100, 200, points=10)
+    assert isinstance(line, pd.Series) and line.name == 'Average'
@@ -0,0 +1,23 @@
+import pytest
+
+from export_reports import ReportWriter, load_stats, report_jobs
+
+
+@pytest.fixture(scope='module')
+def stats():
+    return load_stats()
+
+
+def test_bowlers_who_never_batted_get_reports(stats):
+    players = {key for kind, key in report_jobs(stats, ['player'])}
+    bowlers = set(stats.bowling_data['Bowler_Name'].dropna())
+    assert players == set(stats.players) | bowlers
+    assert bowlers - set(stats.players)
+
+
+def test_player_charts_draw_the_form_lines(stats, tmp_path):
+    writer = ReportWriter(str(tmp_path), ['png'], stats)
+    writer.write('player', 'Virat Kohli')
+    chart = writer.charts['batting']
+    assert len(chart.bar_form.get_xdata()) and len(chart.line_form.get_xdata())
+    assert writer.charts['bowling'].line_form is not None
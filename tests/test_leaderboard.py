@@ -0,0 +1,43 @@
+import asyncio
+import json
+
+import pytest
+
+from leaderboard import Leaderboard
+from query_server import QueryService
+from schema import load_scorecards
+
+
+@pytest.fixture(scope='module')
+def board():
+    return Leaderboard(*load_scorecards())
+
+
+@pytest.mark.parametrize('filters, message', [
+    ({'page': -1}, 'Page must be 0 or more'),
+    ({'page_size': 0}, 'Page size must be at least 1'),
+    ({'ranges': {'Foo': (1, None)}}, "Unknown range column 'Foo'"),
+    ({'ranges': {'Team': (1, None)}}, "Unknown range column 'Team'"),
+])
+def test_bad_filters_are_rejected(board, filters, message):
+    with pytest.raises(ValueError, match=message):
+        board.query('Runs', **filters)
+
+
+def test_server_reports_bad_pages_as_bad_requests(board):
+    class Stats:
+        def top_players(self, metric, **filters):
+            return board.query(metric, **filters)
+
+    service = QueryService(Stats(), None, 'test', workers=1)
+
+    async def get(**params):
+        service.condition = asyncio.Condition()
+        return await service.respond('/leaderboard', {name: [value] for name, value in params.items()})
+
+    for params in ({'page_size': '0'}, {'page': '-1'}, {'range': 'Foo:1:'}):
+        status, _, body = asyncio.run(get(**params))
+        assert status == 400
+        assert json.loads(body)['error']
+    status, _, body = asyncio.run(get(page_size='5'))
+    assert status == 200 and len(json.loads(body)['rows']['data']) == 5
@@ -0,0 +1,180 @@
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from conftest import ROOT
+from cricket_stats import CricketStats
+from leaderboard import METRICS
+from live_ingest import LiveIngest
+from schema import apply_schema, load_schedule
+from task_runner import TaskRunner
+
+FILES = {'batting': 'batting_summary.csv', 'bowling': 'bowling_summary.csv'}
+
+
+def split_matches(frame, parts):
+    # Rows arrive in match order during a tournament
+    bounds = np.linspace(0, frame['Match_no'].max(), parts + 1)
+    return [frame[(frame['Match_no'] > low) & (frame['Match_no'] <= high)]
+            for low, high in zip(bounds[:-1], bounds[1:])]
+
+
+def assert_same_frame(got, want):
+    assert list(got.columns) == list(want.columns)
+    for column in want.columns:
+        if isinstance(want[column].dtype, pd.CategoricalDtype):
+            assert got[column].astype(object).equals(want[column].astype(object)), column
+        else:
+            assert got[column].dtype == want[column].dtype, column
+            np.testing.assert_array_equal(got[column].to_numpy(), want[column].to_numpy(), err_msg=column)
+
+
+def assert_same_stats(got, want):
+    assert got.players == want.players and got.teams == want.teams and got.matches == want.matches
+    for player in ('Virat Kohli', 'Glenn Maxwell', 'Adam Zampa'):
+        mine, theirs = got.player_stats(player), want.player_stats(player)
+        assert mine['batting_summary'] == theirs['batting_summary']
+        assert mine['bowling_summary'] == theirs['bowling_summary']
+        # The curve's row labels are internal positions
+        pd.testing.assert_frame_equal(got.batting_form(player).reset_index(drop=True),
+                                      want.batting_form(player).reset_index(drop=True))
+    for team in want.teams:
+        assert got.team_stats(team) == pytest.approx(want.team_stats(team), nan_ok=True)
+    for match in want.matches:
+        mine, theirs = got.match_summary(match), want.match_summary(match)
+        pd.testing.assert_series_equal(mine['team_scores'], theirs['team_scores'], check_dtype=False)
+        assert mine['top_batsmen']['Runs'].tolist() == theirs['top_batsmen']['Runs'].tolist()
+    pd.testing.assert_series_equal(got.batting_trend(), want.batting_trend())
+    pd.testing.assert_series_equal(got.bowling_trend(), want.bowling_trend())
+    pd.testing.assert_frame_equal(got.team_trend(), want.team_trend(), check_dtype=False)
+    pd.testing.assert_frame_equal(got.win_rate_trend(), want.win_rate_trend())
+    pd.testing.assert_frame_equal(got.players_in_form(), want.players_in_form())
+    mine, theirs = got.trend_window('win_rates', points=20, top=3), want.trend_window('win_rates', points=20, top=3)
+    assert list(mine) == list(theirs)
+    for name in theirs:
+        pd.testing.assert_series_equal(mine[name], theirs[name])
+    for metric in METRICS:
+        for filters in ({}, {'positions': [1, 2]}, {'role': 'Bowler', 'min_innings': 3}):
+            pd.testing.assert_frame_equal(got.top_players(metric, page_size=1000, **filters)['rows'],
+                                          want.top_players(metric, page_size=1000, **filters)['rows'])
+    assert_same_results(got, want)
+
+
+def assert_same_results(got, want):
+    pd.testing.assert_frame_equal(got.team_results, want.team_results)
+    for name in ('head_to_head_wins', 'head_to_head_played', 'venue_wins', 'venue_played', 'team_record',
+                 'win_rate_by_match', 'rolling_win_rate_by_match'):
+        pd.testing.assert_frame_equal(getattr(got, name), getattr(want, name), obj=name)
+
+
+def touch_cached(stats):
+    # Selector lists and leaderboard scopes that extend() has to keep up
+    # to date rather than drop
+    stats.players, stats.teams, stats.matches
+    stats.top_players('Runs', positions=[1, 2])
+
+
+def test_incremental_ingest_matches_full_rebuild(tmp_path):
+    parts = {table: split_matches(pd.read_csv(os.path.join(ROOT, path)), 4) for table, path in FILES.items()}
+    raw = {table: pd.concat(frames, ignore_index=True) for table, frames in parts.items()}
+    paths = {table: str(tmp_path / path) for table, path in FILES.items()}
+    for table, path in paths.items():
+        parts[table][0].to_csv(path, index=False)
+    schedule = load_schedule(os.path.join(ROOT, 'match_schedule_results.csv'))
+
+    live = LiveIngest(paths['batting'], paths['bowling'], os.path.join(ROOT, 'match_schedule_results.csv'))
+    batting, bowling = apply_schema(pd.read_csv(paths['batting']), pd.read_csv(paths['bowling']))
+    stats = CricketStats(batting, bowling, schedule)
+    earlier = []
+    for step in range(1, 4):
+        for table, path in paths.items():
+            parts[table][step].to_csv(path, mode='a', header=False, index=False)
+        update = live.poll(batting, bowling)
+        earlier.append((batting, len(batting), batting['Runs'].to_numpy().copy()))
+        batting, bowling = update['batting'], update['bowling']
+        # The prepared trend views must not outlive the data they came from
+        stats.trend_window('win_rates', points=20, top=3)
+        touch_cached(stats)
+        stats.extend(batting, bowling)
+    assert live.poll(batting, bowling) is None
+
+    full_batting, full_bowling = apply_schema(raw['batting'], raw['bowling'])
+    assert_same_frame(batting, full_batting)
+    assert_same_frame(bowling, full_bowling)
+    assert_same_stats(stats, CricketStats(full_batting, full_bowling, schedule))
+
+    # Frames handed out before an append are left as they were
+    for frame, rows, runs in earlier:
+        assert len(frame) == rows
+        np.testing.assert_array_equal(frame['Runs'].to_numpy(), runs)
+
+
+def test_results_follow_a_growing_schedule():
+    # Fixtures are added as the tournament goes on and decided a poll later
+    batting, bowling = apply_schema(*(pd.read_csv(os.path.join(ROOT, path)) for path in FILES.values()))
+    schedule = load_schedule(os.path.join(ROOT, 'match_schedule_results.csv'))
+    bounds = np.linspace(0, batting['Match_no'].max(), 5)
+
+    def upto(step):
+        played = schedule[schedule['Match_no'] <= bounds[step + 1]].copy()
+        played.loc[played['Match_no'] > bounds[step], 'Winner'] = np.nan
+        return (batting[batting['Match_no'] <= bounds[step]].reset_index(drop=True),
+                bowling[bowling['Match_no'] <= bounds[step]].reset_index(drop=True), played)
+
+    stats = CricketStats(*upto(1))
+    for step in range(2, 4):
+        touch_cached(stats)
+        stats.extend(*upto(step))
+        assert_same_results(stats, CricketStats(*upto(step)))
+
+    # A re-drawn fixture rebuilds the results
+    redrawn = upto(3)[2]
+    redrawn.loc[redrawn.index[0], 'Venue'] = redrawn['Venue'].iloc[-1]
+    stats.extend(*upto(3)[:2], redrawn)
+    assert_same_results(stats, CricketStats(*upto(3)[:2], redrawn))
+
+
+class FakeRoot:
+    # Stands in for the Tk root: after() callbacks run when pumped
+    def __init__(self):
+        self.callbacks = []
+
+    def after(self, ms, callback):
+        self.callbacks.append(callback)
+        return len(self.callbacks)
+
+    def pump(self, until, limit=1000):
+        for _ in range(limit):
+            if until():
+                return
+            threading.Event().wait(0.005)
+            if self.callbacks:
+                self.callbacks.pop(0)()
+        raise AssertionError("condition not reached")
+
+
+def test_exclusive_work_waits_for_running_queries():
+    root = FakeRoot()
+    runner = TaskRunner(root, max_workers=2)
+    release = threading.Event()
+    events = []
+    runner.submit('team', lambda: release.wait(5) and 'team', events.append)
+    runner.exclusive('ingest', lambda: events.append('update'))
+    runner.submit('player', lambda: 'player', events.append)
+    assert events == []
+
+    release.set()
+    root.pump(lambda: len(events) == 3)
+    assert events == ['team', 'update', 'player']
+    runner.shutdown()
+
+
+def test_synchronous_errors_are_reported():
+    errors = []
+    runner = TaskRunner(FakeRoot(), max_workers=0, on_error=lambda channel, error: errors.append(channel))
+    runner.submit('ingest', lambda: 1 / 0, lambda result: None)
+    runner.exclusive('ingest', lambda: 1 / 0)
+    assert errors == ['ingest', 'ingest']
@@ -0,0 +1,32 @@
+import os
+
+import numpy as np
+import pytest
+
+from conftest import ROOT
+from player_profiles import DEFAULT_PROFILES, record_spans
+
+
+def spans_text(data, chunk_size):
+    buffer = np.frombuffer(data, dtype=np.uint8)
+    return [(data[start:field], data[field:end]) for start, field, end in zip(*record_spans(buffer, chunk_size))]
+
+
+@pytest.mark.parametrize('chunk_size', [1, 2, 3, 7, 4096])
+def test_quotes_carry_across_chunks(chunk_size):
+    data = b'a,b,text\r\n1,"x,y",\"quoted, with\nnewline\"\n2,z,plain\n\n3,w,"ends ""here"""'
+    assert spans_text(data, chunk_size) == [
+        (b'a,b,', b'text'),
+        (b'1,"x,y",', b'"quoted, with\nnewline"'),
+        (b'2,z,', b'plain'),
+        (b'3,w,', b'"ends ""here"""'),
+    ]
+
+
+def test_chunked_scan_matches_one_pass():
+    with open(os.path.join(ROOT, DEFAULT_PROFILES), 'rb') as f:
+        buffer = np.frombuffer(f.read(), dtype=np.uint8)
+    whole = record_spans(buffer, len(buffer))
+    for chunk_size in (97, 4096):
+        for got, want in zip(record_spans(buffer, chunk_size), whole):
+            np.testing.assert_array_equal(got, want)
@@ -0,0 +1,49 @@
+import asyncio
+import json
+
+import pandas as pd
+import pytest
+
+from query_server import QueryService
+
+
+class Stats:
+    # Only what the trend endpoints call
+    def trend_window(self, kind, start=None, end=None, points=None, top=None):
+        return pd.Series([1.0, 2.0], index=[1, 2], name=kind)
+
+    def players_in_form(self, metric='Average', k=10, min_innings=None):
+        return pd.DataFrame({'Average': [50.0] * k})
+
+
+def get(path, **params):
+    service = QueryService(Stats(), None, 'test', workers=1)
+
+    async def respond():
+        service.condition = asyncio.Condition()
+        return await service.respond(path, {name: [value] for name, value in params.items()})
+    status, _, body = asyncio.run(respond())
+    # Errors are JSON on every endpoint
+    if status != 200 or not path.endswith('.png'):
+        body = json.loads(body)
+    return status, body
+
+
+@pytest.mark.parametrize('params', [
+    {'type': 'batting', 'points': '0'},
+    {'type': 'batting', 'points': '-5'},
+    {'type': 'win_rates', 'top': '-1'},
+    {'type': 'form', 'k': '-1'},
+    {'type': 'form', 'k': '0'},
+])
+def test_out_of_range_trend_parameters_are_bad_requests(params):
+    status, body = get('/trend', **params)
+    assert status == 400
+    assert 'must be at least' in body['error']
+
+
+def test_trend_parameters_in_range():
+    assert get('/trend', type='batting', points='1', top='0')[0] == 200
+    status, body = get('/trend', type='form', k='3')
+    assert status == 200 and len(body['frame']['data']) == 3
+    assert get('/trend.png', type='win_rates', top='-2')[0] == 400
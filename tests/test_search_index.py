@@ -0,0 +1,23 @@
+import os
+
+import pandas as pd
+
+from conftest import ROOT
+from search_index import SearchIndex
+
+
+def test_extended_index_matches_a_full_build():
+    names = sorted(pd.read_csv(os.path.join(ROOT, 'batting_summary.csv'))['Batsman_Name'].dropna().unique())
+    base, added = names[::2], names[1::2][:25] + ['Zz Top', 'ab de', 'Ab De Villiers Jr'] + names[:3]
+    index = SearchIndex(base)
+    searches = {query: index.search(query) for query in ('a', 'ko', 'vir', 'de', 'sh')}
+
+    extended = index.extended(added)
+    full = SearchIndex(base + added)
+    assert extended.names == full.names
+    for query in ('a', 'ko', 'vir', 'de', 'sh', 'ab', 'zz', 'top', 'jr'):
+        assert extended.search(query, limit=50) == full.search(query, limit=50), query
+
+    # The original keeps serving searches unchanged
+    assert {query: index.search(query) for query in searches} == searches
+    assert index.extended(base[:10]) is index
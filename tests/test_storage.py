@@ -0,0 +1,94 @@
+import os
+
+import pandas as pd
+import pytest
+
+from conftest import ROOT
+from storage import DEFAULT_FILES, CricketStore, StoreStats
+
+
+@pytest.fixture
+def store(tmp_path):
+    # Two tournaments: the shipped CSVs, then a shorter one with different
+    # scores and an extra players column
+    files = {table: os.path.join(ROOT, path) for table, path in DEFAULT_FILES.items()}
+    second = {}
+    for table, path in files.items():
+        frame = pd.read_csv(path)
+        if table in ('batting', 'bowling', 'schedule'):
+            frame = frame[frame['Match_no'] <= 20]
+        if table == 'batting':
+            frame['Runs'] = frame['Runs'] + 1
+        if table == 'players':
+            frame['nickname'] = ''
+        second[table] = str(tmp_path / f'{table}.csv')
+        frame.to_csv(second[table], index=False)
+
+    store = CricketStore(str(tmp_path / 'cricket.db'))
+    store.add_tournament('2023', files)
+    store.add_tournament('2027', second)
+    yield store
+    store.close()
+
+
+def test_later_tournament_adds_columns(store):
+    assert 'nickname' in store.columns('players')
+    assert store.select('players', ['nickname IS NOT NULL'], tournament='2023').empty
+
+
+def test_results_across_tournaments(store):
+    both, first, second = StoreStats(store), StoreStats(store, '2023'), StoreStats(store, '2027')
+    for team in ('India', 'Australia'):
+        stats = both.team_stats(team)
+        assert stats['played'] == first.team_stats(team)['played'] + second.team_stats(team)['played']
+    record = both.head_to_head('India', 'Australia')
+    assert record['played'] == (first.head_to_head('India', 'Australia')['played']
+                                + second.head_to_head('India', 'Australia')['played'])
+    trend = both.win_rate_trend()
+    assert len(trend) == len(first.win_rate_trend()) + len(second.win_rate_trend())
+
+
+def test_matches_stay_within_their_tournament(store):
+    both, second = StoreStats(store), StoreStats(store, '2027')
+    fixture = second.matches[0]
+    summary = both.match_summary(f'{fixture} (2027)')
+    assert summary['team_scores'].to_dict() == second.match_summary(fixture)['team_scores'].to_dict()
+    assert both.match_summary(fixture) is None
+    assert len(both.matches) == len(StoreStats(store, '2023').matches) + len(second.matches)
+
+
+def test_trends_number_matches_across_the_store(store):
+    both, first, second = StoreStats(store), StoreStats(store, '2023'), StoreStats(store, '2027')
+    offset = first.batting_trend().index.max()
+    for name in ('batting_trend', 'bowling_trend', 'team_trend'):
+        combined, head, tail = getattr(both, name)(), getattr(first, name)(), getattr(second, name)()
+        assert len(combined) == len(head) + len(tail)
+        later = combined.loc[offset + 1:]
+        assert list(later.index) == list(tail.index + offset)
+        pd.testing.assert_frame_equal(pd.DataFrame(later).reset_index(drop=True).dropna(axis=1, how='all'),
+                                      pd.DataFrame(tail).reset_index(drop=True), check_names=False,
+                                      check_dtype=False)
+
+
+def test_tournaments_keep_the_order_they_were_added(store):
+    files = {table: os.path.join(ROOT, path) for table, path in DEFAULT_FILES.items()}
+    offsets = store.match_offsets()
+    # Re-ingesting keeps the place; a name that sorts first, added within
+    # the same second, still goes last
+    store.add_tournament('2023', files)
+    store.add_tournament('1999', files)
+    assert store.tournaments() == ['2023', '2027', '1999']
+    assert {name: store.match_offsets()[name] for name in offsets} == offsets
+    store.remove_tournament('1999')
+    assert store.tournaments() == ['2023', '2027']
+
+
+def test_older_stores_get_a_sequence_column(tmp_path):
+    store = CricketStore(str(tmp_path / 'old.db'))
+    with store.connection as connection:
+        connection.execute('CREATE TABLE tournaments (name TEXT PRIMARY KEY, added_at TEXT)')
+        connection.executemany('INSERT INTO tournaments VALUES (?, ?)',
+                               [('b', '2024-01-01 00:00:00'), ('a', '2024-01-02 00:00:00')])
+    store.ensure_tournaments()
+    assert store.tournaments() == ['b', 'a']
+    store.close()
@@ -0,0 +1,154 @@
+import atexit
+import json
+import os
+import threading
+import time
+from contextlib import nullcontext
+
+# Timing spans for the GUI hot paths (data loading, search filtering, the
+# query/update/plot/draw stages of each tab).
+#
+# Tracing is off unless CRICKET_TRACE names an output file or the overlay is
+# enabled; while off, span() hands back one shared no-op context manager, so
+# an instrumented call costs an attribute check and nothing is recorded.
+#
+#   CRICKET_TRACE=trace.json   Chrome trace (chrome://tracing, Perfetto)
+#   CRICKET_TRACE=trace.jsonl  one JSON object per span
+TRACE_ENV = 'CRICKET_TRACE'
+NULL_SPAN = nullcontext()
+
+
+class Span:
+    __slots__ = ('tracer', 'name', 'start')
+
+    def __init__(self, tracer, name):
+        self.tracer = tracer
+        self.name = name
+
+    def __enter__(self):
+        self.tracer.local.depth = getattr(self.tracer.local, 'depth', 0) + 1
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        end = time.perf_counter()
+        self.tracer.local.depth -= 1
+        self.tracer.record(self.name, self.start, end, self.tracer.local.depth)
+        return False
+
+
+class Tracer:
+    # Spans may close on any thread (queries run on the TaskRunner pool), so
+    # recording is serialized with a lock. `last` holds the spans since the
+    # most recent begin() for the overlay; `version` changes whenever it does.
+    def __init__(self, path=None):
+        self.origin = time.perf_counter()
+        self.lock = threading.Lock()
+        self.local = threading.local()
+        self.keep = False
+        self.action = None
+        self.action_start = self.origin
+        self.last = []
+        self.version = 0
+        self.out = None
+        self.chrome = False
+        self.threads = set()
+        self.written = 0
+        if path:
+            self.open(path)
+        self.enabled = self.out is not None
+
+    def open(self, path):
+        try:
+            self.out = open(path, 'w')
+        except OSError as e:
+            print(f"Could not open trace file {path}: {e}")
+            return
+        self.chrome = not path.endswith('.jsonl')
+        atexit.register(self.close)
+        print(f"Writing timing spans to {path}")
+
+    def keep_last(self):
+        # Retain the breakdown of the last action for the overlay
+        self.keep = True
+        self.enabled = True
+
+    def span(self, name):
+        if not self.enabled:
+            return NULL_SPAN
+        return Span(self, name)
+
+    def begin(self, action):
+        # Start of a user action; the overlay shows spans from here on
+        if not self.enabled:
+            return
+        with self.lock:
+            self.action = action
+            self.action_start = time.perf_counter()
+            self.last = []
+            self.version += 1
+
+    def record(self, name, start, end, depth):
+        thread = threading.current_thread()
+        with self.lock:
+            if self.keep:
+                self.last.append((name, start, end, depth))
+                self.version += 1
+            if self.out is not None:
+                self.write(name, start, end, depth, thread)
+
+    def write(self, name, start, end, depth, thread):
+        if self.chrome:
+            if thread.ident not in self.threads:
+                self.threads.add(thread.ident)
+                self.write_event({'name': 'thread_name', 'ph': 'M', 'pid': os.getpid(), 'tid': thread.ident,
+                                  'args': {'name': thread.name}})
+            self.write_event({
+                'name': name, 'cat': self.action or 'app', 'ph': 'X', 'pid': os.getpid(), 'tid': thread.ident,
+                'ts': round((start - self.origin) * 1e6, 1), 'dur': round((end - start) * 1e6, 1),
+            })
+        else:
+            self.out.write(json.dumps({
+                'name': name, 'action': self.action, 'thread': thread.name, 'depth': depth,
+                'start_ms': round((start - self.origin) * 1000, 3), 'dur_ms': round((end - start) * 1000, 3),
+            }) + '\n')
+
+    def write_event(self, event):
+        # Streamed as a JSON array; viewers also accept a file cut off
+        # before the closing bracket if the app is killed
+        self.out.write(('[\n' if not self.written else ',\n') + json.dumps(event))
+        self.written += 1
+
+    def breakdown(self):
+        # (action, [(name, ms, depth)] in start order, ms from begin to the
+        # end of the last span)
+        with self.lock:
+            spans = [(name, (end - start) * 1000, depth) for name, start, end, depth in sorted(
+                self.last, key=lambda item: item[1])]
+            total = (max(end for _, _, end, _ in self.last) - self.action_start) * 1000 if self.last else 0.0
+            return self.action, spans, total
+
+    def close(self):
+        with self.lock:
+            if self.out is None:
+                return
+            if self.chrome:
+                self.out.write('\n]\n' if self.written else '[]\n')
+            self.out.close()
+            self.out = None
+            self.enabled = self.keep
+
+
+tracer = Tracer(os.environ.get(TRACE_ENV))
+
+
+def span(name):
+    return tracer.span(name)
+
+
+def traced(name, fn):
+    # Wrap a callable (e.g. canvas.draw) so every call is a span
+    def call(*args, **kwargs):
+        with tracer.span(name):
+            return fn(*args, **kwargs)
+    return call